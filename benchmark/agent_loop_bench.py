@@ -0,0 +1,85 @@
+"""Offline CPU and memory benchmark of the agent loop.
+
+Records the LLM streams, Tavily responses and MCP tool calls of an agent
+run to a cassette once, then replays the run from the cassette without
+network to measure the CPU time and memory BaseAgent.execute spends on
+its own. Replays must use the same config, agent and task as the
+recording.
+
+Usage:
+    python -m benchmark.agent_loop_bench --record run.json --task "..."
+    python -m benchmark.agent_loop_bench --replay run.json --task "..." --time-scale 0 --runs 5 --profile
+"""
+
+import argparse
+import asyncio
+import cProfile
+import pstats
+import time
+import tracemalloc
+
+from sgr_agent_core.agent_config import GlobalConfig
+from sgr_agent_core.agent_factory import AgentFactory
+from sgr_agent_core.services import Cassette
+from sgr_deep_research.default_definitions import get_default_agents_definitions
+
+
+async def run_agent(agent_name: str, task: str) -> None:
+    agent = await AgentFactory.create(GlobalConfig().agents[agent_name], task)
+
+    async def consume() -> None:
+        async for _ in agent.streaming_generator.stream():
+            pass
+
+    consumer = asyncio.create_task(consume())
+    await agent.execute()
+    await consumer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agent loop benchmark on recorded external I/O")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--record", metavar="CASSETTE", help="Run with network and record the cassette")
+    mode.add_argument("--replay", metavar="CASSETTE", help="Replay the cassette without network")
+    parser.add_argument("--task", required=True, help="Research task")
+    parser.add_argument("--agent", default="sgr_tool_calling_agent", help="Agent definition name")
+    parser.add_argument("--config", default="config.yaml", help="Path to config.yaml")
+    parser.add_argument("--agents-file", default=None, help="Path to agents.yaml")
+    parser.add_argument("--time-scale", type=float, default=0.0, help="Replay speed, 1 keeps the recorded timing")
+    parser.add_argument("--runs", type=int, default=1, help="Number of replayed runs")
+    parser.add_argument("--profile", action="store_true", help="Print the top CPU consumers of replayed runs")
+    args = parser.parse_args()
+
+    config = GlobalConfig.from_yaml(args.config)
+    config.agents.update(get_default_agents_definitions())
+    if args.agents_file:
+        config.definitions_from_yaml(args.agents_file)
+
+    if args.record:
+        with Cassette.use(args.record, "record"):
+            asyncio.run(run_agent(args.agent, args.task))
+        return
+
+    profiler = cProfile.Profile() if args.profile else None
+    tracemalloc.start()
+    for run in range(1, args.runs + 1):
+        tracemalloc.reset_peak()
+        started_cpu, started_wall = time.process_time(), time.perf_counter()
+        with Cassette.use(args.replay, "replay", time_scale=args.time_scale):
+            if profiler:
+                profiler.enable()
+            asyncio.run(run_agent(args.agent, args.task))
+            if profiler:
+                profiler.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        print(
+            f"run {run}: cpu {time.process_time() - started_cpu:.3f}s, "
+            f"wall {time.perf_counter() - started_wall:.3f}s, peak memory {peak / 2**20:.1f} MiB"
+        )
+    tracemalloc.stop()
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
-from openai import pydantic_function_tool
 from openai.types.chat import ChatCompletionFunctionToolParam
 
 from sgr_agent_core.agents import ResearchSGRToolCallingAgent
+from sgr_agent_core.services import ToolSchemaCache
 from sgr_agent_core.tools import ExtractPageContentTool, FinalAnswerTool, ReasoningTool, WebSearchTool
 
 
@@ -26,7 +26,7 @@ class BenchmarkAgent(ResearchSGRToolCallingAgent):
     async def _prepare_tools(self) -> list[ChatCompletionFunctionToolParam]:
         """Prepare available tools for current agent state and progress."""
         tools = set(self.toolkit)
-        if self._context.iteration >= self.max_iterations:
+        if self._context.iteration >= self.max_iterations or self._deadline_near():
             tools = {
                 ReasoningTool,
                 FinalAnswerTool,
@@ -36,7 +36,7 @@ class BenchmarkAgent(ResearchSGRToolCallingAgent):
                 WebSearchTool,
             }
 
-        return [pydantic_function_tool(tool, name=tool.tool_name, description="") for tool in tools]
+        return [ToolSchemaCache.get(tool, description="") for tool in self._stable_tool_order(tools)]
 
     async def execute(
         self,
@@ -0,0 +1,106 @@
+"""Microbenchmark of SSE frame serialization in OpenAIStreamingGenerator.
+
+Compares frames per second of the previous encoding (pydantic
+model_dump_json of every LLM chunk, json.dumps of a rebuilt dict with a
+recomputed fingerprint for tool calls and final chunks) against the
+pre-encoded stream envelope with only the choices encoded per frame.
+
+Usage:
+    python -m benchmark.sse_frame_bench --frames 100000
+"""
+
+import argparse
+import json
+import time
+
+from openai.types.chat import ChatCompletionChunk
+
+from sgr_agent_core import stream
+from sgr_agent_core.stream import OpenAIStreamingGenerator
+
+CHUNK = ChatCompletionChunk.model_validate(
+    {
+        "id": "completion",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "delta": {"content": " token"}}],
+    }
+)
+
+
+class PreviousStreamingGenerator(OpenAIStreamingGenerator):
+    """Generator with the encoding used before pre-encoded frames."""
+
+    def add_chunk(self, chunk: ChatCompletionChunk):
+        chunk.model = self.model
+        super().add_chunk(chunk)
+
+    def _encode(self, item: ChatCompletionChunk) -> str:
+        return f"data: {item.model_dump_json()}\n\n"
+
+    def add_tool_call(self, tool_call_id: str, function_name: str, arguments: str):
+        response = {
+            "id": self.id,
+            "object": "chat.completion.chunk",
+            "created": self.created,
+            "model": self.model,
+            "system_fingerprint": f"fp_{hex(hash(self.model))[-8:]}",
+            "choices": [
+                {
+                    "delta": {
+                        "tool_calls": [
+                            {
+                                "index": 0,
+                                "id": tool_call_id,
+                                "type": "function",
+                                "function": {"name": function_name, "arguments": arguments},
+                            }
+                        ]
+                    },
+                    "index": self.choice_index,
+                    "logprobs": None,
+                    "finish_reason": None,
+                }
+            ],
+            "usage": None,
+        }
+        self.add(f"data: {json.dumps(response)}\n\n")
+
+
+def produce(generator: OpenAIStreamingGenerator, frames: int) -> None:
+    for i in range(frames):
+        if i % 50:
+            generator.add_chunk(CHUNK)
+        else:
+            generator.add_tool_call("call_1", "web_search", '{"query": "news"}')
+
+
+def measure(generator_class: type[OpenAIStreamingGenerator], frames: int) -> float:
+    generator = generator_class()
+    started = time.process_time()
+    produce(generator, frames)
+    return frames / (time.process_time() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE frame serialization benchmark")
+    parser.add_argument("--frames", type=int, default=100_000, help="Frames per measurement, 1 in 50 a tool call")
+    args = parser.parse_args()
+
+    previous = measure(PreviousStreamingGenerator, args.frames)
+    current = measure(OpenAIStreamingGenerator, args.frames)
+    orjson = stream.orjson
+    stream.orjson = None
+    current_stdlib = measure(OpenAIStreamingGenerator, args.frames)
+    stream.orjson = orjson
+
+    print(f"{args.frames} frames")
+    print(f"model_dump_json / json.dumps: {previous:,.0f} frames/s")
+    print(f"pre-encoded, stdlib json:     {current_stdlib:,.0f} frames/s ({current_stdlib / previous:.1f}x)")
+    if orjson is not None:
+        print(f"pre-encoded, orjson:          {current:,.0f} frames/s ({current / previous:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
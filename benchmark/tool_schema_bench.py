@@ -0,0 +1,72 @@
+"""Microbenchmark of tool schema compilation in _prepare_tools.
+
+Compares the CPU time agents spend building function tool params on
+every iteration with pydantic_function_tool against ToolSchemaCache.
+
+Usage:
+    python -m benchmark.tool_schema_bench --agents 100 --iterations 10
+"""
+
+import argparse
+import time
+
+from openai import pydantic_function_tool
+
+from sgr_agent_core.services import ToolSchemaCache
+from sgr_agent_core.tools import (
+    AdaptPlanTool,
+    ClarificationTool,
+    CreateReportTool,
+    ExtractPageContentTool,
+    FinalAnswerTool,
+    GeneratePlanTool,
+    ReasoningTool,
+    WebSearchTool,
+)
+
+TOOLKIT = [
+    AdaptPlanTool,
+    ClarificationTool,
+    CreateReportTool,
+    ExtractPageContentTool,
+    FinalAnswerTool,
+    GeneratePlanTool,
+    ReasoningTool,
+    WebSearchTool,
+]
+
+
+def prepare_uncached() -> list:
+    return [pydantic_function_tool(tool, name=tool.tool_name, description="") for tool in TOOLKIT]
+
+
+def prepare_cached() -> list:
+    return [ToolSchemaCache.get(tool, description="") for tool in TOOLKIT]
+
+
+def measure(prepare, calls: int) -> float:
+    started = time.process_time()
+    for _ in range(calls):
+        prepare()
+    return time.process_time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool schema compilation benchmark")
+    parser.add_argument("--agents", type=int, default=100, help="Number of concurrent agents")
+    parser.add_argument("--iterations", type=int, default=10, help="Iterations per agent")
+    args = parser.parse_args()
+
+    calls = args.agents * args.iterations
+    ToolSchemaCache.invalidate()
+    uncached = measure(prepare_uncached, calls)
+    cached = measure(prepare_cached, calls)
+
+    print(f"{len(TOOLKIT)} tools, {args.agents} agents x {args.iterations} iterations = {calls} _prepare_tools calls")
+    print(f"pydantic_function_tool: {uncached:.3f}s CPU ({uncached / calls * 1e6:.1f}us per iteration)")
+    print(f"ToolSchemaCache:        {cached:.3f}s CPU ({cached / calls * 1e6:.1f}us per iteration)")
+    print(f"Saved per iteration:    {(uncached - cached) / calls * 1e6:.1f}us ({uncached / max(cached, 1e-9):.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
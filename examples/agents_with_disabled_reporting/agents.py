@@ -7,13 +7,14 @@ generating report files.
 
 from typing import Type
 
-from openai import AsyncOpenAI, pydantic_function_tool
+from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionFunctionToolParam
 
 from sgr_agent_core.agent_config import AgentConfig
 from sgr_agent_core.agents.sgr_agent import SGRAgent
 from sgr_agent_core.agents.sgr_tool_calling_agent import SGRToolCallingAgent
 from sgr_agent_core.agents.tool_calling_agent import ToolCallingAgent
+from sgr_agent_core.services import ToolSchemaCache
 from sgr_agent_core.tools import (
     BaseTool,
     ClarificationTool,
@@ -52,8 +53,8 @@ class ResearchSGRAgentNoReporting(SGRAgent):
     async def _prepare_tools(self) -> Type[NextStepToolStub]:
         """Prepare available tools for the current agent state and progress."""
         tools = set(self.toolkit)
-        if self._context.iteration >= self.config.execution.max_iterations:
-            # Only FinalAnswerTool available when max_iterations reached (no CreateReportTool)
+        if self._final_phase():
+            # Only FinalAnswerTool available at max_iterations or near the deadline (no CreateReportTool)
             tools = {
                 FinalAnswerTool,
             }
@@ -65,7 +66,7 @@ class ResearchSGRAgentNoReporting(SGRAgent):
             tools -= {
                 WebSearchTool,
             }
-        return NextStepToolsBuilder.build_NextStepTools(list(tools))
+        return NextStepToolsBuilder.build_NextStepTools(self._stable_tool_order(tools))
 
 
 class ResearchToolCallingAgentNoReporting(ToolCallingAgent):
@@ -94,8 +95,8 @@ class ResearchToolCallingAgentNoReporting(ToolCallingAgent):
     async def _prepare_tools(self) -> list[ChatCompletionFunctionToolParam]:
         """Prepare available tools for the current agent state and progress."""
         tools = set(self.toolkit)
-        if self._context.iteration >= self.config.execution.max_iterations:
-            # Only FinalAnswerTool available when max_iterations reached (no CreateReportTool)
+        if self._final_phase():
+            # Only FinalAnswerTool available at max_iterations or near the deadline (no CreateReportTool)
             tools = {
                 FinalAnswerTool,
             }
@@ -107,7 +108,7 @@ class ResearchToolCallingAgentNoReporting(ToolCallingAgent):
             tools -= {
                 WebSearchTool,
             }
-        return [pydantic_function_tool(tool, name=tool.tool_name, description="") for tool in tools]
+        return [ToolSchemaCache.get(tool, description="") for tool in self._stable_tool_order(tools)]
 
 
 class ResearchSGRToolCallingAgentNoReporting(SGRToolCallingAgent):
@@ -136,8 +137,8 @@ class ResearchSGRToolCallingAgentNoReporting(SGRToolCallingAgent):
     async def _prepare_tools(self) -> list[ChatCompletionFunctionToolParam]:
         """Prepare available tools for the current agent state and progress."""
         tools = set(self.toolkit)
-        if self._context.iteration >= self.config.execution.max_iterations:
-            # Only ReasoningTool and FinalAnswerTool available when max_iterations reached (no CreateReportTool)
+        if self._final_phase():
+            # Only ReasoningTool and FinalAnswerTool at max_iterations or near the deadline (no CreateReportTool)
             tools = {
                 ReasoningTool,
                 FinalAnswerTool,
@@ -150,4 +151,4 @@ class ResearchSGRToolCallingAgentNoReporting(SGRToolCallingAgent):
             tools -= {
                 WebSearchTool,
             }
-        return [pydantic_function_tool(tool, name=tool.tool_name, description="") for tool in tools]
+        return [ToolSchemaCache.get(tool, description="") for tool in self._stable_tool_order(tools)]
@@ -15,6 +15,7 @@ from sgr_agent_core.agent_definition import (
     AgentDefinition,
     ExecutionConfig,
     LLMConfig,
+    LLMEndpoint,
     PromptsConfig,
     SearchConfig,
 )
@@ -23,14 +24,30 @@ from sgr_agent_core.agents import *  # noqa: F403
 from sgr_agent_core.base_agent import BaseAgent
 from sgr_agent_core.base_tool import BaseTool, MCPBaseTool
 from sgr_agent_core.models import (
+    AgentCheckpoint,
     AgentContext,
     AgentStatesEnum,
     AgentStatistics,
+    CallStatistics,
     SearchResult,
     SourceData,
 )
 from sgr_agent_core.next_step_tool import NextStepToolsBuilder, NextStepToolStub
-from sgr_agent_core.services import AgentRegistry, MCP2ToolConverter, PromptLoader, ToolRegistry
+from sgr_agent_core.services import (
+    AgentRegistry,
+    Cassette,
+    CheckpointStore,
+    ConcurrencyLimiter,
+    ContextCompactor,
+    EndpointBalancer,
+    LLMClientPool,
+    MCP2ToolConverter,
+    PromptLoader,
+    RequestHedger,
+    ResponseCache,
+    ToolRegistry,
+    ToolSchemaCache,
+)
 from sgr_agent_core.tools import *  # noqa: F403
 
 __all__ = [
@@ -44,7 +61,9 @@ __all__ = [
     # Models
     "AgentStatesEnum",
     "AgentStatistics",
+    "CallStatistics",
     "AgentContext",
+    "AgentCheckpoint",
     "SearchResult",
     "SourceData",
     # Services
@@ -52,10 +71,20 @@ __all__ = [
     "ToolRegistry",
     "PromptLoader",
     "MCP2ToolConverter",
+    "LLMClientPool",
+    "ToolSchemaCache",
+    "ContextCompactor",
+    "RequestHedger",
+    "EndpointBalancer",
+    "ConcurrencyLimiter",
+    "ResponseCache",
+    "Cassette",
+    "CheckpointStore",
     # Configuration
     "AgentConfig",
     "AgentDefinition",
     "LLMConfig",
+    "LLMEndpoint",
     "PromptsConfig",
     "SearchConfig",
     "ExecutionConfig",
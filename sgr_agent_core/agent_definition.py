@@ -3,7 +3,7 @@ import logging
 import os
 from functools import cached_property
 from pathlib import Path
-from typing import Any, Self
+from typing import Any, ClassVar, Literal, Self
 
 import yaml
 from fastmcp.mcp_config import MCPConfig
@@ -12,6 +12,14 @@ from pydantic import BaseModel, Field, FilePath, ImportString, computed_field, f
 logger = logging.getLogger(__name__)
 
 
+class LLMEndpoint(BaseModel):
+    """One of OpenAI-compatible replicas serving the model."""
+
+    base_url: str = Field(description="Base URL")
+    api_key: str | None = Field(default=None, description="API key (LLMConfig api_key by default)")
+    weight: float = Field(default=1.0, gt=0, description="Relative share of requests")
+
+
 class LLMConfig(BaseModel, extra="allow"):
     api_key: str | None = Field(default=None, description="API key")
     base_url: str = Field(default="https://api.openai.com/v1", description="Base URL")
@@ -21,9 +29,98 @@ class LLMConfig(BaseModel, extra="allow"):
     proxy: str | None = Field(
         default=None, description="Proxy URL (e.g., socks5://127.0.0.1:1081 or http://127.0.0.1:8080)"
     )
+    max_connections: int = Field(default=100, gt=0, description="Maximum number of connections to the endpoint")
+    max_keepalive_connections: int = Field(
+        default=20, ge=0, description="Maximum number of idle kept-alive connections"
+    )
+    keepalive_expiry: float = Field(default=30.0, ge=0, description="Seconds an idle connection is kept alive")
+    hedge_requests: bool = Field(
+        default=False, description="Send a duplicate request if the first token is late and take the faster one"
+    )
+    hedge_percentile: float = Field(
+        default=95.0, gt=0, le=100, description="Percentile of recent times to first token to wait before hedging"
+    )
+    hedge_min_delay: float = Field(default=1.0, ge=0, description="Minimal wait before hedging a request, seconds")
+    hedge_max_rate: float = Field(default=0.1, ge=0, le=1, description="Maximal share of hedged requests")
+    hedge_base_url: str | None = Field(
+        default=None, description="Alternate endpoint for hedged requests (base_url by default)"
+    )
+    hedge_api_key: str | None = Field(default=None, description="API key of the alternate endpoint")
+    max_concurrent_requests: int | None = Field(
+        default=None,
+        gt=0,
+        description="Upper bound of the adaptive in-flight request limit per endpoint, shared by all agents. "
+        "None disables limiting",
+    )
+    min_concurrent_requests: int = Field(
+        default=1, gt=0, description="Lower bound of the adaptive in-flight request limit per endpoint"
+    )
+    latency_target: float | None = Field(
+        default=None,
+        gt=0,
+        description="Time to the first streamed token in seconds above which the concurrency limit is lowered",
+    )
+    endpoints: list[LLMEndpoint] = Field(
+        default_factory=list, description="Replicas to balance requests between (base_url is used if empty)"
+    )
+    routing: Literal["least_outstanding", "weighted"] = Field(
+        default="least_outstanding", description="Endpoint selection strategy"
+    )
+    circuit_breaker_threshold: int = Field(
+        default=3, gt=0, description="Consecutive endpoint failures (5xx, 429, connection) that open its circuit"
+    )
+    circuit_breaker_cooldown: float = Field(
+        default=30.0, ge=0, description="Seconds an endpoint with open circuit gets no requests"
+    )
+    response_cache_dir: str | None = Field(
+        default=None,
+        description="Directory of the on-disk LLM response cache for deterministic replays. "
+        "Used with temperature 0 only, unless response_cache_any_temperature is set. None disables caching",
+    )
+    response_cache_any_temperature: bool = Field(
+        default=False, description="Cache and replay responses sampled with non-zero temperature too"
+    )
+
+    # Client and connection settings, not sent with completion requests
+    client_fields: ClassVar[set[str]] = {
+        "api_key",
+        "base_url",
+        "proxy",
+        "max_connections",
+        "max_keepalive_connections",
+        "keepalive_expiry",
+        "hedge_requests",
+        "hedge_percentile",
+        "hedge_min_delay",
+        "hedge_max_rate",
+        "hedge_base_url",
+        "hedge_api_key",
+        "max_concurrent_requests",
+        "min_concurrent_requests",
+        "latency_target",
+        "endpoints",
+        "routing",
+        "circuit_breaker_threshold",
+        "circuit_breaker_cooldown",
+        "response_cache_dir",
+        "response_cache_any_temperature",
+    }
+
+    @model_validator(mode="after")
+    def concurrency_bounds_validator(self) -> Self:
+        if self.max_concurrent_requests and self.min_concurrent_requests > self.max_concurrent_requests:
+            raise ValueError(
+                f"min_concurrent_requests ({self.min_concurrent_requests}) is greater than "
+                f"max_concurrent_requests ({self.max_concurrent_requests})"
+            )
+        return self
 
     def to_openai_client_kwargs(self) -> dict[str, Any]:
-        return self.model_dump(exclude={"api_key", "base_url", "proxy"})
+        return self.model_dump(exclude=self.client_fields)
+
+    def for_endpoint(self, endpoint: LLMEndpoint) -> "LLMConfig":
+        """Copy of the configuration pointing to the endpoint."""
+        return self.model_copy(update={"base_url": endpoint.base_url, "api_key": endpoint.api_key or self.api_key})
 
 
 class SearchConfig(BaseModel, extra="allow"):
@@ -105,7 +202,103 @@ class ExecutionConfig(BaseModel, extra="allow"):
     max_clarifications: int = Field(default=3, ge=0, description="Maximum number of clarifications")
     max_iterations: int = Field(default=10, gt=0, description="Maximum number of iterations")
     mcp_context_limit: int = Field(default=15000, gt=0, description="Maximum context length from MCP server response")
+    parallel_tool_calls: bool = Field(
+        default=False, description="Execute every tool call returned by the LLM in one iteration concurrently"
+    )
+    fused_reasoning_action: bool = Field(
+        default=False,
+        description="Request reasoning and the next action in a single LLM call (SGR tool calling agents)",
+    )
+    tool_prefetch: bool = Field(
+        default=False,
+        description="Start tool I/O (e.g. web search) as soon as its arguments are streamed, before the LLM call ends",
+    )
+    deadline: float | None = Field(
+        default=None,
+        gt=0,
+        description="Wall-clock time budget of an agent run in seconds, clarification waits excluded. None - no limit",
+    )
+    deadline_reserve: float = Field(
+        default=60.0,
+        ge=0,
+        description="Seconds left to the deadline at which the agent is forced to finish with the final tools",
+    )
+    llm_call_timeout: float | None = Field(default=None, gt=0, description="Timeout of a single LLM call in seconds")
+    tool_timeout: float | None = Field(default=None, gt=0, description="Timeout of a single tool call in seconds")
+    context_token_budget: int | None = Field(
+        default=None,
+        gt=0,
+        description="Estimated prompt token budget. Older tool results are compacted into digests when it is "
+        "exceeded. None disables compaction",
+    )
+    compaction_keep_recent: int = Field(
+        default=4, ge=0, description="Number of latest conversation messages that are never compacted"
+    )
+    compaction_digest_chars: int = Field(
+        default=500, gt=0, description="Maximum characters of a tool result head kept in its digest"
+    )
 
+    stream_buffer_size: int | None = Field(
+        default=None,
+        gt=0,
+        description="Maximum number of frames a stream subscriber may fall behind before the overflow policy "
+        "applies to it, None is unbounded",
+    )
+    stream_overflow: Literal["block", "drop", "coalesce"] = Field(
+        default="coalesce",
+        description="What happens to token chunks for a subscriber over the stream buffer size: the agent waits "
+        "for it (block), they are dropped (drop) or merged into one frame (coalesce). Tool calls and final frames "
+        "are always kept",
+    )
+    stream_coalesce_window: float | None = Field(
+        default=None,
+        gt=0,
+        description="Seconds consecutive token chunks are merged into one stream frame (e.g. 0.03), None sends "
+        "every chunk as is",
+    )
+    stream_coalesce_bytes: int | None = Field(
+        default=None, gt=0, description="Flush a merged stream frame earlier once it holds this many characters"
+    )
+    stream_replay_size: int = Field(
+        default=1000,
+        gt=0,
+        description="Number of last stream frames kept for other viewers and clients resuming with Last-Event-ID",
+    )
+    disconnect_policy: Literal["continue", "cancel", "detach", "pause"] = Field(
+        default="continue",
+        description="What happens to a running agent when its last stream client disconnects: it keeps running "
+        "(continue), is cancelled (cancel), keeps running with the stream output kept on disk for a later "
+        "reconnect (detach) or pauses before its next iteration until a client reconnects (pause)",
+    )
+    pause_timeout: float | None = Field(
+        default=600.0,
+        gt=0,
+        description="Seconds a paused agent waits to be resumed before it is suspended to its checkpoint, or "
+        "cancelled without checkpoint_dir, releasing its place among the running agents. None - it waits forever",
+    )
+    disconnect_grace: float = Field(
+        default=10.0, ge=0, description="Seconds a client has to reconnect before the disconnect policy is applied"
+    )
+    detach_dir: str = Field(default="streams", description="Directory for stream output of detached agents")
+    detach_max_frames: int = Field(
+        default=100_000,
+        gt=0,
+        description="Maximum number of stream frames of a detached agent kept on disk, the oldest are dropped first",
+    )
+    priority: int = Field(
+        default=0, description="Admission queue priority of the agent runs, higher first, e.g. for a paid tier"
+    )
+    checkpoint_dir: str | None = Field(
+        default=None,
+        description="Directory the agent state is checkpointed to at every iteration boundary, to resume it with "
+        "AgentFactory.resume. None disables checkpoints",
+    )
+    clarification_idle_timeout: float | None = Field(
+        default=None,
+        gt=0,
+        description="Seconds an agent waits for a clarification before it is suspended: its task ends and it is "
+        "resumed from its checkpoint once the answer comes. Needs checkpoint_dir. None - it waits in memory",
+    )
     logs_dir: str | None = Field(
         default="logs", description="Directory for saving bot logs. Set to None or empty string to disable logging."
     )
@@ -3,13 +3,20 @@
 import logging
 from typing import Type, TypeVar
 
-import httpx
 from openai import AsyncOpenAI
 
 from sgr_agent_core.agent_config import GlobalConfig
 from sgr_agent_core.agent_definition import AgentDefinition, LLMConfig
 from sgr_agent_core.base_agent import BaseAgent
-from sgr_agent_core.services import AgentRegistry, MCP2ToolConverter, ToolRegistry
+from sgr_agent_core.models import AgentCheckpoint
+from sgr_agent_core.services import (
+    AgentRegistry,
+    CheckpointStore,
+    EndpointBalancer,
+    LLMClientPool,
+    MCP2ToolConverter,
+    ToolRegistry,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +32,10 @@ class AgentFactory:
 
     @classmethod
     def _create_client(cls, llm_config: LLMConfig) -> AsyncOpenAI:
-        """Create OpenAI client from configuration.
+        """Get OpenAI client for the configuration from the shared client
+        pool. With several endpoints configured, the client of the endpoint
+        chosen by EndpointBalancer is returned; agents still balance every
+        completion call between the endpoints.
 
         Args:
             llm_config: LLM configuration
@@ -33,11 +43,14 @@ class AgentFactory:
         Returns:
             Configured AsyncOpenAI client
         """
-        client_kwargs = {"base_url": llm_config.base_url, "api_key": llm_config.api_key}
-        if llm_config.proxy:
-            client_kwargs["http_client"] = httpx.AsyncClient(proxy=llm_config.proxy)
+        if llm_config.endpoints:
+            llm_config = llm_config.for_endpoint(EndpointBalancer.select(llm_config))
+        return LLMClientPool.get(llm_config)
 
-        return AsyncOpenAI(**client_kwargs)
+    @classmethod
+    async def close_clients(cls) -> None:
+        """Close all pooled OpenAI clients, e.g. on application shutdown."""
+        await LLMClientPool.aclose()
 
     @classmethod
     async def create(cls, agent_def: AgentDefinition, task: str) -> Agent:
@@ -104,6 +117,45 @@ class AgentFactory:
             logger.error(f"Failed to create agent '{agent_def.name}': {e}", exc_info=True)
             raise ValueError(f"Failed to create agent: {e}") from e
 
+    @classmethod
+    async def resume(
+        cls,
+        checkpoint: AgentCheckpoint | str,
+        agent_def: AgentDefinition | None = None,
+        checkpoint_dir: str | None = None,
+    ) -> Agent:
+        """Rebuild an agent from its checkpoint; execute() continues the loop
+        after the checkpointed iteration.
+
+        Args:
+            checkpoint: Checkpoint, or id of the agent to load it for
+            agent_def: Definition to rebuild the agent from, by default the one
+                the checkpoint names in the config
+            checkpoint_dir: Directory to load the checkpoint from, by default
+                the checkpoint_dir of the config
+
+        Returns:
+            Restored agent instance
+
+        Raises:
+            ValueError: If the checkpoint or the definition is not found, or
+                the agent cannot be rebuilt
+        """
+        if isinstance(checkpoint, str):
+            agent_id = checkpoint
+            checkpoint_dir = checkpoint_dir or GlobalConfig().execution.checkpoint_dir
+            checkpoint = CheckpointStore.load(checkpoint_dir, agent_id) if checkpoint_dir else None
+            if checkpoint is None:
+                raise ValueError(f"Checkpoint of agent '{agent_id}' not found in '{checkpoint_dir}'")
+        if agent_def is None:
+            agent_def = GlobalConfig().agents.get(checkpoint.definition_name)
+            if agent_def is None:
+                raise ValueError(f"Agent definition '{checkpoint.definition_name}' of the checkpoint not found")
+        agent = await cls.create(agent_def, checkpoint.task)
+        agent.restore(checkpoint)
+        logger.info(f"Resumed agent '{agent.id}' after iteration {checkpoint.iteration}")
+        return agent
+
     @classmethod
     def get_definitions_list(cls) -> list[AgentDefinition]:
         """Get all agent definitions from config.
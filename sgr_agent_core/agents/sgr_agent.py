@@ -40,15 +40,12 @@ class SGRAgent(BaseAgent):
         )
 
     async def _reasoning_phase(self) -> NextStepToolStub:
-        async with self.openai_client.chat.completions.stream(
+        completion = await self._stream_completion(
+            "reasoning",
             response_format=await self._prepare_tools(),
             messages=await self._prepare_context(),
-            **self.config.llm.to_openai_client_kwargs(),
-        ) as stream:
-            async for event in stream:
-                if event.type == "chunk":
-                    self.streaming_generator.add_chunk(event.chunk)
-        reasoning: NextStepToolStub = (await stream.get_final_completion()).choices[0].message.parsed  # type: ignore
+        )
+        reasoning: NextStepToolStub = completion.choices[0].message.parsed  # type: ignore
         # we are not fully sure if it should be in conversation or not. Looks like not necessary data
         # self.conversation.append({"role": "assistant", "content": reasoning.model_dump_json(exclude={"function"})})
         self.streaming_generator.add_tool_call(
@@ -82,8 +79,10 @@ class SGRAgent(BaseAgent):
         )
         return tool
 
-    async def _action_phase(self, tool: BaseTool) -> str:
-        result = await tool(self._context, self.config)
+    async def _action_phase(self, tool: BaseTool | list[BaseTool]) -> str | list[str]:
+        if isinstance(tool, list):
+            return await self._parallel_action_phase(tool)
+        result = await self._call_tool(tool)
         self.conversation.append(
             {"role": "tool", "content": result, "tool_call_id": f"{self._context.iteration}-action"}
         )
@@ -117,7 +116,7 @@ class ResearchSGRAgent(SGRAgent):
     async def _prepare_tools(self) -> Type[NextStepToolStub]:
         """Prepare available tools for the current agent state and progress."""
         tools = set(self.toolkit)
-        if self._context.iteration >= self.config.execution.max_iterations:
+        if self._final_phase():
             tools = {
                 CreateReportTool,
                 FinalAnswerTool,
@@ -130,4 +129,4 @@ class ResearchSGRAgent(SGRAgent):
             tools -= {
                 WebSearchTool,
             }
-        return NextStepToolsBuilder.build_NextStepTools(list(tools))
+        return NextStepToolsBuilder.build_NextStepTools(self._stable_tool_order(tools))
@@ -1,11 +1,12 @@
 from typing import Literal, Type
 
-from openai import AsyncOpenAI, pydantic_function_tool
+from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionFunctionToolParam
 
 from sgr_agent_core.agent_config import AgentConfig
 from sgr_agent_core.agents.sgr_agent import SGRAgent
 from sgr_agent_core.models import AgentStatesEnum
+from sgr_agent_core.services.tool_schema_cache import ToolSchemaCache
 from sgr_agent_core.tools import (
     BaseTool,
     ClarificationTool,
@@ -16,6 +17,11 @@ from sgr_agent_core.tools import (
     WebSearchTool,
 )
 
+FUSED_REASONING_INSTRUCTION = (
+    f"Respond with {ReasoningTool.tool_name} first and then the action tool for the next step, "
+    "both as tool calls in this same response."
+)
+
 
 class SGRToolCallingAgent(SGRAgent):
     """Agent that uses OpenAI native function calling to select and execute
@@ -41,20 +47,9 @@ class SGRToolCallingAgent(SGRAgent):
             **kwargs,
         )
         self.tool_choice: Literal["required"] = "required"
+        self._fused_actions: list[BaseTool] = []
 
-    async def _reasoning_phase(self) -> ReasoningTool:
-        async with self.openai_client.chat.completions.stream(
-            messages=await self._prepare_context(),
-            tools=[pydantic_function_tool(ReasoningTool, name=ReasoningTool.tool_name)],
-            tool_choice={"type": "function", "function": {"name": ReasoningTool.tool_name}},
-            **self.config.llm.to_openai_client_kwargs(),
-        ) as stream:
-            async for event in stream:
-                if event.type == "chunk":
-                    self.streaming_generator.add_chunk(event.chunk)
-            reasoning: ReasoningTool = (
-                (await stream.get_final_completion()).choices[0].message.tool_calls[0].function.parsed_arguments
-            )
+    def _record_reasoning(self, reasoning: ReasoningTool) -> None:
         self.conversation.append(
             {
                 "role": "assistant",
@@ -71,6 +66,50 @@ class SGRToolCallingAgent(SGRAgent):
                 ],
             }
         )
+
+    async def _fused_reasoning_phase(self) -> ReasoningTool | None:
+        """Request reasoning and the next action in one LLM call.
+
+        Selected action tools are kept for the select action phase.
+        Returns None if the model skipped the reasoning tool call or
+        its arguments are not valid.
+        """
+        action_tools = [
+            tool for tool in await self._prepare_tools() if tool["function"]["name"] != ReasoningTool.tool_name
+        ]
+        completion = await self._stream_completion(
+            "reasoning_action",
+            messages=[*await self._prepare_context(), {"role": "user", "content": FUSED_REASONING_INSTRUCTION}],
+            tools=[ToolSchemaCache.get(ReasoningTool), *action_tools],
+            tool_choice=self.tool_choice,
+        )
+        tool_calls = completion.choices[0].message.tool_calls or []
+        # tool calls with invalid arguments or unknown tools are not parsed
+        tools = [
+            tool_call.function.parsed_arguments
+            for tool_call in tool_calls
+            if isinstance(getattr(tool_call.function, "parsed_arguments", None), BaseTool)
+        ]
+        reasoning = next((tool for tool in tools if isinstance(tool, ReasoningTool)), None)
+        if reasoning is None:
+            self.logger.warning("Fused reasoning call returned no reasoning, falling back to separate calls")
+            return None
+        self._fused_actions = [tool for tool in tools if not isinstance(tool, ReasoningTool)]
+        return reasoning
+
+    async def _reasoning_phase(self) -> ReasoningTool:
+        reasoning = None
+        if self.config.execution.fused_reasoning_action:
+            reasoning = await self._fused_reasoning_phase()
+        if reasoning is None:
+            completion = await self._stream_completion(
+                "reasoning",
+                messages=await self._prepare_context(),
+                tools=[ToolSchemaCache.get(ReasoningTool)],
+                tool_choice={"type": "function", "function": {"name": ReasoningTool.tool_name}},
+            )
+            reasoning: ReasoningTool = completion.choices[0].message.tool_calls[0].function.parsed_arguments
+        self._record_reasoning(reasoning)
         tool_call_result = await reasoning(self._context)
         self.streaming_generator.add_tool_call(
             f"{self._context.iteration}-reasoning", reasoning.tool_name, tool_call_result
@@ -81,32 +120,46 @@ class SGRToolCallingAgent(SGRAgent):
         self._log_reasoning(reasoning)
         return reasoning
 
-    async def _select_action_phase(self, reasoning: ReasoningTool) -> BaseTool:
-        async with self.openai_client.chat.completions.stream(
+    async def _request_action_tools(self) -> list[BaseTool]:
+        completion = await self._stream_completion(
+            "select_action",
             messages=await self._prepare_context(),
             tools=await self._prepare_tools(),
             tool_choice=self.tool_choice,
-            **self.config.llm.to_openai_client_kwargs(),
-        ) as stream:
-            async for event in stream:
-                if event.type == "chunk":
-                    self.streaming_generator.add_chunk(event.chunk)
-
-        completion = await stream.get_final_completion()
+        )
 
         try:
-            tool = completion.choices[0].message.tool_calls[0].function.parsed_arguments
+            tool_calls = completion.choices[0].message.tool_calls
+            tools = [tool_call.function.parsed_arguments for tool_call in tool_calls]
+            if not tools:
+                raise IndexError("No tool calls returned")
         except (IndexError, AttributeError, TypeError):
             # LLM returned a text response instead of a tool call - treat as completion
             final_content = completion.choices[0].message.content or "Task completed successfully"
-            tool = FinalAnswerTool(
-                reasoning="Agent decided to complete the task",
-                completed_steps=[],
-                answer=final_content,
-                status=AgentStatesEnum.COMPLETED,
-            )
-        if not isinstance(tool, BaseTool):
+            tools = [
+                FinalAnswerTool(
+                    reasoning="Agent decided to complete the task",
+                    completed_steps=[],
+                    answer=final_content,
+                    status=AgentStatesEnum.COMPLETED,
+                )
+            ]
+        return tools
+
+    async def _select_action_phase(self, reasoning: ReasoningTool) -> BaseTool | list[BaseTool]:
+        tools, self._fused_actions = self._fused_actions or await self._request_action_tools(), []
+        parallel = self.config.execution.parallel_tool_calls
+        if not parallel:
+            tools = tools[:1]
+        if not all(isinstance(tool, BaseTool) for tool in tools):
             raise ValueError("Selected tool is not a valid BaseTool instance")
+        if parallel:
+            tools = self._trim_to_budgets(tools)
+        call_ids = (
+            [f"{self._context.iteration}-action-{i}" for i in range(len(tools))]
+            if parallel
+            else [f"{self._context.iteration}-action"]
+        )
         self.conversation.append(
             {
                 "role": "assistant",
@@ -114,19 +167,19 @@ class SGRToolCallingAgent(SGRAgent):
                 "tool_calls": [
                     {
                         "type": "function",
-                        "id": f"{self._context.iteration}-action",
+                        "id": call_id,
                         "function": {
                             "name": tool.tool_name,
                             "arguments": tool.model_dump_json(),
                         },
                     }
+                    for call_id, tool in zip(call_ids, tools)
                 ],
             }
         )
-        self.streaming_generator.add_tool_call(
-            f"{self._context.iteration}-action", tool.tool_name, tool.model_dump_json()
-        )
-        return tool
+        for call_id, tool in zip(call_ids, tools):
+            self.streaming_generator.add_tool_call(call_id, tool.tool_name, tool.model_dump_json())
+        return tools if parallel else tools[0]
 
 
 class ResearchSGRToolCallingAgent(SGRToolCallingAgent):
@@ -154,7 +207,7 @@ class ResearchSGRToolCallingAgent(SGRToolCallingAgent):
     async def _prepare_tools(self) -> list[ChatCompletionFunctionToolParam]:
         """Prepare available tools for the current agent state and progress."""
         tools = set(self.toolkit)
-        if self._context.iteration >= self.config.execution.max_iterations:
+        if self._final_phase():
             tools = {
                 ReasoningTool,
                 CreateReportTool,
@@ -168,4 +221,4 @@ class ResearchSGRToolCallingAgent(SGRToolCallingAgent):
             tools -= {
                 WebSearchTool,
             }
-        return [pydantic_function_tool(tool, name=tool.tool_name, description="") for tool in tools]
+        return [ToolSchemaCache.get(tool, description="") for tool in self._stable_tool_order(tools)]
@@ -1,10 +1,11 @@
 from typing import Literal, Type
 
-from openai import AsyncOpenAI, pydantic_function_tool
+from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionFunctionToolParam
 
 from sgr_agent_core.agent_config import AgentConfig
 from sgr_agent_core.base_agent import BaseAgent
+from sgr_agent_core.services.tool_schema_cache import ToolSchemaCache
 from sgr_agent_core.tools import (
     BaseTool,
     ClarificationTool,
@@ -44,20 +45,26 @@ class ToolCallingAgent(BaseAgent):
         """No explicit reasoning phase, reasoning is done internally by LLM."""
         return None
 
-    async def _select_action_phase(self, reasoning=None) -> BaseTool:
-        async with self.openai_client.chat.completions.stream(
+    async def _select_action_phase(self, reasoning=None) -> BaseTool | list[BaseTool]:
+        completion = await self._stream_completion(
+            "select_action",
             messages=await self._prepare_context(),
             tools=await self._prepare_tools(),
             tool_choice=self.tool_choice,
-            **self.config.llm.to_openai_client_kwargs(),
-        ) as stream:
-            async for event in stream:
-                if event.type == "chunk":
-                    self.streaming_generator.add_chunk(event.chunk)
-        tool = (await stream.get_final_completion()).choices[0].message.tool_calls[0].function.parsed_arguments
+        )
+        tool_calls = completion.choices[0].message.tool_calls
+        parallel = self.config.execution.parallel_tool_calls
+        tools = [tool_call.function.parsed_arguments for tool_call in (tool_calls if parallel else tool_calls[:1])]
 
-        if not isinstance(tool, BaseTool):
+        if not tools or not all(isinstance(tool, BaseTool) for tool in tools):
             raise ValueError("Selected tool is not a valid BaseTool instance")
+        if parallel:
+            tools = self._trim_to_budgets(tools)
+        call_ids = (
+            [f"{self._context.iteration}-action-{i}" for i in range(len(tools))]
+            if parallel
+            else [f"{self._context.iteration}-action"]
+        )
         self.conversation.append(
             {
                 "role": "assistant",
@@ -65,22 +72,24 @@ class ToolCallingAgent(BaseAgent):
                 "tool_calls": [
                     {
                         "type": "function",
-                        "id": f"{self._context.iteration}-action",
+                        "id": call_id,
                         "function": {
                             "name": tool.tool_name,
                             "arguments": tool.model_dump_json(),
                         },
                     }
+                    for call_id, tool in zip(call_ids, tools)
                 ],
             }
         )
-        self.streaming_generator.add_tool_call(
-            f"{self._context.iteration}-action", tool.tool_name, tool.model_dump_json()
-        )
-        return tool
+        for call_id, tool in zip(call_ids, tools):
+            self.streaming_generator.add_tool_call(call_id, tool.tool_name, tool.model_dump_json())
+        return tools if parallel else tools[0]
 
-    async def _action_phase(self, tool: BaseTool) -> str:
-        result = await tool(self._context, self.config)
+    async def _action_phase(self, tool: BaseTool | list[BaseTool]) -> str | list[str]:
+        if isinstance(tool, list):
+            return await self._parallel_action_phase(tool)
+        result = await self._call_tool(tool)
         self.conversation.append(
             {"role": "tool", "content": result, "tool_call_id": f"{self._context.iteration}-action"}
         )
@@ -112,7 +121,7 @@ class ResearchToolCallingAgent(ToolCallingAgent):
     async def _prepare_tools(self) -> list[ChatCompletionFunctionToolParam]:
         """Prepare available tools for the current agent state and progress."""
         tools = set(self.toolkit)
-        if self._context.iteration >= self.config.execution.max_iterations:
+        if self._final_phase():
             tools = {
                 CreateReportTool,
                 FinalAnswerTool,
@@ -125,4 +134,4 @@ class ResearchToolCallingAgent(ToolCallingAgent):
             tools -= {
                 WebSearchTool,
             }
-        return [pydantic_function_tool(tool, name=tool.tool_name, description="") for tool in tools]
+        return [ToolSchemaCache.get(tool, description="") for tool in self._stable_tool_order(tools)]
@@ -1,26 +1,48 @@
+import asyncio
+import contextlib
 import json
 import logging
 import os
+import time
 import traceback
 import uuid
 from datetime import datetime
-from typing import Type
+from typing import Any, Callable, Iterable, Type
 
-from openai import AsyncOpenAI, pydantic_function_tool
-from openai.types.chat import ChatCompletionFunctionToolParam
+from openai import AsyncOpenAI
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletionFunctionToolParam, ParsedChatCompletion
 
-from sgr_agent_core.agent_definition import AgentConfig
-from sgr_agent_core.models import AgentContext, AgentStatesEnum
+from sgr_agent_core.agent_definition import AgentConfig, LLMEndpoint
+from sgr_agent_core.models import AgentCheckpoint, AgentContext, AgentStatesEnum
+from sgr_agent_core.services.cassette import Cassette
+from sgr_agent_core.services.checkpoint_store import CheckpointStore
+from sgr_agent_core.services.client_pool import LLMClientPool
+from sgr_agent_core.services.concurrency_limiter import ConcurrencyLimiter
+from sgr_agent_core.services.context_compactor import ContextCompactor
+from sgr_agent_core.services.endpoint_balancer import EndpointBalancer
 from sgr_agent_core.services.prompt_loader import PromptLoader
 from sgr_agent_core.services.registry import AgentRegistry
-from sgr_agent_core.stream import OpenAIStreamingGenerator
+from sgr_agent_core.services.request_hedger import RequestHedger
+from sgr_agent_core.services.response_cache import ResponseCache
+from sgr_agent_core.services.tool_prefetcher import ToolPrefetcher
+from sgr_agent_core.services.tool_schema_cache import ToolSchemaCache
+from sgr_agent_core.stream import OpenAIStreamingGenerator, StreamBroadcaster
 from sgr_agent_core.tools import (
     BaseTool,
     ClarificationTool,
+    CreateReportTool,
+    FinalAnswerTool,
     ReasoningTool,
+    WebSearchTool,
 )
 
 
+class DeadlineReserveReached(TimeoutError):
+    """An LLM call outside the final tools phase ran into the deadline
+    reserve."""
+
+
 class AgentRegistryMixin:
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -32,6 +54,8 @@ class BaseAgent(AgentRegistryMixin):
     """Base class for agents."""
 
     name: str = "base_agent"
+    # Tools that finish the run, the only ones allowed to use the deadline reserve
+    final_tools: tuple[Type[BaseTool], ...] = (CreateReportTool, FinalAnswerTool)
 
     def __init__(
         self,
@@ -43,18 +67,45 @@ class BaseAgent(AgentRegistryMixin):
         **kwargs: dict,
     ):
         self.id = f"{def_name or self.name}_{uuid.uuid4()}"
+        self.def_name = def_name or self.name
         self.openai_client = openai_client
         self.config = agent_config
         self.creation_time = datetime.now()
+        self.finish_time: datetime | None = None
         self.task = task
         self.toolkit = toolkit
 
         self._context = AgentContext()
         self.conversation = []
 
-        self.streaming_generator = OpenAIStreamingGenerator(model=self.id)
+        self._create_stream()
         self.logger = logging.getLogger(f"sgr_agent_core.agents.{self.id}")
         self.log = []
+        self._deadline_at: float | None = None
+        self._tool_prefetcher: ToolPrefetcher | None = None
+        self._response_cache_key: str | None = None
+        self._execution_task: asyncio.Task | None = None
+        self._cancel_requested = False
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        # set by the runner of the agent, e.g. to give up its place among
+        # the running agents while it waits for the user
+        self._idle_context: Callable[[], contextlib.AbstractAsyncContextManager[None]] | None = None
+
+    def _create_stream(self):
+        """Client stream of the agent, tagged with the agent id."""
+        execution = self.config.execution
+        self.streaming_generator = OpenAIStreamingGenerator(
+            model=self.id,
+            coalesce_window=execution.stream_coalesce_window,
+            coalesce_bytes=execution.stream_coalesce_bytes,
+        )
+        self.stream_broadcaster = StreamBroadcaster(
+            self.streaming_generator,
+            replay_size=execution.stream_replay_size,
+            buffer_size=execution.stream_buffer_size,
+            overflow=execution.stream_overflow,
+        )
 
     async def provide_clarification(self, clarifications: str):
         """Receive clarification from an external source (e.g. user input)"""
@@ -66,6 +117,144 @@ class BaseAgent(AgentRegistryMixin):
         self._context.state = AgentStatesEnum.RESEARCHING
         self.logger.info(f"✅ Clarification received: {clarifications[:2000]}...")
 
+    def pause(self):
+        """Pause the agent before its next iteration, until resume()."""
+        if self._resumed.is_set():
+            self.logger.info("⏸️  Pause requested")
+        self._resumed.clear()
+
+    def resume(self):
+        self._resumed.set()
+
+    def cancel(self) -> bool:
+        """Cancel the running agent.
+
+        Returns:
+            False if the agent is not running
+        """
+        if self._execution_task is None or self._execution_task.done():
+            return False
+        self._cancel_requested = True
+        self._execution_task.cancel()
+        return True
+
+    def checkpoint(self) -> AgentCheckpoint:
+        """Serializable state of the agent to rebuild it with
+        AgentFactory.resume, valid at an iteration boundary."""
+        try:
+            context = self._context.model_dump(mode="json", exclude={"clarification_received"})
+        except ValueError as e:
+            self.logger.warning(f"Custom context is not serializable, it is not checkpointed: {e}")
+            context = self._context.model_dump(mode="json", exclude={"clarification_received", "custom_context"})
+        return AgentCheckpoint(
+            agent_id=self.id,
+            definition_name=self.def_name,
+            task=self.task,
+            creation_time=self.creation_time,
+            iteration=self._context.iteration,
+            toolkit=[tool.tool_name for tool in self.toolkit],
+            context=context,
+            conversation=self.conversation,
+            log=self.log,
+            deadline_remaining=None if self._deadline_at is None else self._deadline_at - time.monotonic(),
+        )
+
+    def restore(self, checkpoint: AgentCheckpoint):
+        """Continue the agent from the checkpoint: execute() resumes the loop
+        after the checkpointed iteration.
+
+        Raises:
+            ValueError: A checkpointed tool is not in the agent toolkit
+        """
+        tools = {tool.tool_name: tool for tool in self.toolkit}
+        missing = [name for name in checkpoint.toolkit if name not in tools]
+        if missing:
+            raise ValueError(f"Tools {missing} of the checkpoint of agent {checkpoint.agent_id} are not available")
+        self.toolkit = [tools[name] for name in checkpoint.toolkit]
+        self.id = checkpoint.agent_id
+        self.task = checkpoint.task
+        self.creation_time = checkpoint.creation_time
+        self._context = AgentContext.model_validate(checkpoint.context)
+        if self._context.state == AgentStatesEnum.PAUSED:
+            # suspended while paused, resumed by a returning client
+            self._context.state = AgentStatesEnum.RESEARCHING
+        self.conversation = checkpoint.conversation
+        self.log = checkpoint.log
+        if checkpoint.deadline_remaining is not None:
+            self._deadline_at = time.monotonic() + checkpoint.deadline_remaining
+        self._create_stream()
+        self.logger = logging.getLogger(f"sgr_agent_core.agents.{self.id}")
+        self.logger.info(f"♻️  Restored from checkpoint after iteration {checkpoint.iteration}")
+
+    async def _save_checkpoint(self):
+        """Checkpoint the agent; the checkpoint is taken on the event loop and
+        serialized and written in a thread."""
+        if self.config.execution.checkpoint_dir:
+            await asyncio.to_thread(CheckpointStore.save, self.config.execution.checkpoint_dir, self.checkpoint())
+
+    def _idle(self) -> contextlib.AbstractAsyncContextManager[None]:
+        """Context of a wait for a clarification or a resume, in which the
+        agent does no work."""
+        return self._idle_context() if self._idle_context is not None else contextlib.nullcontext()
+
+    async def _wait_for_clarification(self) -> bool:
+        """Wait for the user to answer the clarification questions.
+
+        Returns:
+            False if no answer came within execution.clarification_idle_timeout
+            and the agent is suspended, to be resumed from its checkpoint
+        """
+        execution = self.config.execution
+        idle_timeout = execution.clarification_idle_timeout if execution.checkpoint_dir else None
+        paused_at = time.monotonic()
+        try:
+            async with self._idle():
+                await asyncio.wait_for(self._context.clarification_received.wait(), idle_timeout)
+        except asyncio.TimeoutError:
+            self.logger.info(f"💤 No clarification for {idle_timeout}s, agent suspended")
+            self._context.state = AgentStatesEnum.SUSPENDED
+            return False
+        if self._deadline_at is not None:
+            # waiting for the user does not count against the deadline
+            self._deadline_at += time.monotonic() - paused_at
+        return True
+
+    async def _wait_if_paused(self) -> bool:
+        """Iteration boundary where a paused agent waits to be resumed.
+
+        Returns:
+            False if it was not resumed within execution.pause_timeout: it is
+            suspended to its checkpoint, or cancelled without checkpoint_dir
+        """
+        if self._resumed.is_set():
+            return True
+        execution = self.config.execution
+        state = self._context.state
+        self._context.state = AgentStatesEnum.PAUSED
+        self.logger.info("\n⏸️  Agent paused")
+        paused_at = time.monotonic()
+        try:
+            async with self._idle():
+                await asyncio.wait_for(self._resumed.wait(), execution.pause_timeout)
+            resumed = True
+        except asyncio.TimeoutError:
+            resumed = False
+        if self._deadline_at is not None:
+            # a paused agent does not spend its deadline
+            self._deadline_at += time.monotonic() - paused_at
+        if resumed:
+            self._context.state = state
+            self.logger.info("▶️  Agent resumed")
+        elif execution.checkpoint_dir:
+            self.logger.info(f"💤 Not resumed for {execution.pause_timeout}s, agent suspended")
+            # checkpointed as paused, so the next stream client resumes it
+            await self._save_checkpoint()
+            self._context.state = AgentStatesEnum.SUSPENDED
+        else:
+            self.logger.warning(f"🛑 Not resumed for {execution.pause_timeout}s, agent cancelled")
+            self._context.state = AgentStatesEnum.CANCELLED
+        return resumed
+
     def _log_reasoning(self, result: ReasoningTool) -> None:
         next_step = result.remaining_steps[0] if result.remaining_steps else "Completing"
         self.logger.info(
@@ -127,10 +316,16 @@ class BaseAgent(AgentRegistryMixin):
         agent_log = {
             "id": self.id,
             "model_config": self.config.llm.model_dump(
-                exclude={"api_key", "proxy"}
+                exclude={
+                    "api_key": True,
+                    "proxy": True,
+                    "hedge_api_key": True,
+                    "endpoints": {"__all__": {"api_key"}},
+                }
             ),  # Sensitive data excluded by default
             "task": self.task,
             "toolkit": [tool.tool_name for tool in self.toolkit],
+            "statistics": self._context.statistics.model_dump(),
             "log": self.log,
         }
 
@@ -141,17 +336,336 @@ class BaseAgent(AgentRegistryMixin):
         other context. Override this method to change the context setup for the
         agent.
 
+        Static content goes first and the task date is fixed to the agent
+        creation time, so every call shares the same request prefix and
+        can hit the provider prompt cache. If a context token budget is
+        configured, older tool results are compacted to fit it.
+
         Returns a list of dictionaries OpenAI like format, each
         containing a role and content key by default.
         """
-        return [
+        messages = [
             {"role": "system", "content": PromptLoader.get_system_prompt(self.toolkit, self.config.prompts)},
             {
                 "role": "user",
-                "content": PromptLoader.get_initial_user_request(self.task, self.config.prompts),
+                "content": PromptLoader.get_initial_user_request(self.task, self.config.prompts, self.creation_time),
             },
-            *self.conversation,
         ]
+        execution = self.config.execution
+        if execution.context_token_budget:
+            ContextCompactor.compact(
+                self.conversation,
+                token_budget=execution.context_token_budget,
+                keep_recent=execution.compaction_keep_recent,
+                digest_chars=execution.compaction_digest_chars,
+                reserved_tokens=ContextCompactor.estimate_tokens(messages),
+            )
+        return [*messages, *self.conversation]
+
+    def _stable_tool_order(self, tools: Iterable[Type[BaseTool]]) -> list[Type[BaseTool]]:
+        """Order tools as they appear in the toolkit (tools outside the toolkit
+        go last, by name).
+
+        Sets of tools have no stable iteration order between processes,
+        which would change the serialized tool schemas and break prompt
+        prefix caching.
+        """
+        position = {tool: i for i, tool in enumerate(self.toolkit)}
+        return sorted(set(tools), key=lambda tool: (position.get(tool, len(position)), tool.tool_name))
+
+    def _time_left(self) -> float | None:
+        """Seconds left to the run deadline, None if the run has no
+        deadline."""
+        if self._deadline_at is None:
+            return None
+        return self._deadline_at - time.monotonic()
+
+    def _deadline_near(self) -> bool:
+        """Whether the agent has to finish with the final tools to meet the
+        deadline."""
+        time_left = self._time_left()
+        return time_left is not None and time_left <= self.config.execution.deadline_reserve
+
+    def _final_phase(self) -> bool:
+        """Whether only the final tools are offered: the iteration limit or
+        the deadline reserve is reached."""
+        return self._context.iteration >= self.config.execution.max_iterations or self._deadline_near()
+
+    def _call_timeout(self, timeout: float | None, final: bool = False) -> float | None:
+        """Timeout of a call, shortened to the time left to the deadline.
+
+        Calls outside the final tools phase must end before the deadline
+        reserve, which is kept for the final tools.
+        """
+        time_left = self._time_left()
+        if time_left is None:
+            return timeout
+        if not final:
+            time_left -= self.config.execution.deadline_reserve
+        time_left = max(time_left, 0.0)
+        return time_left if timeout is None else min(timeout, time_left)
+
+    async def _stream_completion(self, phase: str, **request: Any) -> ParsedChatCompletion:
+        """Stream a chat completion to the client and return the final parsed
+        completion.
+
+        All LLM calls of the agents go through this method. Token usage
+        and timings are accounted to the given agent phase. With the
+        response cache enabled, a cached response is replayed instead of
+        calling the LLM; a replaying Cassette serves recorded responses.
+        A recording Cassette records live and cached responses alike.
+        """
+        request = {"stream_options": {"include_usage": True}, **self.config.llm.to_openai_client_kwargs(), **request}
+        # close to the deadline only the final tools are offered to the LLM
+        final = self._deadline_near()
+        timeout = self._call_timeout(self.config.execution.llm_call_timeout, final=final)
+        llm = self.config.llm
+        cache_key = ResponseCache.key(request) if ResponseCache.is_enabled(llm) else None
+        cached_chunks = ResponseCache.load(llm.response_cache_dir, cache_key) if cache_key else None
+        self._tool_prefetcher = self._create_tool_prefetcher()
+        self._response_cache_key = cache_key
+        started = time.perf_counter()
+        try:
+            if cached_chunks is not None:
+                self.logger.info(f"🗄️ Replaying cached LLM response ({phase})")
+                completion, first_token_at = await self._replay_completion(cached_chunks, request)
+                if Cassette.is_recording():
+                    # the cassette has to replay without the cache too
+                    Cassette.add(
+                        "llm",
+                        request,
+                        {"chunks": cached_chunks, "offsets": [0.0] * len(cached_chunks)},
+                        duration=time.perf_counter() - started,
+                    )
+            elif Cassette.is_replaying():
+                recorded = Cassette.take("llm", request)["response"]
+                completion, first_token_at = await self._replay_completion(
+                    recorded["chunks"], request, offsets=recorded["offsets"]
+                )
+            else:
+                completion, first_token_at = await self._live_completion(request, timeout)
+        except TimeoutError:
+            if timeout is None:
+                raise
+            if not final and self._deadline_near():
+                raise DeadlineReserveReached(f"LLM call ({phase}) reached the deadline reserve") from None
+            raise TimeoutError(f"LLM call ({phase}) timed out after {timeout:.1f}s") from None
+        finally:
+            self._tool_prefetcher = None
+            self._response_cache_key = None
+        finished = time.perf_counter()
+        latency, time_to_first_token = finished - started, (first_token_at or finished) - started
+        if cached_chunks is not None:
+            # replayed responses cost no tokens
+            self._context.statistics.add_llm_call(phase, latency=latency, time_to_first_token=time_to_first_token)
+        else:
+            self._record_completion_statistics(
+                phase, completion, latency=latency, time_to_first_token=time_to_first_token
+            )
+        return completion
+
+    async def _live_completion(
+        self, request: dict[str, Any], timeout: float | None
+    ) -> tuple[ParsedChatCompletion, float | None]:
+        """Stream the completion from the LLM, hedging it if configured.
+
+        With endpoint replicas the primary endpoint is chosen upfront, so
+        the hedge delay follows the latency of that endpoint.
+        """
+        llm = self.config.llm
+        async with asyncio.timeout(timeout):
+            if llm.hedge_requests:
+                endpoint = EndpointBalancer.select(llm) if llm.endpoints else None
+                return await RequestHedger.run(
+                    f"{endpoint.base_url if endpoint else llm.base_url}#{llm.model}",
+                    lambda index, claim: self._completion_attempt(
+                        request, claim, hedge=index > 0, endpoint=None if index else endpoint
+                    ),
+                    percentile=llm.hedge_percentile,
+                    min_delay=llm.hedge_min_delay,
+                    max_rate=llm.hedge_max_rate,
+                )
+            return await self._completion_attempt(request)
+
+    async def _replay_completion(
+        self, chunks: list[dict[str, Any]], request: dict[str, Any], offsets: list[float] | None = None
+    ) -> tuple[ParsedChatCompletion, float | None]:
+        """Replay a stored response to the client as if it was streamed.
+
+        With offsets (seconds from the request start per chunk) the
+        chunks are paced by the cassette time scale, otherwise replayed
+        at once.
+        """
+        first_token_at = None
+        events, state = ResponseCache.replay(chunks, request)
+        for i, chunk_events in enumerate(events):
+            if offsets is not None:
+                await Cassette.sleep(offsets[i] - (offsets[i - 1] if i else 0.0))
+            for event in chunk_events:
+                if first_token_at is None and event.type == "chunk" and event.chunk.choices:
+                    first_token_at = time.perf_counter()
+                await self._forward_stream_event(event)
+        return state.get_final_completion(), first_token_at
+
+    async def _forward_stream_event(self, event: Any) -> None:
+        """Forward the LLM stream event to the client or the tool
+        prefetcher.
+
+        Under the "block" stream overflow policy this waits while a
+        subscriber of the stream is stream_buffer_size frames behind,
+        slowing the LLM stream down to the slowest client.
+        """
+        # usage-only chunk has no choices and is not forwarded
+        if event.type == "chunk":
+            if event.chunk.choices:
+                self.streaming_generator.add_chunk(event.chunk)
+                await self.stream_broadcaster.wait_for_room()
+        elif self._tool_prefetcher is not None:
+            self._tool_prefetcher.feed(event)
+
+    async def _run_completion_stream(
+        self, client: AsyncOpenAI, request: dict[str, Any], claim: Callable[[], bool] | None = None
+    ) -> tuple[ParsedChatCompletion | None, float | None]:
+        """Stream one completion, forwarding chunks to the client. The
+        request waits for a slot of the endpoint concurrency limit first.
+
+        With hedging, claim() is called on the first streamed chunk; the
+        attempt stops without forwarding anything if another one streamed
+        first. The completed response is stored to the response cache and
+        recorded to the Cassette if they are enabled.
+        """
+        first_token_at = None
+        cache_key = self._response_cache_key
+        recording = Cassette.is_recording()
+        chunks = [] if cache_key is not None or recording else None
+        offsets = []
+        started = time.perf_counter()
+        async with ConcurrencyLimiter.slot(str(client.base_url), self.config.llm) as first_token:
+            async with client.chat.completions.stream(**request) as stream:
+                async for event in stream:
+                    if event.type == "chunk":
+                        if chunks is not None:
+                            chunks.append(event.chunk)
+                            offsets.append(time.perf_counter() - started)
+                        if event.chunk.choices and first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            first_token()
+                            if claim is not None and not claim():
+                                return None, None
+                    await self._forward_stream_event(event)
+                completion = await stream.get_final_completion()
+        if cache_key is not None:
+            ResponseCache.save(self.config.llm.response_cache_dir, cache_key, chunks)
+        if recording:
+            Cassette.add(
+                "llm",
+                request,
+                {"chunks": [chunk.model_dump(mode="json") for chunk in chunks], "offsets": offsets},
+                duration=time.perf_counter() - started,
+            )
+        return completion, first_token_at
+
+    def _create_tool_prefetcher(self) -> ToolPrefetcher | None:
+        execution = self.config.execution
+        if not execution.tool_prefetch or not any(tool.prefetch_fields for tool in self.toolkit):
+            return None
+        # only the first tool call is executed unless tool calls run in parallel
+        max_prefetches = None if execution.parallel_tool_calls else 1
+        return ToolPrefetcher(self.toolkit, self._context, self.config, max_prefetches=max_prefetches)
+
+    async def _completion_attempt(
+        self,
+        request: dict[str, Any],
+        claim: Callable[[], bool] | None = None,
+        hedge: bool = False,
+        endpoint: LLMEndpoint | None = None,
+    ) -> tuple[ParsedChatCompletion | None, float | None]:
+        """Stream one completion through the configured endpoint(s), starting
+        with the given endpoint if any."""
+        llm = self.config.llm
+        if hedge and llm.hedge_base_url:
+            client = LLMClientPool.get(
+                llm.model_copy(update={"base_url": llm.hedge_base_url, "api_key": llm.hedge_api_key or llm.api_key})
+            )
+            return await self._run_completion_stream(client, request, claim)
+        if llm.endpoints:
+            return await self._balanced_completion_stream(request, claim, endpoint)
+        return await self._run_completion_stream(self.openai_client, request, claim)
+
+    async def _balanced_completion_stream(
+        self,
+        request: dict[str, Any],
+        claim: Callable[[], bool] | None = None,
+        endpoint: LLMEndpoint | None = None,
+    ) -> tuple[ParsedChatCompletion | None, float | None]:
+        """Stream the completion from the given endpoint or the one chosen by
+        EndpointBalancer.
+
+        A request failing on an unhealthy endpoint before anything was
+        streamed fails over to the next endpoint.
+        """
+        llm = self.config.llm
+        tried = []
+        while True:
+            if endpoint is None or tried:
+                endpoint = EndpointBalancer.select(llm, exclude=tried)
+            tried.append(endpoint)
+            streamed = []
+
+            def claim_first_token() -> bool:
+                streamed.append(True)
+                return claim() if claim is not None else True
+
+            try:
+                with EndpointBalancer.track(endpoint, llm):
+                    client = LLMClientPool.get(llm.for_endpoint(endpoint))
+                    return await self._run_completion_stream(client, request, claim_first_token)
+            except Exception as e:
+                if streamed or len(tried) >= len(llm.endpoints) or not EndpointBalancer.is_endpoint_failure(e):
+                    raise
+                self.logger.warning(f"LLM endpoint {endpoint.base_url} failed ({e}), failing over")
+
+    def _record_completion_statistics(
+        self, phase: str, completion: ParsedChatCompletion, latency: float, time_to_first_token: float
+    ) -> None:
+        usage = getattr(completion, "usage", None)
+        if not isinstance(usage, CompletionUsage):
+            self._context.statistics.add_llm_call(phase, latency=latency, time_to_first_token=time_to_first_token)
+            return
+        details = usage.prompt_tokens_details
+        cached = (details.cached_tokens or 0) if details else 0
+        self._context.statistics.add_llm_call(
+            phase,
+            latency=latency,
+            time_to_first_token=time_to_first_token,
+            prompt_tokens=usage.prompt_tokens,
+            cached_tokens=cached,
+            completion_tokens=usage.completion_tokens,
+        )
+        self.logger.info(
+            f"📦 Prompt tokens: {usage.prompt_tokens} (cached: {cached}, uncached: {usage.prompt_tokens - cached}), "
+            f"completion tokens: {usage.completion_tokens}, "
+            f"latency: {latency:.2f}s (first token: {time_to_first_token:.2f}s)"
+        )
+
+    async def _call_tool(self, tool: BaseTool) -> str:
+        """Execute the tool against the agent context, accounting its latency.
+
+        A tool exceeding its timeout (or the run deadline) is cancelled
+        and reported to the LLM as a failed call.
+        """
+        timeout = self._call_timeout(self.config.execution.tool_timeout, final=isinstance(tool, self.final_tools))
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                return await tool(self._context, self.config)
+        except TimeoutError:
+            if timeout is None:
+                raise
+            self.logger.warning(f"⏱️ Tool {tool.tool_name} timed out after {timeout:.1f}s")
+            return f"Tool {tool.tool_name} timed out after {timeout:.1f}s, continue with the data collected so far"
+        finally:
+            self._context.statistics.add_tool_call(tool.tool_name, latency=time.perf_counter() - started)
 
     async def _prepare_tools(self) -> list[ChatCompletionFunctionToolParam]:
         """Prepare available tools for the current agent state and progress.
@@ -159,12 +673,15 @@ class BaseAgent(AgentRegistryMixin):
         usage.
 
         Returns a list of ChatCompletionFunctionToolParam based
-        available tools.
+        available tools, only the final ones near the deadline.
         """
-        tools = set(self.toolkit)
         if self._context.iteration >= self.config.execution.max_iterations:
             raise RuntimeError("Max iterations reached")
-        return [pydantic_function_tool(tool, name=tool.tool_name) for tool in tools]
+        tools = self.toolkit
+        if self._deadline_near():
+            # without final tools in the toolkit the agent cannot finish early
+            tools = [tool for tool in tools if issubclass(tool, self.final_tools)] or tools
+        return [ToolSchemaCache.get(tool) for tool in self._stable_tool_order(tools)]
 
     async def _reasoning_phase(self) -> ReasoningTool:
         """Call LLM to decide next action based on current context."""
@@ -185,34 +702,129 @@ class BaseAgent(AgentRegistryMixin):
         """
         raise NotImplementedError("_action_phase must be implemented by subclass")
 
+    def _trim_to_budgets(self, tools: list[BaseTool]) -> list[BaseTool]:
+        """Drop tool calls of a parallel batch that exceed the remaining
+        search and clarification budgets. At most one clarification and one
+        final tool call is kept.
+
+        If nothing is left, the first tool call is kept, as in the
+        sequential mode.
+        """
+        searches_left = (
+            self.config.search.max_searches - self._context.searches_used if self.config.search else len(tools)
+        )
+        clarifications_left = min(1, self.config.execution.max_clarifications - self._context.clarifications_used)
+        finals_left = 1
+        kept = []
+        for tool in tools:
+            if isinstance(tool, WebSearchTool):
+                searches_left -= 1
+                if searches_left < 0:
+                    continue
+            elif isinstance(tool, ClarificationTool):
+                clarifications_left -= 1
+                if clarifications_left < 0:
+                    continue
+            elif isinstance(tool, self.final_tools):
+                finals_left -= 1
+                if finals_left < 0:
+                    continue
+            kept.append(tool)
+        kept = kept or tools[:1]
+        if len(kept) < len(tools):
+            self.logger.warning(f"Dropped {len(tools) - len(kept)} tool calls over the run budgets")
+        return kept
+
+    async def _call_tool_in_batch(self, tool: BaseTool) -> str:
+        try:
+            return await self._call_tool(tool)
+        finally:
+            self._context.release_source_numbering(tool)
+
+    async def _parallel_action_phase(self, tools: list[BaseTool]) -> list[str]:
+        """Call all tools selected in one iteration concurrently against the
+        shared context.
+
+        Results are appended to the conversation in tool call order, so
+        the n-th tool answers the `{iteration}-action-{n}` tool call.
+        New sources are numbered in tool call order too, whichever tool
+        finishes first.
+        """
+        self._context.order_source_numbering(tools)
+        try:
+            results = await asyncio.gather(*(self._call_tool_in_batch(tool) for tool in tools), return_exceptions=True)
+        finally:
+            self._context.order_source_numbering([])
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        for i, (tool, result) in enumerate(zip(tools, results)):
+            self.conversation.append(
+                {"role": "tool", "content": result, "tool_call_id": f"{self._context.iteration}-action-{i}"}
+            )
+            self.streaming_generator.add_chunk_from_str(f"{result}\n")
+            self._log_tool_execution(tool, result)
+        return results
+
     async def execute(
         self,
     ):
         self.logger.info(f"🚀 Starting for task: '{self.task}'")
+        if self.config.execution.deadline and self._deadline_at is None:
+            self._deadline_at = time.monotonic() + self.config.execution.deadline
+        self._execution_task = asyncio.current_task()
         try:
+            if self._context.state == AgentStatesEnum.WAITING_FOR_CLARIFICATION:
+                # restored from a checkpoint taken while waiting for the user
+                if not await self._wait_for_clarification():
+                    return None
             while self._context.state not in AgentStatesEnum.FINISH_STATES.value:
+                await self._save_checkpoint()
+                if not await self._wait_if_paused():
+                    return None
                 self._context.iteration += 1
                 self.logger.info(f"Step {self._context.iteration} started")
 
-                reasoning = await self._reasoning_phase()
-                self._context.current_step_reasoning = reasoning
-                action_tool = await self._select_action_phase(reasoning)
+                try:
+                    reasoning = await self._reasoning_phase()
+                    self._context.current_step_reasoning = reasoning
+                    action_tool = await self._select_action_phase(reasoning)
+                except DeadlineReserveReached as e:
+                    self.logger.warning(f"⏱️ {e}, finishing with the final tools")
+                    self._context.cancel_prefetches()
+                    continue
                 await self._action_phase(action_tool)
+                self._context.cancel_prefetches()
 
-                if isinstance(action_tool, ClarificationTool):
+                action_tools = action_tool if isinstance(action_tool, list) else [action_tool]
+                if any(isinstance(tool, ClarificationTool) for tool in action_tools):
                     self.logger.info("\n⏸️  Research paused - please answer questions")
                     self._context.state = AgentStatesEnum.WAITING_FOR_CLARIFICATION
-                    self.streaming_generator.finish()
+                    self.streaming_generator.finish(usage=self._context.statistics.usage(), final=False)
                     self._context.clarification_received.clear()
-                    await self._context.clarification_received.wait()
+                    await self._save_checkpoint()
+                    if not await self._wait_for_clarification():
+                        return None
                     continue
             return self._context.execution_result
 
+        except asyncio.CancelledError:
+            if self._cancel_requested:
+                self.logger.warning("🛑 Agent execution cancelled")
+                self._context.state = AgentStatesEnum.CANCELLED
+            else:
+                # e.g. server shutdown: the checkpoint is kept to resume the agent
+                self.logger.warning("🛑 Agent execution interrupted")
+            raise
         except Exception as e:
             self.logger.error(f"❌ Agent execution error: {str(e)}")
             self._context.state = AgentStatesEnum.FAILED
             traceback.print_exc()
         finally:
+            self.finish_time = datetime.now()
+            self._context.cancel_prefetches()
             if self.streaming_generator is not None:
-                self.streaming_generator.finish(self._context.execution_result)
+                self.streaming_generator.finish(self._context.execution_result, usage=self._context.statistics.usage())
+            if self.config.execution.checkpoint_dir and self._context.state in AgentStatesEnum.FINISH_STATES.value:
+                CheckpointStore.delete(self.config.execution.checkpoint_dir, self.id)
             self._save_agent_log()
@@ -2,13 +2,15 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import TYPE_CHECKING, ClassVar
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from fastmcp import Client
 from pydantic import BaseModel
 
 from sgr_agent_core.agent_config import GlobalConfig
+from sgr_agent_core.services.cassette import Cassette
 from sgr_agent_core.services.registry import ToolRegistry
+from sgr_agent_core.services.tool_schema_cache import ToolSchemaCache
 
 if TYPE_CHECKING:
     from sgr_agent_core.agent_definition import AgentConfig
@@ -23,6 +25,8 @@ class ToolRegistryMixin:
         super().__init_subclass__(**kwargs)
         if cls.__name__ not in ("BaseTool", "MCPBaseTool"):
             ToolRegistry.register(cls, name=cls.tool_name)
+            # a re-registered tool replaces schemas compiled for its previous definition
+            ToolSchemaCache.invalidate(name=cls.tool_name)
 
 
 class BaseTool(BaseModel, ToolRegistryMixin):
@@ -30,11 +34,23 @@ class BaseTool(BaseModel, ToolRegistryMixin):
 
     tool_name: ClassVar[str] = None
     description: ClassVar[str] = None
+    # Arguments that are enough to start the tool I/O while the rest of the call is streamed, see prefetch()
+    prefetch_fields: ClassVar[tuple[str, ...]] = ()
 
     async def __call__(self, context: AgentContext, config: AgentConfig, **kwargs) -> str:
         """The result should be a string or dumped JSON."""
         raise NotImplementedError("Execute method must be implemented by subclass")
 
+    @classmethod
+    async def prefetch(cls, arguments: dict[str, Any], context: AgentContext, config: AgentConfig) -> Any:
+        """Start the tool I/O from the prefetch_fields arguments, before the
+        tool call is fully generated.
+
+        The result is taken by __call__ with
+        AgentContext.take_prefetch().
+        """
+        raise NotImplementedError("Prefetch method must be implemented by tools with prefetch_fields")
+
     def __init_subclass__(cls, **kwargs) -> None:
         cls.tool_name = cls.tool_name or cls.__name__.lower()
         cls.description = cls.description or cls.__doc__ or ""
@@ -50,11 +66,15 @@ class MCPBaseTool(BaseTool):
         config = GlobalConfig()
         payload = self.model_dump()
         try:
-            async with self._client:
-                result = await self._client.call_tool(self.tool_name, payload)
-                return json.dumps([m.model_dump_json() for m in result.content], ensure_ascii=False)[
-                    : config.execution.mcp_context_limit
-                ]
+            contents = await Cassette.call(
+                "mcp", {"tool": self.tool_name, "arguments": payload}, lambda: self._call_mcp_tool(payload)
+            )
+            return json.dumps(contents, ensure_ascii=False)[: config.execution.mcp_context_limit]
         except Exception as e:
             logger.error(f"Error processing MCP tool {self.tool_name}: {e}")
             return f"Error: {e}"
+
+    async def _call_mcp_tool(self, payload: dict[str, Any]) -> list[str]:
+        async with self._client:
+            result = await self._client.call_tool(self.tool_name, payload)
+            return [m.model_dump_json() for m in result.content]
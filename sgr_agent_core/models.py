@@ -1,9 +1,14 @@
 import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import Any, AsyncIterator, Coroutine
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+logger = logging.getLogger(__name__)
 
 
 class SourceData(BaseModel):
@@ -34,13 +39,86 @@ class SearchResult(BaseModel):
 
 class AgentStatesEnum(str, Enum):
     INITED = "inited"
+    QUEUED = "queued"
     RESEARCHING = "researching"
     WAITING_FOR_CLARIFICATION = "waiting_for_clarification"
+    PAUSED = "paused"
+    SUSPENDED = "suspended"
     COMPLETED = "completed"
     ERROR = "error"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISH_STATES = {COMPLETED, FAILED, ERROR, CANCELLED}
+
+
+class CallStatistics(BaseModel):
+    """Accumulated token usage and timings of LLM or tool calls."""
 
-    FINISH_STATES = {COMPLETED, FAILED, ERROR}
+    calls: int = Field(default=0, description="Number of calls")
+    prompt_tokens: int = Field(default=0, description="Prompt tokens, including cached ones")
+    cached_tokens: int = Field(default=0, description="Prompt tokens served from the provider cache")
+    completion_tokens: int = Field(default=0, description="Completion tokens")
+    time_to_first_token: float = Field(default=0.0, description="Sum of times to the first streamed chunk, seconds")
+    latency: float = Field(default=0.0, description="Sum of call durations, seconds")
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(
+        self,
+        latency: float,
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        completion_tokens: int = 0,
+        time_to_first_token: float = 0.0,
+    ):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.cached_tokens += cached_tokens
+        self.completion_tokens += completion_tokens
+        self.time_to_first_token += time_to_first_token
+        self.latency += latency
+
+
+class AgentStatistics(BaseModel):
+    """Token usage and latency of the agent run, per LLM phase and per
+    tool."""
+
+    llm: CallStatistics = Field(default_factory=CallStatistics, description="Totals of all LLM calls")
+    phases: dict[str, CallStatistics] = Field(default_factory=dict, description="LLM calls by agent phase")
+    tools: dict[str, CallStatistics] = Field(default_factory=dict, description="Tool calls by tool name")
+
+    def add_llm_call(
+        self,
+        phase: str,
+        latency: float,
+        time_to_first_token: float,
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        completion_tokens: int = 0,
+    ):
+        for statistics in (self.llm, self.phases.setdefault(phase, CallStatistics())):
+            statistics.add(
+                latency=latency,
+                prompt_tokens=prompt_tokens,
+                cached_tokens=cached_tokens,
+                completion_tokens=completion_tokens,
+                time_to_first_token=time_to_first_token,
+            )
+
+    def add_tool_call(self, tool_name: str, latency: float):
+        self.tools.setdefault(tool_name, CallStatistics()).add(latency=latency)
+
+    def usage(self) -> dict:
+        """Token usage totals in OpenAI completion usage format."""
+        return {
+            "prompt_tokens": self.llm.prompt_tokens,
+            "completion_tokens": self.llm.completion_tokens,
+            "total_tokens": self.llm.total_tokens,
+            "prompt_tokens_details": {"cached_tokens": self.llm.cached_tokens},
+        }
 
 
 class AgentContext(BaseModel):
@@ -66,9 +144,91 @@ class AgentContext(BaseModel):
         default=None, description="Custom context for project-specific data"
     )
 
+    statistics: AgentStatistics = Field(
+        default_factory=AgentStatistics, description="Token usage and latency of the run"
+    )
+
+    _prefetches: dict[str, asyncio.Task] = PrivateAttr(default_factory=dict)
+    _numbering_turns: dict[int, tuple[int, asyncio.Event]] = PrivateAttr(default_factory=dict)
+
+    @staticmethod
+    def _prefetch_key(tool_name: str, arguments: dict[str, Any]) -> str:
+        return f"{tool_name}:{json.dumps(arguments, sort_keys=True, default=str)}"
+
+    def start_prefetch(self, tool_name: str, arguments: dict[str, Any], coroutine: Coroutine) -> None:
+        """Run a tool prefetch in the background until the tool call takes
+        it."""
+        key = self._prefetch_key(tool_name, arguments)
+        if key in self._prefetches:
+            coroutine.close()
+            return
+        self._prefetches[key] = asyncio.create_task(coroutine)
+
+    async def take_prefetch(self, tool_name: str, arguments: dict[str, Any]) -> Any | None:
+        """Result of the prefetch started for the same tool arguments, None if
+        there is none or it failed."""
+        task = self._prefetches.pop(self._prefetch_key(tool_name, arguments), None)
+        if task is None:
+            return None
+        try:
+            return await task
+        except Exception as e:
+            logger.warning(f"Prefetch of {tool_name} failed, calling the tool as usual: {e}")
+            return None
+
+    def cancel_prefetches(self) -> None:
+        """Cancel prefetches no tool call has taken."""
+        for task in self._prefetches.values():
+            task.cancel()
+        self._prefetches.clear()
+
+    def order_source_numbering(self, tools: list[Any]) -> None:
+        """Make the concurrently running tool calls number new sources in
+        tool call order instead of completion order."""
+        self._numbering_turns = {id(tool): (i, asyncio.Event()) for i, tool in enumerate(tools)}
+
+    @asynccontextmanager
+    async def numbering_sources(self, tool: Any) -> AsyncIterator[None]:
+        """Block in which the tool call assigns citation numbers to new
+        sources.
+
+        In an ordered batch it first waits until every preceding tool
+        call has numbered its sources or finished.
+        """
+        turn = self._numbering_turns.get(id(tool))
+        if turn is not None:
+            for index, done in list(self._numbering_turns.values()):
+                if index < turn[0]:
+                    await done.wait()
+        try:
+            yield
+        finally:
+            self.release_source_numbering(tool)
+
+    def release_source_numbering(self, tool: Any) -> None:
+        """Let the following tool calls of the batch number their
+        sources."""
+        turn = self._numbering_turns.get(id(tool))
+        if turn is not None:
+            turn[1].set()
+
     def agent_state(self) -> dict:
         return self.model_dump(exclude={"searches", "sources", "clarification_received"})
 
 
-class AgentStatistics(BaseModel):
-    pass
+class AgentCheckpoint(BaseModel):
+    """Serializable state of an agent at an iteration boundary, enough to
+    rebuild it in another process and continue its loop."""
+
+    version: int = Field(default=1, description="Checkpoint format version")
+    agent_id: str = Field(description="Agent ID")
+    definition_name: str = Field(description="Name of the agent definition the agent is rebuilt from")
+    task: str = Field(description="Agent task")
+    creation_time: datetime = Field(description="Agent creation time, part of the prompt")
+    iteration: int = Field(description="Number of finished iterations")
+    toolkit: list[str] = Field(description="Names of the agent tools, in toolkit order")
+    context: dict[str, Any] = Field(description="Agent context without synchronization primitives")
+    conversation: list[dict[str, Any]] = Field(default_factory=list, description="Conversation messages")
+    log: list[dict[str, Any]] = Field(default_factory=list, description="Execution log")
+    deadline_remaining: float | None = Field(default=None, description="Seconds left of the run deadline")
+    saved_at: datetime = Field(default_factory=datetime.now, description="Checkpoint time")
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import copy
 import logging
 import operator
 from abc import ABC
+from collections import OrderedDict
 from functools import reduce
-from typing import Annotated, Literal, Type, TypeVar
+from typing import Annotated, Any, ClassVar, Literal, Type, TypeVar
 
 from pydantic import BaseModel, Field, create_model
 
@@ -22,6 +24,24 @@ class NextStepToolStub(ReasoningTool, ABC):
 
     function: T = Field(description="Select the appropriate tool for the next step")
 
+    _json_schemas: ClassVar[dict[type, dict[str, Any]]] = {}
+
+    @classmethod
+    def model_json_schema(cls, *args, **kwargs) -> dict[str, Any]:
+        """JSON schema of the model, generated once per built model for the
+        default arguments.
+
+        A copy is returned every time, as callers (e.g. openai strict
+        schema conversion) modify the schema in place.
+        """
+        if args or kwargs:
+            return super().model_json_schema(*args, **kwargs)
+        schema = NextStepToolStub._json_schemas.get(cls)
+        if schema is None:
+            schema = super().model_json_schema()
+            NextStepToolStub._json_schemas[cls] = schema
+        return copy.deepcopy(schema)
+
 
 class DiscriminantToolMixin(BaseModel):
     tool_name_discriminator: str = Field(..., description="Tool name discriminator")
@@ -35,7 +55,14 @@ class DiscriminantToolMixin(BaseModel):
 
 class NextStepToolsBuilder:
     """SGR Core - Builder for NextStepTool with a dynamic union tool function type on
-    pydantic models level."""
+    pydantic models level.
+
+    Built models are cached by the set of tools, so each distinct toolset is
+    built once; the least recently used models are evicted past max_cache_size.
+    """
+
+    max_cache_size: ClassVar[int] = 64
+    _cache: ClassVar[OrderedDict[frozenset[type[BaseTool]], Type[NextStepToolStub]]] = OrderedDict()
 
     @classmethod
     def _create_discriminant_tool(cls, tool_class: Type[T]) -> Type[BaseModel]:
@@ -60,8 +87,25 @@ class NextStepToolsBuilder:
 
     @classmethod
     def build_NextStepTools(cls, tools_list: list[Type[T]]) -> Type[NextStepToolStub]:  # noqa
-        return create_model(
+        key = frozenset(tools_list)
+        model = cls._cache.get(key)
+        if model is not None:
+            cls._cache.move_to_end(key)
+            return model
+
+        model = create_model(
             "NextStepTools",
             __base__=NextStepToolStub,
             function=(cls._create_tool_types_union(tools_list), Field()),
         )
+        cls._cache[key] = model
+        while len(cls._cache) > cls.max_cache_size:
+            _, evicted = cls._cache.popitem(last=False)
+            NextStepToolStub._json_schemas.pop(evicted, None)
+        return model
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all built models and their schemas."""
+        cls._cache.clear()
+        NextStepToolStub._json_schemas.clear()
@@ -1,9 +1,20 @@
 """Services module for external integrations and business logic."""
 
+from sgr_agent_core.services.cassette import Cassette
+from sgr_agent_core.services.checkpoint_store import CheckpointStore
+from sgr_agent_core.services.client_pool import LLMClientPool
+from sgr_agent_core.services.concurrency_limiter import AdaptiveLimit, ConcurrencyLimiter
+from sgr_agent_core.services.context_compactor import ContextCompactor
+from sgr_agent_core.services.endpoint_balancer import EndpointBalancer
+from sgr_agent_core.services.incremental_json import IncrementalJSONParser
 from sgr_agent_core.services.mcp_service import MCP2ToolConverter
 from sgr_agent_core.services.prompt_loader import PromptLoader
 from sgr_agent_core.services.registry import AgentRegistry, ToolRegistry
+from sgr_agent_core.services.request_hedger import RequestHedger
+from sgr_agent_core.services.response_cache import ResponseCache
 from sgr_agent_core.services.tavily_search import TavilySearchService
+from sgr_agent_core.services.tool_prefetcher import ToolPrefetcher
+from sgr_agent_core.services.tool_schema_cache import ToolSchemaCache
 
 __all__ = [
     "TavilySearchService",
@@ -11,4 +22,16 @@ __all__ = [
     "ToolRegistry",
     "AgentRegistry",
     "PromptLoader",
+    "LLMClientPool",
+    "ToolSchemaCache",
+    "ContextCompactor",
+    "RequestHedger",
+    "EndpointBalancer",
+    "ConcurrencyLimiter",
+    "AdaptiveLimit",
+    "IncrementalJSONParser",
+    "ToolPrefetcher",
+    "ResponseCache",
+    "Cassette",
+    "CheckpointStore",
 ]
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, Literal, TypeVar
+
+from sgr_agent_core.services.response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Cassette:
+    """Process-wide recorder of external I/O for offline agent runs.
+
+    In record mode every LLM stream, Tavily search/extract response and
+    MCP tool call is captured with its timing and written to a cassette
+    file. In replay mode the recorded responses are served instead of
+    calling the network, matched by request and in recorded order for
+    identical requests, with the original timing multiplied by
+    time_scale (0 replays instantly).
+    """
+
+    VERSION = 1
+
+    _mode: Literal["record", "replay"] | None = None
+    _path: Path | None = None
+    _time_scale: float = 1.0
+    _recorded: list[dict[str, Any]] = []
+    _replayed: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+
+    def __init__(self):
+        raise TypeError(f"{self.__class__.__name__} is a static class and cannot be instantiated")
+
+    @classmethod
+    def is_recording(cls) -> bool:
+        return cls._mode == "record"
+
+    @classmethod
+    def is_replaying(cls) -> bool:
+        return cls._mode == "replay"
+
+    @classmethod
+    def start(cls, path: str | Path, mode: Literal["record", "replay"], time_scale: float = 1.0) -> None:
+        """Start recording to or replaying from the cassette file.
+
+        Args:
+            path: Cassette file
+            mode: "record" or "replay"
+            time_scale: Multiplier of the recorded timing on replay
+        """
+        cls.stop()
+        cls._path = Path(path)
+        cls._time_scale = time_scale
+        if mode == "replay":
+            with open(cls._path, encoding="utf-8") as f:
+                for interaction in json.load(f)["interactions"]:
+                    cls._replayed[cls._key(interaction["kind"], interaction["key"])].append(interaction)
+        cls._mode = mode
+        logger.info(f"📼 Cassette {mode} started: {cls._path}")
+
+    @classmethod
+    def stop(cls) -> None:
+        """Stop the cassette, writing the recorded interactions."""
+        if cls.is_recording():
+            cls._path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cls._path, "w", encoding="utf-8") as f:
+                json.dump({"version": cls.VERSION, "interactions": cls._recorded}, f, ensure_ascii=False)
+            logger.info(f"📼 Cassette saved: {len(cls._recorded)} interactions to {cls._path}")
+        cls._mode = None
+        cls._path = None
+        cls._time_scale = 1.0
+        cls._recorded = []
+        cls._replayed.clear()
+
+    @classmethod
+    @contextmanager
+    def use(
+        cls, path: str | Path, mode: Literal["record", "replay"], time_scale: float = 1.0
+    ) -> Iterator[type["Cassette"]]:
+        """Record or replay external I/O inside the block."""
+        cls.start(path, mode, time_scale)
+        try:
+            yield cls
+        finally:
+            cls.stop()
+
+    @staticmethod
+    def _key(kind: str, request_key: str) -> str:
+        return f"{kind}:{request_key}"
+
+    @classmethod
+    def add(cls, kind: str, request: dict[str, Any], response: Any, duration: float) -> None:
+        """Record an interaction; response must be JSON serializable."""
+        cls._recorded.append(
+            {"kind": kind, "key": ResponseCache.key(request), "duration": duration, "response": response}
+        )
+
+    @classmethod
+    def take(cls, kind: str, request: dict[str, Any]) -> dict[str, Any]:
+        """Next recorded interaction matching the request.
+
+        Raises:
+            LookupError: Nothing left to replay for the request
+        """
+        interactions = cls._replayed.get(cls._key(kind, ResponseCache.key(request)))
+        if not interactions:
+            raise LookupError(f"Cassette {cls._path} has no recorded {kind} call matching the request")
+        return interactions.popleft()
+
+    @classmethod
+    async def sleep(cls, seconds: float) -> None:
+        """Sleep for the recorded time, scaled."""
+        if seconds * cls._time_scale > 0:
+            await asyncio.sleep(seconds * cls._time_scale)
+
+    @classmethod
+    async def call(cls, kind: str, request: dict[str, Any], call: Callable[[], Awaitable[T]]) -> T:
+        """Run the external call, recording or replaying its JSON
+        serializable result depending on the cassette mode.
+
+        Args:
+            kind: Kind of the call, e.g. "tavily_search"
+            request: Call parameters the interaction is matched by
+            call: Runs the real call
+
+        Returns:
+            Result of the call
+        """
+        if cls.is_replaying():
+            interaction = cls.take(kind, request)
+            await cls.sleep(interaction["duration"])
+            return interaction["response"]
+        if not cls.is_recording():
+            return await call()
+        started = time.perf_counter()
+        result = await call()
+        cls.add(kind, request, result, duration=time.perf_counter() - started)
+        return result
@@ -0,0 +1,99 @@
+import logging
+import os
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from sgr_agent_core.models import AgentCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """On-disk agent checkpoints, one JSON file per agent.
+
+    Files are replaced atomically, so a process killed while writing
+    leaves the previous checkpoint readable.
+    """
+
+    def __init__(self):
+        raise TypeError(f"{self.__class__.__name__} is a static class and cannot be instantiated")
+
+    @staticmethod
+    def path(checkpoint_dir: str, agent_id: str) -> Path:
+        return Path(checkpoint_dir) / f"{agent_id}.json"
+
+    @classmethod
+    def save(cls, checkpoint_dir: str, checkpoint: AgentCheckpoint) -> bool:
+        """Write the checkpoint of the agent, replacing the previous one.
+
+        Errors are logged and the previous checkpoint is kept.
+
+        Returns:
+            Whether the checkpoint was written
+        """
+        path = cls.path(checkpoint_dir, checkpoint.agent_id)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            data = checkpoint.model_dump_json()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to save checkpoint of agent {checkpoint.agent_id} to {path}: {e}")
+            return False
+        return True
+
+    @classmethod
+    def load(cls, checkpoint_dir: str, agent_id: str) -> AgentCheckpoint | None:
+        """Checkpoint of the agent, None if there is no readable one."""
+        path = cls.path(checkpoint_dir, agent_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return AgentCheckpoint.model_validate_json(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValidationError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+    @classmethod
+    def claim(cls, checkpoint_dir: str, agent_id: str) -> AgentCheckpoint | None:
+        """Take the checkpoint of the agent off the disk to resume it.
+
+        The file is renamed away before it is read, so of several processes
+        sharing the directory only one gets the checkpoint.
+
+        Returns:
+            The checkpoint, None if there is no readable one or another
+            process claimed it first
+        """
+        path = cls.path(checkpoint_dir, agent_id)
+        claimed_path = path.with_suffix(f".{os.getpid()}.claimed")
+        try:
+            os.rename(path, claimed_path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to claim checkpoint {path}: {e}")
+            return None
+        try:
+            with open(claimed_path, encoding="utf-8") as f:
+                return AgentCheckpoint.model_validate_json(f.read())
+        except (OSError, ValidationError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+        finally:
+            claimed_path.unlink(missing_ok=True)
+
+    @classmethod
+    def delete(cls, checkpoint_dir: str, agent_id: str) -> None:
+        cls.path(checkpoint_dir, agent_id).unlink(missing_ok=True)
+
+    @staticmethod
+    def list_ids(checkpoint_dir: str) -> list[str]:
+        """Ids of the agents with a checkpoint, e.g. to resume them after a
+        restart."""
+        directory = Path(checkpoint_dir)
+        return sorted(path.stem for path in directory.glob("*.json")) if directory.is_dir() else []
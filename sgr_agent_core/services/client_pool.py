@@ -0,0 +1,74 @@
+import logging
+from typing import TYPE_CHECKING
+
+import httpx
+from openai import DEFAULT_TIMEOUT, AsyncOpenAI
+
+if TYPE_CHECKING:
+    from sgr_agent_core.agent_definition import LLMConfig
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClientPool:
+    """Process-wide pool of AsyncOpenAI clients.
+
+    Agents pointing to the same endpoint share one client, so HTTP
+    connections (and TLS sessions) are kept alive and reused between
+    requests instead of being opened for every agent. Connection limits
+    are taken from the LLMConfig that created the client first.
+    """
+
+    _clients: dict[tuple[str, str | None, str | None], AsyncOpenAI] = {}
+
+    def __init__(self):
+        raise TypeError(f"{self.__class__.__name__} is a static class and cannot be instantiated")
+
+    @staticmethod
+    def _key(llm_config: "LLMConfig") -> tuple[str, str | None, str | None]:
+        return llm_config.base_url, llm_config.api_key, llm_config.proxy
+
+    @classmethod
+    def get(cls, llm_config: "LLMConfig") -> AsyncOpenAI:
+        """Get a shared client for the endpoint of the configuration, creating
+        it on first use.
+
+        Args:
+            llm_config: LLM configuration
+
+        Returns:
+            Pooled AsyncOpenAI client
+        """
+        key = cls._key(llm_config)
+        client = cls._clients.get(key)
+        if client is None or client.is_closed():
+            http_client = httpx.AsyncClient(
+                proxy=llm_config.proxy,
+                timeout=DEFAULT_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=llm_config.max_connections,
+                    max_keepalive_connections=llm_config.max_keepalive_connections,
+                    keepalive_expiry=llm_config.keepalive_expiry,
+                ),
+            )
+            client = AsyncOpenAI(base_url=llm_config.base_url, api_key=llm_config.api_key, http_client=http_client)
+            cls._clients[key] = client
+            logger.info(f"Created pooled LLM client for {llm_config.base_url}")
+        return client
+
+    @classmethod
+    def size(cls) -> int:
+        """Number of pooled clients."""
+        return len(cls._clients)
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close all pooled clients and their connections."""
+        clients, cls._clients = list(cls._clients.values()), {}
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close LLM client for {client.base_url}: {e}")
+        logger.info(f"Closed {len(clients)} pooled LLM clients")
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Callable
+
+import openai
+
+if TYPE_CHECKING:
+    from sgr_agent_core.agent_definition import LLMConfig
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimit:
+    """In-flight request limit of one endpoint, adapted AIMD-style.
+
+    Every successful call raises the limit by 1/limit (about +1 per
+    round of requests), a rate limit response halves it and a call with
+    the first token later than the latency target shrinks it by a
+    tenth. Requests over the limit wait in FIFO order.
+    """
+
+    def __init__(self, min_limit: int, max_limit: int):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self.queue_depth:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over right before cancellation
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake_up()
+
+    def _wake_up(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def increase(self) -> None:
+        self.limit = min(self.limit + 1 / self.limit, float(self.max_limit))
+        self._wake_up()
+
+    def decrease(self, factor: float) -> None:
+        self.limit = max(self.limit * factor, float(self.min_limit))
+
+    def stats(self) -> dict[str, float]:
+        return {"limit": round(self.limit, 2), "in_flight": self.in_flight, "queue_depth": self.queue_depth}
+
+
+class ConcurrencyLimiter:
+    """Process-wide adaptive limiter of concurrent LLM requests per
+    endpoint.
+
+    Shared by all agents, so a burst of new chats queues up in the
+    process instead of flooding the provider with requests it answers
+    with 429 and retries.
+    """
+
+    RATE_LIMITED_FACTOR = 0.5
+    SLOW_FACTOR = 0.9
+
+    _limits: dict[str, AdaptiveLimit] = {}
+
+    def __init__(self):
+        raise TypeError(f"{self.__class__.__name__} is a static class and cannot be instantiated")
+
+    @classmethod
+    def get(cls, key: str, llm_config: "LLMConfig") -> AdaptiveLimit:
+        limit = cls._limits.get(key)
+        if limit is None:
+            limit = AdaptiveLimit(llm_config.min_concurrent_requests, llm_config.max_concurrent_requests)
+            cls._limits[key] = limit
+        return limit
+
+    @classmethod
+    @asynccontextmanager
+    async def slot(cls, key: str, llm_config: "LLMConfig") -> AsyncIterator[Callable[[], None]]:
+        """Hold one in-flight request slot of the endpoint while the request
+        runs, adapting the limit to its outcome.
+
+        Yields a callback the request calls on its first streamed token.
+        The latency compared to latency_target ends there, so time spent
+        streaming to a slow client does not count against the endpoint.
+        Does nothing if max_concurrent_requests is not configured.
+        """
+        first_token_at: list[float] = []
+
+        def first_token() -> None:
+            if not first_token_at:
+                first_token_at.append(time.perf_counter())
+
+        if not llm_config.max_concurrent_requests:
+            yield first_token
+            return
+        limit = cls.get(key, llm_config)
+        await limit.acquire()
+        started = time.perf_counter()
+        try:
+            yield first_token
+        except openai.RateLimitError:
+            limit.decrease(cls.RATE_LIMITED_FACTOR)
+            logger.warning(f"LLM endpoint {key} is rate limited, concurrency limit lowered to {limit.limit:.1f}")
+            raise
+        else:
+            target = llm_config.latency_target
+            latency = (first_token_at[0] if first_token_at else time.perf_counter()) - started
+            if target and latency > target:
+                limit.decrease(cls.SLOW_FACTOR)
+            else:
+                limit.increase()
+        finally:
+            limit.release()
+
+    @classmethod
+    def stats(cls) -> dict[str, dict[str, float]]:
+        """Current limit, in-flight requests and queue depth per endpoint."""
+        return {key: limit.stats() for key, limit in cls._limits.items()}
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._limits.clear()
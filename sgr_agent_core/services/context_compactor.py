@@ -0,0 +1,83 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class ContextCompactor:
+    """Keeps the prompt of long agent runs within a token budget.
+
+    Tokens are estimated from the message length. When the budget is
+    exceeded, the oldest tool results are replaced in place with short
+    digests: the head of the result and every `[n] title - url` citation
+    line, so the model can still refer to found sources by number.
+    Compacted messages never change again, keeping the prompt prefix
+    cacheable between calls.
+    """
+
+    CHARS_PER_TOKEN = 4
+    DIGEST_MARKER = "[Compacted tool result]"
+    CITATION_LINE = re.compile(r"^\[\d+\] .+$", re.MULTILINE)
+
+    def __init__(self):
+        raise TypeError(f"{self.__class__.__name__} is a static class and cannot be instantiated")
+
+    @classmethod
+    def estimate_tokens(cls, messages: list[dict]) -> int:
+        """Rough token count of OpenAI-like messages."""
+        chars = 0
+        for message in messages:
+            chars += len(message.get("content") or "")
+            for tool_call in message.get("tool_calls") or []:
+                chars += len(tool_call["function"]["arguments"])
+        return chars // cls.CHARS_PER_TOKEN
+
+    @classmethod
+    def digest(cls, content: str, max_chars: int) -> str:
+        """Short version of a tool result keeping its head and citation
+        lines."""
+        head = content[:max_chars]
+        if len(content) > max_chars and "\n" in head:
+            head = head[: head.rindex("\n")]
+        citations = [line for line in cls.CITATION_LINE.findall(content) if line not in head]
+        return "\n".join([cls.DIGEST_MARKER, head.strip(), *citations, f"[{len(content)} characters omitted]"])
+
+    @classmethod
+    def compact(
+        cls,
+        conversation: list[dict],
+        token_budget: int,
+        keep_recent: int,
+        digest_chars: int,
+        reserved_tokens: int = 0,
+    ) -> int:
+        """Replace the oldest tool results with digests until the estimated
+        prompt fits the budget.
+
+        Args:
+            conversation: Agent conversation, modified in place
+            token_budget: Estimated token budget of the whole prompt
+            keep_recent: Number of latest messages that are never compacted
+            digest_chars: Maximum head length kept in a digest
+            reserved_tokens: Tokens of prompt parts outside the conversation
+
+        Returns:
+            Number of compacted messages
+        """
+        tokens = reserved_tokens + cls.estimate_tokens(conversation)
+        compacted = 0
+        for message in conversation[: max(len(conversation) - keep_recent, 0)]:
+            if tokens <= token_budget:
+                break
+            content = message.get("content")
+            if message.get("role") != "tool" or not content or content.startswith(cls.DIGEST_MARKER):
+                continue
+            digest = cls.digest(content, digest_chars)
+            if len(digest) >= len(content):
+                continue
+            tokens -= (len(content) - len(digest)) // cls.CHARS_PER_TOKEN
+            message["content"] = digest
+            compacted += 1
+        if compacted:
+            logger.info(f"Compacted {compacted} tool results, estimated prompt size: {tokens} tokens")
+        return compacted
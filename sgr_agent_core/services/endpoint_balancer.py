@@ -0,0 +1,104 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
+import openai
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from sgr_agent_core.agent_definition import LLMConfig, LLMEndpoint
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointState(BaseModel):
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+
+
+class EndpointBalancer:
+    """Process-wide routing of LLM requests between endpoint replicas.
+
+    Endpoints are chosen by weight or by the least outstanding requests
+    per weight. Failures (5xx, 429, connection errors and timeouts) are
+    tracked passively: after circuit_breaker_threshold consecutive ones
+    the endpoint is skipped for circuit_breaker_cooldown seconds, then
+    probed again by regular traffic.
+    """
+
+    _states: dict[str, EndpointState] = {}
+
+    def __init__(self):
+        raise TypeError(f"{self.__class__.__name__} is a static class and cannot be instantiated")
+
+    @classmethod
+    def state(cls, endpoint: "LLMEndpoint") -> EndpointState:
+        return cls._states.setdefault(endpoint.base_url, EndpointState())
+
+    @classmethod
+    def is_available(cls, endpoint: "LLMEndpoint") -> bool:
+        return cls.state(endpoint).open_until <= time.monotonic()
+
+    @classmethod
+    def select(cls, llm_config: "LLMConfig", exclude: list["LLMEndpoint"] | None = None) -> "LLMEndpoint":
+        """Choose the endpoint for the next request.
+
+        Args:
+            llm_config: LLM configuration with endpoints
+            exclude: Endpoints already tried for this request
+
+        Returns:
+            Selected endpoint; if every circuit is open, the one closest to
+            recovery is returned rather than failing
+        """
+        candidates = [endpoint for endpoint in llm_config.endpoints if endpoint not in (exclude or [])]
+        if not candidates:
+            raise ValueError("No LLM endpoints left to try")
+        available = [endpoint for endpoint in candidates if cls.is_available(endpoint)]
+        if not available:
+            endpoint = min(candidates, key=lambda endpoint: cls.state(endpoint).open_until)
+            logger.warning(f"All LLM endpoint circuits are open, trying {endpoint.base_url}")
+            return endpoint
+        if llm_config.routing == "weighted":
+            return random.choices(available, weights=[endpoint.weight for endpoint in available])[0]
+        return min(available, key=lambda endpoint: cls.state(endpoint).outstanding / endpoint.weight)
+
+    @staticmethod
+    def is_endpoint_failure(error: BaseException) -> bool:
+        """Whether the error means the endpoint is unhealthy and the request
+        can go to another one."""
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code >= 500 or error.status_code == 429
+        return isinstance(error, openai.APIConnectionError)
+
+    @classmethod
+    @contextmanager
+    def track(cls, endpoint: "LLMEndpoint", llm_config: "LLMConfig") -> Iterator[None]:
+        """Account a request to the endpoint: outstanding requests and
+        health."""
+        state = cls.state(endpoint)
+        state.outstanding += 1
+        try:
+            yield
+        except Exception as e:
+            if cls.is_endpoint_failure(e):
+                state.consecutive_failures += 1
+                if state.consecutive_failures >= llm_config.circuit_breaker_threshold:
+                    state.open_until = time.monotonic() + llm_config.circuit_breaker_cooldown
+                    logger.warning(
+                        f"LLM endpoint {endpoint.base_url} failed {state.consecutive_failures} times in a row, "
+                        f"circuit opened for {llm_config.circuit_breaker_cooldown:.0f}s"
+                    )
+            raise
+        else:
+            state.consecutive_failures = 0
+            state.open_until = 0.0
+        finally:
+            state.outstanding -= 1
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._states.clear()
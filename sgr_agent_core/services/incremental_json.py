@@ -0,0 +1,134 @@
+import json
+from typing import Any
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "start", "phase", "key")
+
+    def __init__(self, kind: str, path: tuple | None, start: int):
+        self.kind = kind  # "object" or "array"
+        self.path = path
+        self.start = start
+        # object: key -> colon -> value -> after_value; array: value -> after_value
+        self.phase = "key" if kind == "object" else "value"
+        self.key: str | None = None
+
+
+class IncrementalJSONParser:
+    """Parser of a JSON document arriving in chunks, e.g. streamed tool call
+    arguments.
+
+    feed() returns object members whose values became complete with the
+    chunk, as (path, value) pairs, where path is the tuple of keys from
+    the root. Members of nested objects are reported as well; array items
+    are reported only as part of the whole array. Invalid input stops
+    parsing silently, see `failed`.
+    """
+
+    _SCALAR_END = ",}] \t\r\n"
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._string_start: int | None = None
+        self._escape = False
+        self._scalar_start: int | None = None
+        self.done = False
+        self.failed = False
+
+    def feed(self, chunk: str) -> list[tuple[tuple[str, ...], Any]]:
+        completed = []
+        if self.done or self.failed:
+            return completed
+        self._text += chunk
+        try:
+            while self._pos < len(self._text) and not self.done:
+                self._step(self._text[self._pos], completed)
+                self._pos += 1
+        except (ValueError, IndexError):
+            self.failed = True
+        return completed
+
+    def _step(self, char: str, completed: list) -> None:
+        if self._string_start is not None:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                start, self._string_start = self._string_start, None
+                frame = self._stack[-1]
+                if frame.kind == "object" and frame.phase == "key":
+                    frame.key = json.loads(self._text[start : self._pos + 1])
+                    frame.phase = "colon"
+                else:
+                    self._value_done(start, completed)
+            return
+
+        if self._scalar_start is not None:
+            if char not in self._SCALAR_END:
+                return
+            start, self._scalar_start = self._scalar_start, None
+            self._text_value_done(start, self._pos, completed)
+
+        if char in " \t\r\n":
+            return
+        frame = self._stack[-1] if self._stack else None
+
+        if frame is not None and frame.phase == "after_value":
+            if char == ",":
+                frame.phase = "key" if frame.kind == "object" else "value"
+                return
+            self._close(char, completed)
+            return
+        if frame is not None and frame.kind == "object":
+            if frame.phase == "key":
+                if char == '"':
+                    self._string_start = self._pos
+                    return
+                self._close(char, completed)
+                return
+            if frame.phase == "colon":
+                if char != ":":
+                    raise ValueError(f"Expected ':' at {self._pos}")
+                frame.phase = "value"
+                return
+        if frame is not None and frame.kind == "array" and char == "]":
+            self._close(char, completed)
+            return
+        self._value_start(char)
+
+    def _value_start(self, char: str) -> None:
+        if char in "{[":
+            parent = self._stack[-1] if self._stack else None
+            path = ()
+            if parent is not None:
+                # members of objects inside arrays are not reported
+                path = parent.path + (parent.key,) if parent.kind == "object" and parent.path is not None else None
+            self._stack.append(_Frame("object" if char == "{" else "array", path, self._pos))
+        elif char == '"':
+            self._string_start = self._pos
+        elif char in "-0123456789tfn":
+            self._scalar_start = self._pos
+        else:
+            raise ValueError(f"Unexpected {char!r} at {self._pos}")
+
+    def _close(self, char: str, completed: list) -> None:
+        frame = self._stack[-1]
+        if char != ("}" if frame.kind == "object" else "]"):
+            raise ValueError(f"Unexpected {char!r} at {self._pos}")
+        self._stack.pop()
+        if not self._stack:
+            self.done = True
+            return
+        self._value_done(frame.start, completed)
+
+    def _value_done(self, start: int, completed: list) -> None:
+        self._text_value_done(start, self._pos + 1, completed)
+
+    def _text_value_done(self, start: int, end: int, completed: list) -> None:
+        frame = self._stack[-1]
+        if frame.kind == "object" and frame.path is not None:
+            completed.append((frame.path + (frame.key,), json.loads(self._text[start:end])))
+        frame.phase = "after_value"
@@ -6,6 +6,8 @@ from fastmcp.mcp_config import MCPConfig
 from jambo import SchemaConverter
 from pydantic import create_model
 
+from sgr_agent_core.services.tool_schema_cache import ToolSchemaCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,6 +46,8 @@ class MCP2ToolConverter:
                 ToolCls.tool_name = t.name
                 ToolCls.description = t.description or ""
                 ToolCls._client = client
+                # drop schemas of the same MCP tool built for previous agents
+                ToolSchemaCache.invalidate(name=ToolCls.tool_name)
                 tools.append(ToolCls)
                 logger.info(f"Built MCP Tool: {ToolCls.tool_name}")
 
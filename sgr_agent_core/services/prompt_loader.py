@@ -22,9 +22,10 @@ class PromptLoader:
 
     @classmethod
     def get_initial_user_request(
-        cls, task: str, prompts_config: "PromptsConfig", current_datetime=datetime.now()
+        cls, task: str, prompts_config: "PromptsConfig", current_datetime: datetime | None = None
     ) -> str:
         template = prompts_config.initial_user_request
+        current_datetime = current_datetime or datetime.now()
         try:
             return template.format(task=task, current_date=current_datetime.strftime("%Y-%m-%d %H:%M:%S"))
         except KeyError as e:
@@ -32,9 +33,10 @@ class PromptLoader:
 
     @classmethod
     def get_clarification_template(
-        cls, clarifications: str, prompts_config: "PromptsConfig", current_datetime=datetime.now()
+        cls, clarifications: str, prompts_config: "PromptsConfig", current_datetime: datetime | None = None
     ) -> str:
         template = prompts_config.clarification_response
+        current_datetime = current_datetime or datetime.now()
         try:
             return template.format(
                 clarifications=clarifications, current_date=current_datetime.strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from functools import partial
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# attempt(index, claim) runs one copy of the request; it must call claim() on
+# its first streamed token and stop if claim() returns False (another copy won)
+Attempt = Callable[[int, Callable[[], bool]], Awaitable[T]]
+
+
+class RequestHedger:
+    """Hedges slow streamed LLM requests with a duplicate request.
+
+    Times to first token are tracked per endpoint. If the first token of
+    a request does not arrive within the given percentile of recent ones,
+    a second copy is sent and the copy streaming first wins; the other
+    one is cancelled. The share of hedged requests is capped per
+    endpoint.
+    """
+
+    WINDOW = 200
+    MIN_SAMPLES = 10
+
+    _latencies: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=RequestHedger.WINDOW))
+    _hedged: dict[str, deque[bool]] = defaultdict(lambda: deque(maxlen=RequestHedger.WINDOW))
+
+    def __init__(self):
+        raise TypeError(f"{self.__class__.__name__} is a static class and cannot be instantiated")
+
+    @classmethod
+    def record_latency(cls, key: str, time_to_first_token: float) -> None:
+        cls._latencies[key].append(time_to_first_token)
+
+    @classmethod
+    def hedge_delay(cls, key: str, percentile: float, min_delay: float) -> float | None:
+        """Time to wait for the first token before hedging, None while there
+        are too few samples."""
+        latencies = sorted(cls._latencies[key])
+        if len(latencies) < cls.MIN_SAMPLES:
+            return None
+        index = min(int(len(latencies) * percentile / 100), len(latencies) - 1)
+        return max(latencies[index], min_delay)
+
+    @classmethod
+    def hedge_rate(cls, key: str) -> float:
+        hedged = cls._hedged[key]
+        return sum(hedged) / len(hedged) if hedged else 0.0
+
+    @classmethod
+    def _allow_hedge(cls, key: str, max_rate: float) -> bool:
+        hedged = cls._hedged[key]
+        return (sum(hedged) + 1) / (len(hedged) + 1) <= max_rate
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._latencies.clear()
+        cls._hedged.clear()
+
+    @classmethod
+    async def run(cls, key: str, attempt: Attempt[T], percentile: float, min_delay: float, max_rate: float) -> T:
+        """Run the request, hedging it if the first token is late.
+
+        Args:
+            key: Endpoint key the latency statistics are kept for
+            attempt: Request runner, see Attempt
+            percentile: Percentile of recent times to first token to wait before hedging
+            min_delay: Minimal wait before hedging, seconds
+            max_rate: Maximal share of hedged requests
+
+        Returns:
+            Result of the winning attempt
+        """
+        started = time.perf_counter()
+        winner: list[int] = []
+        first_token = asyncio.Event()
+
+        def claim(index: int) -> bool:
+            if not winner:
+                winner.append(index)
+                cls.record_latency(key, time.perf_counter() - started)
+                first_token.set()
+            return winner[0] == index
+
+        tasks = [asyncio.create_task(attempt(0, partial(claim, 0)))]
+        first_token_task = asyncio.create_task(first_token.wait())
+        try:
+            delay = cls.hedge_delay(key, percentile, min_delay)
+            hedged = False
+            if delay is not None:
+                done, _ = await asyncio.wait(
+                    [tasks[0], first_token_task], timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done and cls._allow_hedge(key, max_rate):
+                    logger.info(f"No first token from {key} in {delay:.2f}s, hedging the request")
+                    tasks.append(asyncio.create_task(attempt(1, partial(claim, 1))))
+                    hedged = True
+            cls._hedged[key].append(hedged)
+
+            # wait for the first streamed token or for every attempt to end
+            while not first_token.is_set() and not all(task.done() for task in tasks):
+                pending = [task for task in tasks if not task.done()]
+                await asyncio.wait([*pending, first_token_task], return_when=asyncio.FIRST_COMPLETED)
+
+            if winner:
+                result = tasks[winner[0]]
+            else:
+                # nothing was streamed: prefer an attempt that succeeded, otherwise raise the primary error
+                result = next((task for task in tasks if task.done() and not task.exception()), tasks[0])
+            for task in tasks:
+                if task is result:
+                    continue
+                if task.done() and not task.cancelled():
+                    task.exception()  # retrieved, the loser error is not relevant
+                task.cancel()
+            return await result
+        finally:
+            first_token_task.cancel()
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from openai import NOT_GIVEN
+from openai.lib.streaming.chat import ChatCompletionStreamEvent, ChatCompletionStreamState
+from openai.types.chat import ChatCompletionChunk
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from sgr_agent_core.agent_definition import LLMConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """On-disk cache of streamed LLM responses for deterministic replays.
+
+    Responses are stored as content-addressed JSON files with the raw
+    stream chunks, keyed by a hash of the whole request: model, messages,
+    tools or response format and sampling parameters. Timestamps in the
+    request are masked, so the task date in the prompt does not make
+    every run a miss. Replayed chunks go through the same stream state
+    as live ones and produce the same parsed completion.
+    """
+
+    TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}")
+
+    def __init__(self):
+        raise TypeError(f"{self.__class__.__name__} is a static class and cannot be instantiated")
+
+    @staticmethod
+    def is_enabled(llm_config: "LLMConfig") -> bool:
+        """Whether responses of the configuration are cached: a cache
+        directory is set and sampling is greedy or caching is forced."""
+        return bool(llm_config.response_cache_dir) and (
+            llm_config.temperature == 0 or llm_config.response_cache_any_temperature
+        )
+
+    @staticmethod
+    def _encode(value: Any) -> Any:
+        if isinstance(value, type) and issubclass(value, BaseModel):
+            return {"name": value.__name__, "schema": value.model_json_schema()}
+        if isinstance(value, BaseModel):
+            return value.model_dump(mode="json")
+        return repr(value)
+
+    @classmethod
+    def key(cls, request: dict[str, Any]) -> str:
+        """Content hash of the completion request."""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=cls._encode)
+        return hashlib.sha256(cls.TIMESTAMP.sub("<timestamp>", payload).encode()).hexdigest()
+
+    @staticmethod
+    def _path(cache_dir: str, key: str) -> Path:
+        return Path(cache_dir) / key[:2] / f"{key}.json"
+
+    @classmethod
+    def load(cls, cache_dir: str, key: str) -> list[dict[str, Any]] | None:
+        """Stream chunks of the cached response, None on a miss."""
+        path = cls._path(cache_dir, key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)["chunks"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cached LLM response {path}: {e}")
+            return None
+
+    @classmethod
+    def save(cls, cache_dir: str, key: str, chunks: list[ChatCompletionChunk]) -> None:
+        """Store stream chunks of the response; the file is replaced
+        atomically so concurrent runs never read a partial one.
+
+        Write errors are logged and ignored, the cache is best effort.
+        """
+        path = cls._path(cache_dir, key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"chunks": [chunk.model_dump(mode="json") for chunk in chunks]}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to cache LLM response {path}: {e}")
+
+    @staticmethod
+    def stream_state(request: dict[str, Any]) -> ChatCompletionStreamState:
+        """Stream state turning replayed chunks of the request into the
+        same events and parsed completion as the live stream."""
+        return ChatCompletionStreamState(
+            input_tools=request.get("tools", NOT_GIVEN), response_format=request.get("response_format", NOT_GIVEN)
+        )
+
+    @classmethod
+    def replay(
+        cls, chunks: list[dict[str, Any]], request: dict[str, Any]
+    ) -> tuple[Iterator[list[ChatCompletionStreamEvent]], ChatCompletionStreamState]:
+        """Stream events of the stored response.
+
+        Returns:
+            Events of every chunk in turn, to consume at the pace of the
+            replay, and the stream state; its get_final_completion() gives
+            the parsed completion once the events are consumed
+        """
+        state = cls.stream_state(request)
+
+        def events() -> Iterator[list[ChatCompletionStreamEvent]]:
+            for data in chunks:
+                yield list(state.handle_chunk(ChatCompletionChunk.model_validate(data)))
+
+        return events(), state
@@ -4,6 +4,7 @@ from tavily import AsyncTavilyClient
 
 from sgr_agent_core.agent_definition import SearchConfig
 from sgr_agent_core.models import SourceData
+from sgr_agent_core.services.cassette import Cassette
 
 logger = logging.getLogger(__name__)
 
@@ -42,11 +43,8 @@ class TavilySearchService:
         logger.info(f"🔍 Tavily search: '{query}' (max_results={max_results})")
 
         # Execute search through Tavily
-        response = await self._client.search(
-            query=query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-        )
+        request = {"query": query, "max_results": max_results, "include_raw_content": include_raw_content}
+        response = await Cassette.call("tavily_search", request, lambda: self._client.search(**request))
 
         # Convert results to SourceData
         sources = self._convert_to_source_data(response)
@@ -63,7 +61,7 @@ class TavilySearchService:
         """
         logger.info(f"📄 Tavily extract: {len(urls)} URLs")
 
-        response = await self._client.extract(urls=urls)
+        response = await Cassette.call("tavily_extract", {"urls": urls}, lambda: self._client.extract(urls=urls))
 
         sources = []
         for i, result in enumerate(response.get("results", [])):
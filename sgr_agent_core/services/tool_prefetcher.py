@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from sgr_agent_core.services.incremental_json import IncrementalJSONParser
+
+if TYPE_CHECKING:
+    from sgr_agent_core.agent_definition import AgentConfig
+    from sgr_agent_core.base_tool import BaseTool
+    from sgr_agent_core.models import AgentContext
+
+logger = logging.getLogger(__name__)
+
+
+class ToolPrefetcher:
+    """Starts tool prefetches while the LLM is still streaming the tool
+    calls.
+
+    Arguments of streamed tool calls, and of the `function` of the SGR
+    next step structured output, are parsed incrementally. Once all
+    prefetch_fields of a tool are complete, its prefetch is started on
+    the agent context, overlapping the tool I/O with the rest of the
+    generation.
+    """
+
+    def __init__(
+        self,
+        tools: list[type[BaseTool]],
+        context: AgentContext,
+        config: AgentConfig,
+        max_prefetches: int | None = 1,
+    ):
+        self._tools = {tool.tool_name: tool for tool in tools if tool.prefetch_fields}
+        self._context = context
+        self._config = config
+        self._max_prefetches = max_prefetches
+        self._calls: dict[Any, dict[str, Any]] = {}
+        self.started = 0
+
+    def feed(self, event: Any) -> None:
+        """Process an event of the openai chat completion stream."""
+        if self._max_prefetches is not None and self.started >= self._max_prefetches:
+            return
+        if event.type == "tool_calls.function.arguments.delta":
+            self._feed(("tool_call", event.index), event.arguments_delta, prefix=(), name=event.name)
+        elif event.type == "content.delta":
+            self._feed("content", event.delta, prefix=("function",))
+
+    def _feed(self, key: Any, delta: str, prefix: tuple[str, ...], name: str | None = None) -> None:
+        call = self._calls.setdefault(key, {"parser": IncrementalJSONParser(), "arguments": {}, "started": False})
+        if call["started"] or call["parser"].failed:
+            return
+        for path, value in call["parser"].feed(delta):
+            if path[:-1] == prefix:
+                call["arguments"][path[-1]] = value
+
+        tool = self._tools.get(name or call["arguments"].get("tool_name_discriminator"))
+        if tool is None or not all(field in call["arguments"] for field in tool.prefetch_fields):
+            return
+        arguments = {field: call["arguments"][field] for field in tool.prefetch_fields}
+        call["started"] = True
+        self.started += 1
+        logger.info(f"⚡ Prefetching {tool.tool_name} with {arguments}")
+        self._context.start_prefetch(tool.tool_name, arguments, tool.prefetch(arguments, self._context, self._config))
@@ -0,0 +1,71 @@
+import logging
+from typing import TYPE_CHECKING
+
+from openai import pydantic_function_tool
+from openai.types.chat import ChatCompletionFunctionToolParam
+
+if TYPE_CHECKING:
+    from sgr_agent_core.base_tool import BaseTool
+
+logger = logging.getLogger(__name__)
+
+
+class ToolSchemaCache:
+    """Process-wide cache of compiled function tool params.
+
+    pydantic_function_tool builds the strict JSON schema of the tool
+    from scratch on every call. Agents request the same tools on every
+    iteration, so the ready-made params are kept per tool class and
+    name/description overrides. Returned params are shared between
+    agents and must not be modified.
+    """
+
+    _items: dict[tuple[type["BaseTool"], str, str | None], ChatCompletionFunctionToolParam] = {}
+
+    def __init__(self):
+        raise TypeError(f"{self.__class__.__name__} is a static class and cannot be instantiated")
+
+    @classmethod
+    def get(
+        cls,
+        tool: type["BaseTool"],
+        name: str | None = None,
+        description: str | None = None,
+    ) -> ChatCompletionFunctionToolParam:
+        """Get function tool params for the tool class, compiling them on
+        first use.
+
+        Args:
+            tool: Tool class
+            name: Function name (tool_name by default)
+            description: Function description (tool docstring by default)
+
+        Returns:
+            Function tool params usable in chat completion requests
+        """
+        key = (tool, name or tool.tool_name, description)
+        params = cls._items.get(key)
+        if params is None:
+            params = pydantic_function_tool(tool, name=key[1], description=description)
+            cls._items[key] = params
+        return params
+
+    @classmethod
+    def invalidate(cls, tool: type["BaseTool"] | None = None, name: str | None = None) -> None:
+        """Drop cached params of a tool class and/or of every tool with the
+        given function name. Without arguments the whole cache is cleared.
+
+        Args:
+            tool: Tool class to drop
+            name: Function name to drop, e.g. of a re-registered tool
+        """
+        if tool is None and name is None:
+            cls._items.clear()
+            return
+        for key in [key for key in cls._items if key[0] is tool or key[1] == name]:
+            del cls._items[key]
+
+    @classmethod
+    def size(cls) -> int:
+        """Number of cached tool params."""
+        return len(cls._items)
@@ -1,107 +1,624 @@
 import asyncio
 import json
+import os
 import time
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Callable, Literal, NamedTuple
 
 from openai.types.chat import ChatCompletionChunk
 
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+StreamOverflowPolicy = Literal["block", "drop", "coalesce"]
+
+DONE_FRAME = b"data: [DONE]\n\n"
+
+# evicted frames are written to the spool file in blocks of this size
+SPOOL_BUFFER_SIZE = 256 * 1024
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def json_bytes(value: Any) -> bytes:
+    """Compact UTF-8 JSON of the value, encoded with orjson when it is
+    installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _json_encoder.encode(value).encode()
+
+
+class IntermediateFrame(NamedTuple):
+    """Frame an overflow policy may drop or coalesce, with the item it was
+    encoded from."""
+
+    frame: bytes | str
+    item: Any
+
 
 class StreamingGenerator:
-    def __init__(self):
+    """Buffer of stream frames between the agent and the client.
+
+    With max_size set, intermediate frames (e.g. token chunks) over the
+    bound are handled by the overflow policy: "block" keeps them and
+    makes the producer wait in wait_for_room(), "drop" discards them and
+    "coalesce" merges them into one frame queued when there is room
+    again. Frames added with add() (tool calls, final frames) are always
+    kept, in order.
+
+    Every finish() ends a segment of the stream (one response to the
+    client, e.g. up to a clarification request); finish(final=True)
+    ends the last one.
+
+    With tag_intermediate set, intermediate frames are queued as
+    IntermediateFrame, for a StreamBroadcaster applying the overflow
+    policy per subscriber.
+    """
+
+    def __init__(self, max_size: int | None = None, overflow: StreamOverflowPolicy = "coalesce"):
         self.queue = asyncio.Queue()
+        self.max_size = max_size
+        self.overflow = overflow
+        self.dropped = 0
+        self.coalesced = 0
+        self.segments = 0
+        self.closed = False
+        self.tag_intermediate = False
+        self._overflow_item: Any = None
+        self._room = asyncio.Event()
+        self._room.set()
+
+    def is_full(self) -> bool:
+        return bool(self.max_size) and self.queue.qsize() >= self.max_size
 
-    def add(self, data: str):
+    def add(self, data: bytes | str):
+        self._flush_held()
         self.queue.put_nowait(data)
 
-    def finish(self):
+    def add_intermediate(self, item: Any):
+        """Add a frame the overflow policy may drop or coalesce."""
+        if not self.is_full() or self.overflow == "block":
+            self._flush_held()
+            self._queue_intermediate(item)
+        elif self.overflow == "drop":
+            self.dropped += 1
+        elif self._overflow_item is None:
+            self._overflow_item = self._hold(item)
+        else:
+            self._overflow_item = self._merge(self._overflow_item, item)
+            self.coalesced += 1
+
+    def _queue_intermediate(self, item: Any):
+        frame = self._encode(item)
+        self.queue.put_nowait(IntermediateFrame(frame, item) if self.tag_intermediate else frame)
+
+    def _encode(self, item: Any) -> bytes | str:
+        return item
+
+    def _hold(self, item: Any) -> Any:
+        """Copy of the intermediate frame that pending frames are merged
+        into."""
+        return item
+
+    def _merge(self, pending: Any, item: Any) -> Any:
+        """Merge intermediate frame into the pending coalesced one."""
+        return pending + item
+
+    def _flush_held(self):
+        """Queue frames held back by the generator, before a frame that has
+        to follow them."""
+        self._flush_overflow()
+
+    def _flush_overflow(self):
+        if self._overflow_item is not None:
+            item, self._overflow_item = self._overflow_item, None
+            self._queue_intermediate(item)
+
+    async def wait_for_room(self):
+        """Wait until the client reads the buffer below the bound, under the
+        "block" policy."""
+        while self.overflow == "block" and self.is_full():
+            self._room.clear()
+            await self._room.wait()
+
+    def stats(self) -> dict[str, int]:
+        return {"buffered": self.queue.qsize(), "dropped": self.dropped, "coalesced": self.coalesced}
+
+    def finish(self, final: bool = True):
+        self._flush_held()
+        self.segments += 1
+        self.closed = final
         self.queue.put_nowait(None)  # Termination signal
 
     async def stream(self):
         while True:
             data = await self.queue.get()
+            if not self.is_full():
+                self._room.set()
+                self._flush_overflow()
             if data is None:  # Termination signal
                 break
             yield data
 
 
 class OpenAIStreamingGenerator(StreamingGenerator):
-    def __init__(self, model="gpt-4o"):
-        super().__init__()
+    """Stream of OpenAI-compatible chat completion chunks.
+
+    With coalesce_window set, consecutive token chunks streaming the
+    content of the same choice, or the arguments of the same tool call,
+    are merged into one frame for up to coalesce_window seconds or
+    coalesce_bytes of text. Tool call starts, finish chunks and frames
+    added otherwise flush the merged frame first, keeping the order.
+    """
+
+    def __init__(
+        self,
+        model="gpt-4o",
+        max_size: int | None = None,
+        overflow: StreamOverflowPolicy = "coalesce",
+        coalesce_window: float | None = None,
+        coalesce_bytes: int | None = None,
+    ):
+        super().__init__(max_size=max_size, overflow=overflow)
+        self.coalesce_window = coalesce_window
+        self.coalesce_bytes = coalesce_bytes
+        self.merged = 0
+        self._window_chunk: ChatCompletionChunk | None = None
+        self._window_kind: tuple | None = None
+        self._window_bytes = 0
+        self._window_timer: asyncio.TimerHandle | None = None
         self.model = model
         self.fingerprint = f"fp_{hex(hash(model))[-8:]}"
         self.id = f"chatcmpl-{int(time.time())}{hash(str(time.time()))}"[:29]
         self.created = int(time.time())
         self.choice_index = 0
+        # fields shared by every chunk of the stream, encoded once
+        self._envelope = (
+            b'data: {"id":%s,"object":"chat.completion.chunk","created":%d,"model":%s,'
+            b'"system_fingerprint":%s,"choices":'
+            % (json_bytes(self.id), self.created, json_bytes(model), json_bytes(self.fingerprint))
+        )
 
     def add_chunk(self, chunk: ChatCompletionChunk):
-        chunk.model = self.model
-        super().add(f"data: {chunk.model_dump_json()}\n\n")
+        if not self.coalesce_window:
+            self.add_intermediate(chunk)
+            return
+        kind = self._delta_kind(chunk)
+        if self._window_chunk is not None and (
+            kind is None or kind != self._window_kind or self._starts_tool_call(chunk)
+        ):
+            self._flush_window()
+        if kind is None:
+            self.add_intermediate(chunk)
+            return
+        if self._window_chunk is None:
+            self._window_chunk = self._hold(chunk)
+            self._window_kind = kind
+            self._window_bytes = 0
+            try:
+                self._window_timer = asyncio.get_running_loop().call_later(self.coalesce_window, self._flush_window)
+            except RuntimeError:
+                pass  # no event loop: flushed by the next frame or finish
+        else:
+            self._window_chunk = self._merge(self._window_chunk, chunk)
+            self.merged += 1
+        self._window_bytes += self._delta_size(chunk)
+        if self.coalesce_bytes and self._window_bytes >= self.coalesce_bytes:
+            self._flush_window()
 
-    def add_chunk_from_str(self, content: str):
-        response = {
-            "id": self.id,
-            "object": "chat.completion.chunk",
-            "created": self.created,
-            "model": self.model,
-            "system_fingerprint": self.fingerprint,
-            "choices": [
+    @staticmethod
+    def _delta_kind(chunk: ChatCompletionChunk) -> tuple | None:
+        """What the token chunk streams: content of a choice or arguments of
+        a tool call. None for chunks that are never merged."""
+        if len(chunk.choices) != 1 or chunk.choices[0].finish_reason:
+            return None
+        choice = chunk.choices[0]
+        tool_calls = choice.delta.tool_calls
+        if not tool_calls:
+            return ("content", choice.index)
+        if len(tool_calls) != 1 or choice.delta.content:
+            return None
+        return ("tool_call", choice.index, tool_calls[0].index)
+
+    @staticmethod
+    def _starts_tool_call(chunk: ChatCompletionChunk) -> bool:
+        return any(tool_call.id for tool_call in chunk.choices[0].delta.tool_calls or [])
+
+    @staticmethod
+    def _delta_size(chunk: ChatCompletionChunk) -> int:
+        delta = chunk.choices[0].delta
+        size = len(delta.content or "")
+        for tool_call in delta.tool_calls or []:
+            size += len(tool_call.function.arguments or "") if tool_call.function else 0
+        return size
+
+    def _flush_window(self):
+        if self._window_timer is not None:
+            self._window_timer.cancel()
+            self._window_timer = None
+        if self._window_chunk is not None:
+            chunk, self._window_chunk = self._window_chunk, None
+            self.add_intermediate(chunk)
+
+    def _flush_held(self):
+        self._flush_window()
+        super()._flush_held()
+
+    def stats(self) -> dict[str, int]:
+        return {**super().stats(), "merged": self.merged}
+
+    def _frame(self, choices: list[dict], usage: dict | None = None) -> bytes:
+        """SSE frame of a chunk of the stream with the given choices."""
+        encoded_usage = b"null" if usage is None else json_bytes(usage)
+        return b'%s%s,"usage":%s}\n\n' % (self._envelope, json_bytes(choices), encoded_usage)
+
+    @staticmethod
+    def _encode_choice(choice: Any) -> dict:
+        """Choice of the LLM chunk as a plain dict, without a pydantic dump
+        of the whole chunk."""
+        delta = choice.delta
+        encoded_delta = {"role": delta.role, "content": delta.content}
+        if delta.refusal is not None:
+            encoded_delta["refusal"] = delta.refusal
+        if delta.tool_calls:
+            encoded_delta["tool_calls"] = [
                 {
-                    "delta": {"content": content, "role": "assistant", "tool_calls": None},
-                    "index": self.choice_index,
-                    "finish_reason": None,
-                    "logprobs": None,
+                    "index": tool_call.index,
+                    "id": tool_call.id,
+                    "type": tool_call.type,
+                    "function": tool_call.function
+                    and {"name": tool_call.function.name, "arguments": tool_call.function.arguments},
                 }
-            ],
-            "usage": None,
+                for tool_call in delta.tool_calls
+            ]
+        if delta.model_extra:  # provider fields, e.g. reasoning_content
+            encoded_delta.update(delta.model_extra)
+        return {
+            "index": choice.index,
+            "delta": encoded_delta,
+            "logprobs": choice.logprobs and choice.logprobs.model_dump(mode="json"),
+            "finish_reason": choice.finish_reason,
         }
-        super().add(f"data: {json.dumps(response)}\n\n")
+
+    def _encode(self, item: ChatCompletionChunk) -> bytes:
+        usage = item.usage and item.usage.model_dump(mode="json")
+        return self._frame([self._encode_choice(choice) for choice in item.choices], usage)
+
+    def _hold(self, item: ChatCompletionChunk) -> ChatCompletionChunk:
+        return item.model_copy(deep=True)  # chunks may be shared with the LLM stream state
+
+    def _merge(self, pending: ChatCompletionChunk, item: ChatCompletionChunk) -> ChatCompletionChunk:
+        """Append content and tool call argument deltas of the chunk to the
+        pending one."""
+        for choice in item.choices:
+            target = next((c for c in pending.choices if c.index == choice.index), None)
+            if target is None:
+                pending.choices.append(choice.model_copy(deep=True))
+                continue
+            if choice.delta.content:
+                target.delta.content = (target.delta.content or "") + choice.delta.content
+            for tool_call in choice.delta.tool_calls or []:
+                calls = target.delta.tool_calls = target.delta.tool_calls or []
+                existing = next((c for c in calls if c.index == tool_call.index), None)
+                if existing is None:
+                    calls.append(tool_call.model_copy(deep=True))
+                elif tool_call.function and tool_call.function.arguments:
+                    if existing.function is None:
+                        existing.function = tool_call.function.model_copy()
+                    else:
+                        existing.function.arguments = (existing.function.arguments or "") + tool_call.function.arguments
+            target.finish_reason = choice.finish_reason or target.finish_reason
+        pending.usage = item.usage or pending.usage
+        return pending
+
+    def add_chunk_from_str(self, content: str):
+        delta = {"content": content, "role": "assistant", "tool_calls": None}
+        super().add(
+            self._frame([{"delta": delta, "index": self.choice_index, "finish_reason": None, "logprobs": None}])
+        )
 
     def add_tool_call(self, tool_call_id: str, function_name: str, arguments: str):
         """Adds tool call chunk."""
-        response = {
-            "id": self.id,
-            "object": "chat.completion.chunk",
-            "created": self.created,
-            "model": self.model,
-            "system_fingerprint": f"fp_{hex(hash(self.model))[-8:]}",
-            "choices": [
-                {
-                    "delta": {
-                        "tool_calls": [
-                            {
-                                "index": 0,
-                                "id": tool_call_id,
-                                "type": "function",
-                                "function": {"name": function_name, "arguments": arguments},
-                            }
-                        ]
-                    },
-                    "index": self.choice_index,
-                    "logprobs": None,
-                    "finish_reason": None,
-                }
-            ],
-            "usage": None,
+        tool_call = {
+            "index": 0,
+            "id": tool_call_id,
+            "type": "function",
+            "function": {"name": function_name, "arguments": arguments},
         }
-        super().add(f"data: {json.dumps(response)}\n\n")
+        delta = {"tool_calls": [tool_call]}
+        super().add(
+            self._frame([{"delta": delta, "index": self.choice_index, "logprobs": None, "finish_reason": None}])
+        )
+
+    def add_queue_position(self, position: int, queued: int):
+        """Adds a chunk without choices telling the client its position in
+        the admission queue, 1 is next to run."""
+        queue = json_bytes({"position": position, "queued": queued})
+        super().add(b'%s[],"usage":null,"queue":%s}\n\n' % (self._envelope, queue))
 
-    def finish(self, content: str | None = None, finish_reason: str = "stop"):
+    def finish(
+        self, content: str | None = None, finish_reason: str = "stop", usage: dict | None = None, final: bool = True
+    ):
         """Finishes stream with the final chunk and usage."""
-        final_response = {
-            "id": self.id,
-            "object": "chat.completion.chunk",
-            "created": self.created,
-            "model": self.model,
-            "system_fingerprint": f"fp_{hex(hash(self.model))[-8:]}",
-            "choices": [
-                {
-                    "index": self.choice_index,
-                    "delta": {"content": content, "role": "assistant", "tool_calls": None},
-                    "logprobs": None,
-                    "finish_reason": finish_reason,
-                }
-            ],
-            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        choice = {
+            "index": self.choice_index,
+            "delta": {"content": content, "role": "assistant", "tool_calls": None},
+            "logprobs": None,
+            "finish_reason": finish_reason,
+        }
+        super().add(self._frame([choice], usage or {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}))
+        super().add(DONE_FRAME)
+        super().finish(final=final)
+
+
+class StreamBroadcaster:
+    """Fan-out of a StreamingGenerator to any number of SSE subscribers.
+
+    A pump moves frames from the generator to a replay log of the last
+    replay_size frames, numbered by sequential event ids. Each
+    subscriber reads the log with its own cursor, so a second viewer
+    does not steal frames and a reconnecting client resumes after the
+    Last-Event-ID it got. A client resuming from outside the log window
+    continues from the oldest kept frame. The pump never waits for
+    subscribers: the oldest frames are evicted as new ones come, and a
+    subscriber that falls out of the window while reading is
+    disconnected, to resume with its Last-Event-ID. So one stalled
+    viewer does not hold the other subscribers.
+
+    With buffer_size set, the overflow policy applies to every
+    subscriber on its own. Under "drop" a subscriber more than
+    buffer_size frames behind skips token chunks until it catches up,
+    under "coalesce" it gets them merged into one frame, and under
+    "block" the agent waits in wait_for_room() until every subscriber is
+    back within buffer_size. Tool calls and final frames are always
+    streamed.
+
+    After spool() frames evicted from the log are kept in a file instead
+    of being lost, so a client reconnecting after a long detached run
+    still gets the whole output, up to the last max_frames of it. The
+    file is written through a buffer and deleted by close().
+    """
+
+    def __init__(
+        self,
+        generator: StreamingGenerator,
+        replay_size: int = 1000,
+        buffer_size: int | None = None,
+        overflow: StreamOverflowPolicy = "coalesce",
+    ):
+        self.generator = generator
+        self.replay_size = replay_size
+        self.buffer_size = buffer_size
+        self.overflow = overflow
+        # token chunks skipped or merged for lagging subscribers
+        self.dropped = 0
+        self.coalesced = 0
+        generator.tag_intermediate = bool(buffer_size)
+        self._log: deque[tuple[int, bytes | str | IntermediateFrame | None]] = deque()
+        self._next_id = 0
+        # first event id of every segment that has started
+        self._segment_starts = [0]
+        self._cursors: dict[object, int] = {}
+        # subscribers disconnected for falling out of the replay log
+        self.lagged = 0
+        self._changed = asyncio.Event()
+        # set whenever a subscriber reads a frame or leaves
+        self._read = asyncio.Event()
+        self._pump_task: asyncio.Task | None = None
+        self._done = False
+        self._spool_path: Path | None = None
+        self._spool_file: BinaryIO | None = None
+        self._spool_size = 0
+        self._spool_max_frames: int | None = None
+        self._closed = False
+        # event id -> offset, size (-1 for a segment end) and whether the frame is str
+        self._spooled: dict[int, tuple[int, int, bool]] = {}
+
+    @property
+    def last_event_id(self) -> int | None:
+        return self._next_id - 1 if self._next_id else None
+
+    def start(self) -> None:
+        """Start pumping frames from the generator, if not started yet."""
+        if self._pump_task is None:
+            self._pump_task = asyncio.create_task(self._pump())
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _wait(self, predicate: Callable[[], bool]) -> None:
+        while not predicate():
+            await self._changed.wait()
+
+    def _lag(self, cursor: int) -> int:
+        """Number of frames the subscriber at the cursor has not read yet,
+        including those not pumped from the generator."""
+        return self._next_id + self.generator.queue.qsize() - cursor
+
+    def _advance(self, key: object, cursor: int) -> None:
+        self._cursors[key] = cursor
+        self._read.set()
+
+    async def wait_for_room(self) -> None:
+        """Wait until every subscriber reads to within buffer_size frames of
+        the stream, under the "block" policy."""
+        while (
+            self.overflow == "block"
+            and self.buffer_size
+            and any(self._lag(cursor) >= self.buffer_size for cursor in self._cursors.values())
+        ):
+            self._read.clear()
+            await self._read.wait()
+
+    def _append(self, frame: bytes | str | IntermediateFrame | None) -> None:
+        self._log.append((self._next_id, frame))
+        self._next_id += 1
+        if frame is None:
+            self._segment_starts.append(self._next_id)
+        while len(self._log) > self.replay_size:
+            evicted = self._log.popleft()
+            if self._spool_file is not None:
+                self._spool_entry(*evicted)
+        self._notify()
+
+    def spool(self, path: str | Path, max_frames: int | None = None) -> None:
+        """Keep frames evicted from the replay log from now on in the file,
+        the last max_frames of them if set."""
+        if self._spool_path is None and not self._closed:
+            self._spool_path = Path(path)
+            self._spool_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spool_file = open(self._spool_path, "w+b", buffering=SPOOL_BUFFER_SIZE)  # noqa: SIM115
+            self._spool_max_frames = max_frames
+
+    def _spool_entry(self, event_id: int, frame: bytes | str | IntermediateFrame | None) -> None:
+        if isinstance(frame, IntermediateFrame):
+            frame = frame.frame
+        if frame is None:
+            self._spooled[event_id] = (0, -1, False)
+        else:
+            data = frame.encode() if isinstance(frame, str) else frame
+            self._spool_file.write(data)
+            self._spooled[event_id] = (self._spool_size, len(data), isinstance(frame, str))
+            self._spool_size += len(data)
+        if self._spool_max_frames and len(self._spooled) > self._spool_max_frames:
+            del self._spooled[next(iter(self._spooled))]
+
+    def close(self) -> None:
+        """Delete the spool file, once the subscribers still reading are
+        done. Frames evicted from the log from now on are lost."""
+        self._closed = True
+        if not self._cursors:
+            self._close_spool()
+
+    def _close_spool(self) -> None:
+        if self._spool_file is not None:
+            self._spool_file.close()
+            self._spool_file = None
+            self._spool_path.unlink(missing_ok=True)
+            self._spooled.clear()
+
+    def _is_evicted(self, cursor: int) -> bool:
+        """Whether the frame at the cursor is neither in the log nor in the
+        spool anymore."""
+        return bool(self._log) and cursor < self._log[0][0] and cursor not in self._spooled
+
+    async def _entry(self, cursor: int) -> tuple[int, bytes | str | IntermediateFrame | None]:
+        """Log entry at the cursor, read from the spool if it was
+        evicted."""
+        oldest = self._log[0][0]
+        if cursor >= oldest:
+            return self._log[cursor - oldest]
+        offset, size, is_str = self._spooled[cursor]
+        if size < 0:
+            return cursor, None
+        self._spool_file.flush()
+        data = await asyncio.to_thread(os.pread, self._spool_file.fileno(), size, offset)
+        return cursor, data.decode() if is_str else data
+
+    def _coalesce(self, event_id: int, first: IntermediateFrame) -> tuple[int, IntermediateFrame]:
+        """Merge the token chunks following the one at the event id while
+        the subscriber stays over buffer_size behind.
+
+        Returns:
+            Event id of the last merged frame and the merged frame
+        """
+        pending = None
+        # the first frame is in the log, so the following ones are too
+        while event_id + 1 < self._next_id and self._lag(event_id + 1) > self.buffer_size:
+            next_id, frame = self._log[event_id + 1 - self._log[0][0]]
+            if not isinstance(frame, IntermediateFrame):
+                break
+            if pending is None:
+                pending = self.generator._hold(first.item)
+            pending = self.generator._merge(pending, frame.item)
+            event_id = next_id
+            self.coalesced += 1
+        if pending is None:
+            return event_id, first
+        return event_id, IntermediateFrame(self.generator._encode(pending), pending)
+
+    async def _pump(self) -> None:
+        pumped_segments = 0
+        while True:
+            async for frame in self.generator.stream():
+                self._append(frame)
+            self._append(None)
+            pumped_segments += 1
+            if self.generator.closed and pumped_segments >= self.generator.segments:
+                self._done = True
+                self._notify()
+                return
+
+    async def subscribe(
+        self, last_event_id: int | None = None, segment: int | None = None
+    ) -> AsyncIterator[bytes | str]:
+        """Stream SSE frames with event ids to one client, up to the end of
+        the segment.
+
+        Args:
+            last_event_id: Resume after this event id (Last-Event-ID header)
+            segment: Start at the beginning of this segment, waiting for it
+                to start. By default the latest started segment is streamed
+                from its beginning
+
+        Yields:
+            SSE frames prefixed with their "id:" line
+        """
+        self.start()
+        key = object()
+        if last_event_id is not None:
+            self._cursors[key] = last_event_id + 1
+        elif segment is not None:
+            await self._wait(lambda: len(self._segment_starts) > segment or self._done)
+            if len(self._segment_starts) <= segment:
+                return
+            self._cursors[key] = self._segment_starts[segment]
+        else:
+            starts = self._segment_starts
+            # a segment start past the last event has not started yet
+            self._cursors[key] = starts[-1] if self._next_id > starts[-1] or len(starts) == 1 else starts[-2]
+        if self._is_evicted(self._cursors[key]):
+            # the oldest frame still kept, spooled frames come before the log
+            self._cursors[key] = next(iter(self._spooled), self._log[0][0])
+        try:
+            while True:
+                await self._wait(lambda: self._next_id > self._cursors[key] or self._done)
+                if self._next_id <= self._cursors[key]:
+                    return
+                if self._is_evicted(self._cursors[key]):
+                    # too slow: the client resumes with its Last-Event-ID
+                    self.lagged += 1
+                    return
+                event_id, frame = await self._entry(self._cursors[key])
+                if isinstance(frame, IntermediateFrame):
+                    if self.overflow != "block" and self._lag(event_id) > self.buffer_size:
+                        if self.overflow == "drop":
+                            self.dropped += 1
+                            self._advance(key, event_id + 1)
+                            continue
+                        event_id, frame = self._coalesce(event_id, frame)
+                    frame = frame.frame
+                self._advance(key, event_id + 1)
+                if frame is None:
+                    return
+                yield b"id: %d\n%s" % (event_id, frame) if isinstance(frame, bytes) else f"id: {event_id}\n{frame}"
+        finally:
+            del self._cursors[key]
+            self._read.set()
+            if self._closed and not self._cursors:
+                self._close_spool()
+
+    def stats(self) -> dict[str, int | None]:
+        return {
+            "subscribers": len(self._cursors),
+            "replay_log": len(self._log),
+            "spooled": len(self._spooled),
+            "lagged": self.lagged,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "last_event_id": self.last_event_id,
         }
-        super().add(f"data: {json.dumps(final_response)}\n\n")
-        super().add("data: [DONE]\n\n")
-        super().finish()
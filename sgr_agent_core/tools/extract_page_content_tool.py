@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from pydantic import Field
 
@@ -10,7 +10,7 @@ from sgr_agent_core.services import TavilySearchService
 
 if TYPE_CHECKING:
     from sgr_agent_core.agent_definition import AgentConfig
-    from sgr_agent_core.models import AgentContext
+    from sgr_agent_core.models import AgentContext, SourceData
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -35,25 +35,34 @@ class ExtractPageContentTool(BaseTool):
     reasoning: str = Field(description="Why extract these specific pages")
     urls: list[str] = Field(description="List of URLs to extract full content from", min_length=1, max_length=5)
 
+    prefetch_fields: ClassVar[tuple[str, ...]] = ("urls",)
+
+    @classmethod
+    async def prefetch(cls, arguments: dict[str, Any], context: AgentContext, config: AgentConfig) -> list[SourceData]:
+        return await TavilySearchService(config.search).extract(urls=arguments["urls"])
+
     async def __call__(self, context: AgentContext, config: AgentConfig, **_) -> str:
         """Extract full content from specified URLs."""
 
         logger.info(f"📄 Extracting content from {len(self.urls)} URLs")
 
-        self._search_service = TavilySearchService(config.search)
-        sources = await self._search_service.extract(urls=self.urls)
+        sources = await context.take_prefetch(self.tool_name, {"urls": self.urls})
+        if sources is None:
+            self._search_service = TavilySearchService(config.search)
+            sources = await self._search_service.extract(urls=self.urls)
 
         # Update existing sources instead of overwriting
-        for source in sources:
-            if source.url in context.sources:
-                # URL already exists, update with full content but keep the original number
-                existing = context.sources[source.url]
-                existing.full_content = source.full_content
-                existing.char_count = source.char_count
-            else:
-                # New URL, add with next number
-                source.number = len(context.sources) + 1
-                context.sources[source.url] = source
+        async with context.numbering_sources(self):
+            for source in sources:
+                if source.url in context.sources:
+                    # URL already exists, update with full content but keep the original number
+                    existing = context.sources[source.url]
+                    existing.full_content = source.full_content
+                    existing.char_count = source.char_count
+                else:
+                    # New URL, add with next number
+                    source.number = len(context.sources) + 1
+                    context.sources[source.url] = source
 
         formatted_result = "Extracted Page Content:\n\n"
 
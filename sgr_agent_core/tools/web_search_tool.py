@@ -2,12 +2,12 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from pydantic import Field
 
 from sgr_agent_core.base_tool import BaseTool
-from sgr_agent_core.models import SearchResult
+from sgr_agent_core.models import SearchResult, SourceData
 from sgr_agent_core.services.tavily_search import TavilySearchService
 
 if TYPE_CHECKING:
@@ -52,22 +52,41 @@ class WebSearchTool(BaseTool):
         le=10,
     )
 
-    async def __call__(self, context: AgentContext, config: AgentConfig, **_) -> str:
-        """Execute web search using TavilySearchService."""
+    prefetch_fields: ClassVar[tuple[str, ...]] = ("query",)
 
-        logger.info(f"🔍 Search query: '{self.query}'")
-        self._search_service = TavilySearchService(config.search)
-
-        sources = await self._search_service.search(
-            query=self.query,
-            max_results=min(self.max_results, config.search.max_results),
+    @classmethod
+    async def prefetch(cls, arguments: dict[str, Any], context: AgentContext, config: AgentConfig) -> list[SourceData]:
+        """Search with the largest allowed number of results, as max_results
+        is not known yet; the tool call keeps as many as it asked for."""
+        return await TavilySearchService(config.search).search(
+            query=arguments["query"],
+            max_results=config.search.max_results,
             include_raw_content=False,
         )
 
-        sources = TavilySearchService.rearrange_sources(sources, starting_number=len(context.sources) + 1)
+    async def __call__(self, context: AgentContext, config: AgentConfig, **_) -> str:
+        """Execute web search using TavilySearchService."""
 
-        for source in sources:
-            context.sources[source.url] = source
+        logger.info(f"🔍 Search query: '{self.query}'")
+        max_results = min(self.max_results, config.search.max_results)
+        sources = await context.take_prefetch(self.tool_name, {"query": self.query})
+        if sources is None:
+            self._search_service = TavilySearchService(config.search)
+            sources = await self._search_service.search(
+                query=self.query,
+                max_results=max_results,
+                include_raw_content=False,
+            )
+        sources = sources[:max_results]
+
+        # Known URLs keep their citation number, new ones are numbered after existing sources
+        async with context.numbering_sources(self):
+            for source in sources:
+                if source.url in context.sources:
+                    source.number = context.sources[source.url].number
+                else:
+                    source.number = len(context.sources) + 1
+                    context.sources[source.url] = source
 
         search_result = SearchResult(
             query=self.query,
@@ -5,10 +5,13 @@ from pathlib import Path
 
 import uvicorn
 import yaml
+from fastapi import FastAPI
 
 from sgr_agent_core.agent_config import GlobalConfig
+from sgr_deep_research.api import endpoints
 from sgr_deep_research.app import app
 from sgr_deep_research.default_definitions import get_default_agents_definitions
+from sgr_deep_research.services import AdmissionController, InMemoryAgentStore, SQLiteStateBackend, WorkerRouter
 from sgr_deep_research.settings import ServerConfig
 
 logger = logging.getLogger(__name__)
@@ -46,13 +49,55 @@ def load_config(config_file: str, agents_file: str | None = None) -> GlobalConfi
     return config
 
 
+def configure(args: ServerConfig) -> FastAPI:
+    """Load the configuration and set up the agent storage of this worker.
+
+    Returns:
+        The configured application
+    """
+    config = load_config(args.config_file, args.agents_file)
+    endpoints.agent_store = InMemoryAgentStore(
+        ttl=args.finished_agent_ttl,
+        max_finished=args.max_finished_agents,
+        max_finished_bytes=args.max_finished_agents_bytes,
+        spill_dir=args.agents_spill_dir,
+        suspended_ttl=args.suspended_agent_ttl,
+        paused_ttl=args.paused_agent_ttl,
+    )
+    checkpoint_dirs = {agent_def.execution.checkpoint_dir for agent_def in config.agents.values()}
+    for checkpoint_dir in sorted(filter(None, checkpoint_dirs | {config.execution.checkpoint_dir})):
+        endpoints.agent_store.load_suspended(checkpoint_dir)
+    endpoints.admission_controller = AdmissionController(
+        max_running=args.max_running_agents, max_queued=args.max_queued_agents
+    )
+    state_db = args.state_db or ("sgr_state.db" if args.workers > 1 else None)
+    if state_db:
+        endpoints.worker_router = WorkerRouter(
+            SQLiteStateBackend(state_db), endpoints.agent_store, endpoints.serve_forwarded_request
+        )
+    return app
+
+
+def create_app() -> FastAPI:
+    """Application factory run by every worker process."""
+    return configure(ServerConfig())
+
+
 def main():
     """Start FastAPI server."""
     args = ServerConfig()
 
-    load_config(args.config_file, args.agents_file)
-
-    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+    if args.workers > 1:
+        uvicorn.run(
+            "sgr_deep_research.__main__:create_app",
+            factory=True,
+            workers=args.workers,
+            host=args.host,
+            port=args.port,
+            log_level="info",
+        )
+    else:
+        uvicorn.run(configure(args), host=args.host, port=args.port, log_level="info")
 
 
 if __name__ == "__main__":
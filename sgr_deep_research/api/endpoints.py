@@ -1,58 +1,212 @@
 import asyncio
 import logging
+import math
+from pathlib import Path
+from typing import Annotated, AsyncGenerator, AsyncIterator
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
 
-from sgr_agent_core import AgentFactory, AgentStatesEnum, BaseAgent
+from sgr_agent_core import AgentFactory, AgentStatesEnum, BaseAgent, ConcurrencyLimiter
 from sgr_deep_research.api.models import (
-    AgentListItem,
     AgentListResponse,
     AgentStateResponse,
     ChatCompletionRequest,
     ClarificationRequest,
     HealthResponse,
 )
+from sgr_deep_research.services import (
+    AdmissionController,
+    AdmissionQueueFull,
+    AgentStore,
+    InMemoryAgentStore,
+    WorkerRouter,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# ToDo: better to move to a separate service
-agents_storage: dict[str, BaseAgent] = {}
+# replaced with the configured store on server start
+agent_store: AgentStore = InMemoryAgentStore()
+# set on server start when agents are served by several workers
+worker_router: WorkerRouter | None = None
+# replaced with the configured limits on server start
+admission_controller = AdmissionController()
+
+
+def _apply_disconnect_policy(agent: BaseAgent):
+    """Apply the disconnect policy of the agent if no client came back."""
+    execution = agent.config.execution
+    state = agent._context.state
+    if (
+        agent.stream_broadcaster.stats()["subscribers"]
+        or state in AgentStatesEnum.FINISH_STATES.value
+        or state == AgentStatesEnum.WAITING_FOR_CLARIFICATION
+    ):
+        return
+    logger.info(f"Stream client of agent {agent.id} disconnected, applying '{execution.disconnect_policy}' policy")
+    if execution.disconnect_policy == "cancel":
+        agent.cancel()
+    elif execution.disconnect_policy == "pause":
+        agent.pause()
+    elif execution.disconnect_policy == "detach":
+        agent.stream_broadcaster.spool(
+            Path(execution.detach_dir) / f"{agent.id}.sse", max_frames=execution.detach_max_frames
+        )
+
+
+async def _watch_disconnect(agent: BaseAgent, frames: AsyncGenerator[bytes | str, None]) -> AsyncIterator[bytes | str]:
+    """Stream the frames to the client; a client that goes away before the
+    end of the stream triggers the disconnect policy after the grace
+    period."""
+    agent.resume()
+    streamed = False
+    try:
+        async for frame in frames:
+            yield frame
+        streamed = True
+    finally:
+        await frames.aclose()
+        if not streamed and agent.config.execution.disconnect_policy != "continue":
+            asyncio.get_running_loop().call_later(
+                agent.config.execution.disconnect_grace, _apply_disconnect_policy, agent
+            )
+
+
+def _agent_stream_response(
+    agent: BaseAgent, frames: AsyncGenerator[bytes | str, None], **headers: str
+) -> StreamingResponse:
+    return StreamingResponse(
+        _watch_disconnect(agent, frames),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Agent-ID": str(agent.id),
+            **headers,
+        },
+    )
+
+
+async def _forward_to_owner(agent_id: str, endpoint: str, **params) -> Response | None:
+    """Response of the other worker running the agent, None if no other
+    worker runs it."""
+    if worker_router is None:
+        return None
+    owner = await worker_router.owner(agent_id)
+    if owner is None:
+        return None
+    logger.info(f"Forwarding '{endpoint}' request for agent {agent_id} to worker {owner}")
+    return await worker_router.forward(owner, {"endpoint": endpoint, "agent_id": agent_id, **params})
+
+
+async def _start_agent(agent: BaseAgent, priority: int) -> None:
+    """Execute the agent when the admission controller lets it in and serve
+    it from the store.
+
+    Raises:
+        HTTPException: 429 if the admission queue is full
+    """
+    try:
+        admission_controller.submit(agent, priority)
+    except AdmissionQueueFull as e:
+        logger.warning(f"Rejected agent {agent.id}: {e}")
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))}
+        ) from None
+    agent_store.add(agent)
+    if worker_router is not None:
+        await worker_router.publish()
+    agent.stream_broadcaster.start()
+
+
+async def _resume_suspended(agent_id: str, state: AgentStatesEnum) -> BaseAgent | None:
+    """Rebuild an agent suspended in the state (waiting for clarification or
+    paused) from its checkpoint, None if there is no such agent.
+
+    The checkpoint is claimed first, so of the workers sharing the
+    checkpoint directory only one resumes the agent. Call it after the
+    request was not forwarded to a worker already running the agent.
+    """
+    checkpoint = await agent_store.get_suspended(agent_id)
+    if checkpoint is None or checkpoint.context.get("state") != state:
+        return None
+    checkpoint = await agent_store.claim_suspended(agent_id)
+    if checkpoint is None:
+        return None
+    try:
+        agent = await AgentFactory.resume(checkpoint)
+        await _start_agent(agent, agent.config.execution.priority)
+    except BaseException:
+        await agent_store.release_suspended(agent_id)
+        raise
+    logger.info(f"Resumed suspended agent {agent_id}")
+    return agent
+
+
+async def serve_forwarded_request(request: dict) -> Response | BaseModel:
+    """Serve a request another worker forwarded for an agent of this one."""
+    agent_id = request["agent_id"]
+    if request["endpoint"] == "state":
+        return await get_agent_state(agent_id)
+    if request["endpoint"] == "stream":
+        return await stream_agent(agent_id, last_event_id=request.get("last_event_id"))
+    if request["endpoint"] == "clarification":
+        return await provide_clarification(agent_id, ClarificationRequest.model_validate(request["body"]))
+    if request["endpoint"] == "chat_completions":
+        return await create_chat_completion(ChatCompletionRequest.model_validate(request["body"]))
+    raise HTTPException(status_code=400, detail=f"Unknown forwarded endpoint '{request['endpoint']}'")
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
-    return HealthResponse()
+    return HealthResponse(llm_limits=ConcurrencyLimiter.stats(), admission=admission_controller.stats())
 
 
 @router.get("/agents/{agent_id}/state", response_model=AgentStateResponse)
 async def get_agent_state(agent_id: str):
-    if agent_id not in agents_storage:
+    state = await agent_store.get_state(agent_id)
+    if state is None:
+        forwarded = await _forward_to_owner(agent_id, "state")
+        if forwarded is not None:
+            return forwarded
         raise HTTPException(status_code=404, detail="Agent not found")
 
-    agent = agents_storage[agent_id]
+    return state
 
-    return AgentStateResponse(
-        agent_id=agent.id,
-        task=agent.task,
-        sources_count=len(agent._context.sources),
-        **agent._context.model_dump(),
-    )
+
+@router.get("/agents/{agent_id}/stream")
+async def stream_agent(agent_id: str, last_event_id: str | None = Header(default=None)):
+    """Attach to the agent stream as another viewer or resume a dropped
+    connection after the Last-Event-ID header.
+
+    An agent suspended while paused is resumed from its checkpoint.
+    """
+    agent = agent_store.get(agent_id)
+    if not agent:
+        forwarded = await _forward_to_owner(agent_id, "stream", last_event_id=last_event_id)
+        if forwarded is not None:
+            return forwarded
+        agent = await _resume_suspended(agent_id, AgentStatesEnum.PAUSED)
+        if not agent:
+            raise HTTPException(status_code=404, detail="Agent not found")
+        # the stream of the resumed agent starts over
+        last_event_id = None
+    try:
+        resume_after = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid Last-Event-ID '{last_event_id}'") from None
+
+    return _agent_stream_response(agent, agent.stream_broadcaster.subscribe(last_event_id=resume_after))
 
 
 @router.get("/agents", response_model=AgentListResponse)
 async def get_agents_list():
-    agents_list = [
-        AgentListItem(
-            agent_id=agent.id,
-            task=agent.task,
-            state=agent._context.state,
-            creation_time=agent.creation_time,
-        )
-        for agent in agents_storage.values()
-    ]
+    agents_list = await agent_store.list_agents()
+    if worker_router is not None:
+        agents_list += await worker_router.list_agents()
 
     return AgentListResponse(agents=agents_list, total=len(agents_list))
 
@@ -82,23 +236,22 @@ def extract_user_content_from_messages(messages):
 
 @router.post("/agents/{agent_id}/provide_clarification")
 async def provide_clarification(agent_id: str, request: ClarificationRequest):
+    agent = agent_store.get(agent_id)
+    if not agent:
+        forwarded = await _forward_to_owner(agent_id, "clarification", body=request.model_dump())
+        if forwarded is not None:
+            return forwarded
+        agent = await _resume_suspended(agent_id, AgentStatesEnum.WAITING_FOR_CLARIFICATION)
     try:
-        agent = agents_storage.get(agent_id)
         if not agent:
             raise HTTPException(status_code=404, detail="Agent not found")
 
         logger.info(f"Providing clarification to agent {agent.id}: {request.clarifications[:100]}...")
 
+        # the answer is streamed as the next segment of the agent stream
+        segment = agent.streaming_generator.segments
         await agent.provide_clarification(request.clarifications)
-        return StreamingResponse(
-            agent.streaming_generator.stream(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Agent-ID": str(agent.id),
-            },
-        )
+        return _agent_stream_response(agent, agent.stream_broadcaster.subscribe(segment=segment))
 
     except Exception as e:
         logger.error(f"Error completion: {e}")
@@ -112,18 +265,21 @@ def _is_agent_id(model_str: str) -> bool:
 
 
 @router.post("/v1/chat/completions")
-async def create_chat_completion(request: ChatCompletionRequest):
+async def create_chat_completion(
+    request: ChatCompletionRequest, x_agent_priority: Annotated[int | None, Header()] = None
+):
     if not request.stream:
         raise HTTPException(status_code=501, detail="Only streaming responses are supported. Set 'stream=true'")
 
     # Check if this is a clarification request for an existing agent
-    if (
-        request.model
-        and isinstance(request.model, str)
-        and _is_agent_id(request.model)
-        and request.model in agents_storage
-        and agents_storage[request.model]._context.state == AgentStatesEnum.WAITING_FOR_CLARIFICATION
-    ):
+    is_agent_id = request.model and isinstance(request.model, str) and _is_agent_id(request.model)
+    existing_agent = agent_store.get(request.model) if is_agent_id else None
+    if is_agent_id and existing_agent is None:
+        forwarded = await _forward_to_owner(request.model, "chat_completions", body=request.model_dump(mode="json"))
+        if forwarded is not None:
+            return forwarded
+        existing_agent = await _resume_suspended(request.model, AgentStatesEnum.WAITING_FOR_CLARIFICATION)
+    if existing_agent is not None and existing_agent._context.state == AgentStatesEnum.WAITING_FOR_CLARIFICATION:
         return await provide_clarification(
             agent_id=request.model,
             request=ClarificationRequest(clarifications=extract_user_content_from_messages(request.messages)),
@@ -142,17 +298,10 @@ async def create_chat_completion(request: ChatCompletionRequest):
         agent = await AgentFactory.create(agent_def, task)
         logger.info(f"Created agent '{request.model}' for task: {task[:100]}...")
 
-        agents_storage[agent.id] = agent
-        _ = asyncio.create_task(agent.execute())
-        return StreamingResponse(
-            agent.streaming_generator.stream(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Agent-ID": str(agent.id),
-                "X-Agent-Model": request.model,
-            },
+        priority = x_agent_priority if x_agent_priority is not None else agent.config.execution.priority
+        await _start_agent(agent, priority)
+        return _agent_stream_response(
+            agent, agent.stream_broadcaster.subscribe(segment=0), **{"X-Agent-Model": request.model}
         )
 
     except ValueError as e:
@@ -51,6 +51,12 @@ class ChatCompletionResponse(BaseModel):
 class HealthResponse(BaseModel):
     status: Literal["healthy"] = "healthy"
     service: str = Field(default="SGR Agent Core API", description="Service name")
+    llm_limits: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict, description="Adaptive LLM concurrency limit, in-flight requests and queue depth"
+    )
+    admission: Dict[str, int | None] | None = Field(
+        default=None, description="Running and queued agents of this worker and their limits"
+    )
 
 
 class AgentStateResponse(BaseModel):
@@ -63,6 +69,12 @@ class AgentStateResponse(BaseModel):
     sources_count: int = Field(description="Number of sources found")
     current_step_reasoning: Dict[str, Any] | None = Field(default=None, description="Current agent step")
     execution_result: str | None = Field(default=None, description="Execution result")
+    statistics: Dict[str, Any] | None = Field(default=None, description="Token usage and latency of the run")
+    stream: Dict[str, int | None] | None = Field(
+        default=None,
+        description="Client stream: buffered, dropped and coalesced frames, subscribers, replay log size "
+        "and last event id",
+    )
 
 
 class AgentListItem(BaseModel):
@@ -7,6 +7,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from sgr_agent_core import AgentFactory, AgentRegistry, ToolRegistry, __version__
+from sgr_deep_research.api import endpoints
 from sgr_deep_research.api.endpoints import router
 from sgr_deep_research.settings import setup_logging
 
@@ -22,7 +23,12 @@ async def lifespan(_: FastAPI):
         logger.info(f"Agent registered: {agent.__name__}")
     for defn in AgentFactory.get_definitions_list():
         logger.info(f"Agent definition loaded: {defn}")
+    if endpoints.worker_router is not None:
+        await endpoints.worker_router.start()
     yield
+    if endpoints.worker_router is not None:
+        await endpoints.worker_router.stop()
+    await AgentFactory.close_clients()
 
 
 app = FastAPI(title="SGR Deep Research API", version=__version__, lifespan=lifespan)
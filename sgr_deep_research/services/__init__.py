@@ -0,0 +1,17 @@
+"""Services of the API server."""
+
+from sgr_deep_research.services.admission_controller import AdmissionController, AdmissionQueueFull
+from sgr_deep_research.services.agent_store import AgentStore, InMemoryAgentStore
+from sgr_deep_research.services.state_backend import InMemoryStateBackend, SQLiteStateBackend, StateBackend
+from sgr_deep_research.services.worker_router import WorkerRouter
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionQueueFull",
+    "AgentStore",
+    "InMemoryAgentStore",
+    "InMemoryStateBackend",
+    "SQLiteStateBackend",
+    "StateBackend",
+    "WorkerRouter",
+]
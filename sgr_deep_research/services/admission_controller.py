@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator
+
+from sgr_agent_core import AgentStatesEnum, BaseAgent
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionQueueFull(Exception):
+    """No room for another agent in the admission queue."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Too many research tasks, retry in {retry_after:.0f} seconds")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Limit of the agents running at once with a bounded queue for the
+    others.
+
+    Agents over max_running wait in the queue, higher priority first and
+    in submission order within a priority, new ones in the queued state.
+    While they wait, their stream gets a chunk with the new queue
+    position whenever it changes. Submitting to a full queue raises
+    AdmissionQueueFull with the expected wait for a free place, estimated
+    from the duration of recent runs.
+
+    A running agent gives up its place while it waits for a clarification
+    or is paused. Once the answer comes or it is resumed, it waits for a
+    place again in the queue with its priority, also when the queue is
+    full, before it goes on.
+    """
+
+    def __init__(self, max_running: int | None = None, max_queued: int = 100, retry_after: float = 30):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.retry_after = retry_after
+        self.running = 0
+        self.rejected = 0
+        # heap of (-priority, submission number, admission future, agent)
+        self._queue: list[tuple[int, int, asyncio.Future, BaseAgent]] = []
+        self._submissions = itertools.count()
+        self._positions: dict[str, int] = {}
+        self._mean_duration: float | None = None
+        # ids of running agents that gave up their place while idle
+        self._idle_agents: set[str] = set()
+
+    def submit(self, agent: BaseAgent, priority: int = 0) -> asyncio.Task:
+        """Execute the agent now or once it leaves the queue.
+
+        Raises:
+            AdmissionQueueFull: The queue has no room for the agent
+        """
+        if self.max_running is None or (self.running < self.max_running and not self._queue):
+            self.running += 1
+            admission = None
+        elif len(self._queue) >= self.max_queued:
+            self.rejected += 1
+            raise AdmissionQueueFull(self.expected_wait())
+        else:
+            admission = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (-priority, next(self._submissions), admission, agent))
+            if agent._context.state == AgentStatesEnum.INITED:
+                # agents resumed from a checkpoint keep their state
+                agent._context.state = AgentStatesEnum.QUEUED
+            logger.info(f"Agent {agent.id} queued with priority {priority}, {len(self._queue)} agents waiting")
+            self._update_positions()
+        return asyncio.create_task(self._run(agent, admission, priority))
+
+    def expected_wait(self) -> float:
+        """Seconds until a running agent is expected to finish and let the
+        first queued one in."""
+        if self._mean_duration is None or not self.max_running:
+            return self.retry_after
+        return max(1.0, self._mean_duration / self.max_running)
+
+    def stats(self) -> dict[str, int | None]:
+        return {
+            "running": self.running,
+            "queued": len(self._queue),
+            "max_running": self.max_running,
+            "max_queued": self.max_queued,
+            "rejected": self.rejected,
+        }
+
+    async def _run(self, agent: BaseAgent, admission: asyncio.Future | None, priority: int):
+        if admission is not None:
+            # agent.cancel() removes the agent from the queue
+            agent._execution_task = asyncio.current_task()
+            try:
+                await admission
+            except asyncio.CancelledError:
+                self._leave_queue(agent, admission)
+                if agent._cancel_requested:
+                    agent._context.state = AgentStatesEnum.CANCELLED
+                    agent.finish_time = datetime.now()
+                agent.streaming_generator.finish()
+                raise
+            if agent._context.state == AgentStatesEnum.QUEUED:
+                agent._context.state = AgentStatesEnum.INITED
+
+        agent._idle_context = lambda: self._idle(agent, priority)
+        started = time.monotonic()
+        try:
+            return await agent.execute()
+        finally:
+            duration = time.monotonic() - started
+            self._mean_duration = (
+                duration if self._mean_duration is None else 0.8 * self._mean_duration + 0.2 * duration
+            )
+            if agent.id in self._idle_agents:
+                # suspended or cancelled while it had no place
+                self._idle_agents.discard(agent.id)
+            else:
+                self._release()
+
+    @asynccontextmanager
+    async def _idle(self, agent: BaseAgent, priority: int) -> AsyncIterator[None]:
+        """Free the place of the agent while it waits, and take one again
+        through the queue when the wait ends without an error."""
+        self._idle_agents.add(agent.id)
+        self._release()
+        yield
+        await self._readmit(agent, priority)
+        self._idle_agents.discard(agent.id)
+
+    async def _readmit(self, agent: BaseAgent, priority: int) -> None:
+        if self.max_running is None or (self.running < self.max_running and not self._queue):
+            self.running += 1
+            return
+        admission = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (-priority, next(self._submissions), admission, agent))
+        logger.info(f"Agent {agent.id} queued again with priority {priority}, {len(self._queue)} agents waiting")
+        self._update_positions()
+        try:
+            await admission
+        except asyncio.CancelledError:
+            self._leave_queue(agent, admission)
+            raise
+
+    def _leave_queue(self, agent: BaseAgent, admission: asyncio.Future) -> None:
+        if not admission.cancelled():
+            # admitted right before the cancellation
+            self._release()
+            return
+        self._queue = [entry for entry in self._queue if entry[3] is not agent]
+        heapq.heapify(self._queue)
+        self._update_positions()
+
+    def _release(self) -> None:
+        """Free the place of a finished or idle agent for the first queued
+        one."""
+        self.running -= 1
+        while self._queue and self.running < self.max_running:
+            _, _, admission, agent = heapq.heappop(self._queue)
+            if admission.cancelled():
+                continue
+            admission.set_result(None)
+            self.running += 1
+            logger.info(f"Agent {agent.id} admitted from the queue")
+        self._update_positions()
+
+    def _update_positions(self) -> None:
+        positions = {}
+        for position, (_, _, _, agent) in enumerate(sorted(self._queue), start=1):
+            positions[agent.id] = position
+            if self._positions.get(agent.id) != position:
+                agent.streaming_generator.add_queue_position(position, len(self._queue))
+        self._positions = positions
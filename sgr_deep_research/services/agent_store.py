@@ -0,0 +1,451 @@
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from sgr_agent_core import AgentCheckpoint, AgentStatesEnum, BaseAgent, CheckpointStore
+from sgr_deep_research.api.models import AgentListItem, AgentStateResponse
+
+logger = logging.getLogger(__name__)
+
+# checkpointed states of agents that are suspended, not interrupted
+SUSPENDED_STATES = (AgentStatesEnum.WAITING_FOR_CLARIFICATION, AgentStatesEnum.PAUSED)
+
+
+def agent_state(agent: BaseAgent) -> AgentStateResponse:
+    """State of the agent as returned by the API."""
+    return AgentStateResponse(
+        agent_id=agent.id,
+        task=agent.task,
+        sources_count=len(agent._context.sources),
+        stream={**agent.streaming_generator.stats(), **agent.stream_broadcaster.stats()},
+        **agent._context.model_dump(),
+    )
+
+
+def agent_list_item(agent: BaseAgent) -> AgentListItem:
+    return AgentListItem(
+        agent_id=agent.id, task=agent.task, state=agent._context.state, creation_time=agent.creation_time
+    )
+
+
+def checkpoint_state(checkpoint: AgentCheckpoint) -> AgentStateResponse:
+    """State of a suspended agent as returned by the API, from its
+    checkpoint."""
+    context = {**checkpoint.context, "state": AgentStatesEnum.SUSPENDED.value}
+    return AgentStateResponse(
+        agent_id=checkpoint.agent_id,
+        task=checkpoint.task,
+        sources_count=len(context.get("sources", {})),
+        **context,
+    )
+
+
+class SuspendedAgent(NamedTuple):
+    checkpoint_dir: str
+    item: AgentListItem
+    suspended_at: datetime
+    # inode and modification time of the checkpoint file when it was last
+    # read, a rewritten checkpoint is a new file
+    checkpoint_stat: tuple[int, int] | None = None
+
+
+class SpilledAgent(NamedTuple):
+    item: AgentListItem
+    spilled_at: datetime
+
+
+class AgentStore(ABC):
+    """Storage of the agents served by the API."""
+
+    @abstractmethod
+    def add(self, agent: BaseAgent) -> None:
+        """Store a new agent."""
+
+    @abstractmethod
+    def get(self, agent_id: str) -> BaseAgent | None:
+        """Live agent by id, None if it is unknown or was evicted."""
+
+    @abstractmethod
+    async def get_state(self, agent_id: str) -> AgentStateResponse | None:
+        """State of a live, suspended or evicted agent, None if it is
+        unknown."""
+
+    @abstractmethod
+    async def get_suspended(self, agent_id: str) -> AgentCheckpoint | None:
+        """Checkpoint of an agent suspended while waiting for clarification
+        or paused, None if there is none."""
+
+    @abstractmethod
+    async def claim_suspended(self, agent_id: str) -> AgentCheckpoint | None:
+        """Take the checkpoint of a suspended agent to resume it, so no other
+        worker resumes it too; None if there is none or another worker
+        claimed it first."""
+
+    @abstractmethod
+    async def release_suspended(self, agent_id: str) -> None:
+        """Put back the claimed checkpoint of an agent that could not be
+        resumed."""
+
+    @abstractmethod
+    async def list_agents(self) -> list[AgentListItem]:
+        """Live, suspended and evicted agents."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget all agents."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of live, suspended and evicted agents, without reading
+        their checkpoints."""
+
+    def __contains__(self, agent_id: str) -> bool:
+        return self.get(agent_id) is not None
+
+
+class InMemoryAgentStore(AgentStore):
+    """Agents kept in process memory with eviction of finished ones.
+
+    Agents in a finish state are evicted when they were not accessed for
+    ttl seconds since they finished, and least recently used first when
+    more than max_finished of them or more than max_finished_bytes of
+    their estimated conversation, sources and log size are kept. Running
+    agents and agents waiting for clarification are never evicted. Paused
+    agents not accessed for paused_ttl seconds are cancelled, so they give
+    up their place among the running agents and are evicted once finished.
+
+    With spill_dir set, the state of evicted agents is written there, so
+    it is still listed and returned by get_state(), also after a restart.
+    A spilled state expires ttl seconds after it was written, and its file
+    is deleted.
+
+    Suspended agents are dropped from memory, and only their checkpoint
+    is kept to resume them. Their checkpoint is deleted, and they are
+    forgotten, suspended_ttl seconds after they were suspended. Workers
+    sharing a checkpoint directory all take over the agents suspended in
+    it; the worker that claims the checkpoint resumes the agent, and the
+    others forget it once they see its checkpoint changed.
+
+    Checkpoints and spilled states are read and written in a thread, off
+    the event loop.
+    """
+
+    def __init__(
+        self,
+        ttl: float | None = None,
+        max_finished: int | None = None,
+        max_finished_bytes: int | None = None,
+        spill_dir: str | None = None,
+        suspended_ttl: float | None = None,
+        paused_ttl: float | None = None,
+    ):
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self.max_finished_bytes = max_finished_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.suspended_ttl = suspended_ttl
+        self.paused_ttl = paused_ttl
+        self.evicted = 0
+        self.expired = 0
+        # least recently used first
+        self._agents: OrderedDict[str, BaseAgent] = OrderedDict()
+        self._last_access: dict[str, datetime] = {}
+        self._sizes: dict[str, int] = {}
+        self._spilled: dict[str, SpilledAgent] = {}
+        self._suspended: dict[str, SuspendedAgent] = {}
+        self._claimed: dict[str, tuple[SuspendedAgent, AgentCheckpoint]] = {}
+        if self.spill_dir and self.spill_dir.is_dir():
+            self._load_spilled()
+
+    def add(self, agent: BaseAgent) -> None:
+        self._suspended.pop(agent.id, None)
+        self._claimed.pop(agent.id, None)
+        self._agents[agent.id] = agent
+        self._touch(agent.id)
+        self._evict()
+
+    def get(self, agent_id: str) -> BaseAgent | None:
+        self._evict()
+        agent = self._agents.get(agent_id)
+        if agent is not None:
+            self._touch(agent_id)
+        return agent
+
+    async def get_state(self, agent_id: str) -> AgentStateResponse | None:
+        agent = self.get(agent_id)
+        if agent is not None:
+            return agent_state(agent)
+        checkpoint = await self.get_suspended(agent_id)
+        if checkpoint is not None:
+            return checkpoint_state(checkpoint)
+        if agent_id in self._spilled:
+            return await asyncio.to_thread(self._read_spilled, agent_id)
+        return None
+
+    async def get_suspended(self, agent_id: str) -> AgentCheckpoint | None:
+        self._evict()
+        suspended = self._suspended.get(agent_id)
+        if suspended is None:
+            return None
+        checkpoint_stat, checkpoint = await asyncio.to_thread(self._load_checkpoint, suspended.checkpoint_dir, agent_id)
+        if checkpoint is None or checkpoint.context.get("state") not in SUSPENDED_STATES:
+            # e.g. resumed by another worker sharing the checkpoint directory
+            logger.warning(f"Agent {agent_id} is no longer suspended in its checkpoint")
+            self._suspended.pop(agent_id, None)
+            return None
+        if agent_id in self._suspended:
+            self._suspended[agent_id] = self._suspended[agent_id]._replace(checkpoint_stat=checkpoint_stat)
+        return checkpoint
+
+    async def claim_suspended(self, agent_id: str) -> AgentCheckpoint | None:
+        if await self.get_suspended(agent_id) is None:
+            return None
+        suspended = self._suspended.pop(agent_id, None)
+        if suspended is None:
+            return None  # claimed by another request meanwhile
+        checkpoint = await asyncio.to_thread(CheckpointStore.claim, suspended.checkpoint_dir, agent_id)
+        if checkpoint is None or checkpoint.context.get("state") not in SUSPENDED_STATES:
+            if checkpoint is not None:
+                # resumed by another worker right after it was read
+                await asyncio.to_thread(CheckpointStore.save, suspended.checkpoint_dir, checkpoint)
+            logger.info(f"Agent {agent_id} was resumed by another worker")
+            return None
+        self._claimed[agent_id] = (suspended, checkpoint)
+        return checkpoint
+
+    async def release_suspended(self, agent_id: str) -> None:
+        suspended, checkpoint = self._claimed.pop(agent_id)
+        await asyncio.to_thread(CheckpointStore.save, suspended.checkpoint_dir, checkpoint)
+        checkpoint_stat = await asyncio.to_thread(self._checkpoint_stat, suspended.checkpoint_dir, agent_id)
+        self._suspended[agent_id] = suspended._replace(checkpoint_stat=checkpoint_stat)
+
+    async def list_agents(self) -> list[AgentListItem]:
+        self._evict()
+        await self._drop_claimed()
+        return [
+            *(spilled.item for spilled in self._spilled.values()),
+            *(suspended.item for suspended in self._suspended.values()),
+            *(agent_list_item(agent) for agent in self._agents.values()),
+        ]
+
+    def __len__(self) -> int:
+        return len(self._spilled) + len(self._suspended) + len(self._agents)
+
+    def clear(self) -> None:
+        for agent in self._agents.values():
+            agent.stream_broadcaster.close()
+        self._agents.clear()
+        self._last_access.clear()
+        self._sizes.clear()
+        self._spilled.clear()
+        self._suspended.clear()
+        self._claimed.clear()
+
+    def load_suspended(self, checkpoint_dir: str) -> None:
+        """Take over the agents suspended in the checkpoint directory, e.g.
+        after a restart."""
+        for agent_id in CheckpointStore.list_ids(checkpoint_dir):
+            checkpoint = CheckpointStore.load(checkpoint_dir, agent_id)
+            if checkpoint is None or checkpoint.context.get("state") not in SUSPENDED_STATES:
+                continue
+            item = AgentListItem(
+                agent_id=agent_id,
+                task=checkpoint.task,
+                state=AgentStatesEnum.SUSPENDED,
+                creation_time=checkpoint.creation_time,
+            )
+            self._suspended[agent_id] = SuspendedAgent(
+                checkpoint_dir, item, checkpoint.saved_at, self._checkpoint_stat(checkpoint_dir, agent_id)
+            )
+
+    def stats(self) -> dict[str, int]:
+        finished = [agent_id for agent_id, agent in self._agents.items() if self._is_finished(agent)]
+        return {
+            "agents": len(self._agents),
+            "finished": len(finished),
+            "finished_bytes": sum(self._size(agent_id) for agent_id in finished),
+            "spilled": len(self._spilled),
+            "suspended": len(self._suspended),
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+    def _touch(self, agent_id: str) -> None:
+        self._agents.move_to_end(agent_id)
+        self._last_access[agent_id] = datetime.now()
+
+    @staticmethod
+    def _is_finished(agent: BaseAgent) -> bool:
+        return agent._context.state in AgentStatesEnum.FINISH_STATES.value
+
+    def _size(self, agent_id: str) -> int:
+        """Estimated memory held by a finished agent, computed once as it
+        does not change any more."""
+        if agent_id not in self._sizes:
+            agent = self._agents[agent_id]
+            self._sizes[agent_id] = (
+                len(json.dumps(agent.conversation, default=str))
+                + len(json.dumps(agent.log, default=str))
+                + sum(len(source.full_content) + len(source.snippet) for source in agent._context.sources.values())
+            )
+        return self._sizes[agent_id]
+
+    def _idle_seconds(self, agent: BaseAgent) -> float:
+        idle_since = max(self._last_access[agent.id], agent.finish_time or agent.creation_time)
+        return (datetime.now() - idle_since).total_seconds()
+
+    def _evict(self) -> None:
+        for agent in [agent for agent in self._agents.values() if agent._context.state == AgentStatesEnum.SUSPENDED]:
+            self._suspend(agent)
+        if self.suspended_ttl is not None:
+            now = datetime.now()
+            for agent_id, suspended in list(self._suspended.items()):
+                if (now - suspended.suspended_at).total_seconds() > self.suspended_ttl:
+                    self._expire(agent_id)
+        if self.paused_ttl is not None:
+            now = datetime.now()
+            for agent in self._agents.values():
+                if (
+                    agent._context.state == AgentStatesEnum.PAUSED
+                    and not agent._cancel_requested
+                    and (now - self._last_access[agent.id]).total_seconds() > self.paused_ttl
+                ):
+                    logger.info(f"Cancelling agent {agent.id} paused without a client for {self.paused_ttl}s")
+                    agent.cancel()
+        finished = [agent for agent in self._agents.values() if self._is_finished(agent)]
+        if self.ttl is not None:
+            now = datetime.now()
+            for agent_id, spilled in list(self._spilled.items()):
+                if (now - spilled.spilled_at).total_seconds() > self.ttl:
+                    self._forget_spilled(agent_id)
+            for agent in [agent for agent in finished if self._idle_seconds(agent) > self.ttl]:
+                finished.remove(agent)
+                self._remove(agent)
+        finished_bytes = sum(self._size(agent.id) for agent in finished) if self.max_finished_bytes else 0
+        while finished and (
+            (self.max_finished is not None and len(finished) > self.max_finished)
+            or (self.max_finished_bytes and finished_bytes > self.max_finished_bytes)
+        ):
+            agent = finished.pop(0)
+            finished_bytes -= self._size(agent.id) if self.max_finished_bytes else 0
+            self._remove(agent)
+
+    def _remove(self, agent: BaseAgent) -> None:
+        if self.spill_dir:
+            self._spill(agent)
+        agent.stream_broadcaster.close()
+        del self._agents[agent.id]
+        self._last_access.pop(agent.id, None)
+        self._sizes.pop(agent.id, None)
+        self.evicted += 1
+        logger.info(f"Evicted finished agent {agent.id} from memory")
+
+    def _suspend(self, agent: BaseAgent) -> None:
+        """Drop the suspended agent from memory, keeping what is needed to
+        resume it."""
+        agent.stream_broadcaster.close()
+        del self._agents[agent.id]
+        self._last_access.pop(agent.id, None)
+        self._sizes.pop(agent.id, None)
+        checkpoint_dir = agent.config.execution.checkpoint_dir
+        self._suspended[agent.id] = SuspendedAgent(
+            checkpoint_dir,
+            agent_list_item(agent),
+            agent.finish_time or datetime.now(),
+            self._checkpoint_stat(checkpoint_dir, agent.id),
+        )
+        logger.info(f"Dropped suspended agent {agent.id} from memory")
+
+    @staticmethod
+    def _checkpoint_stat(checkpoint_dir: str, agent_id: str) -> tuple[int, int] | None:
+        try:
+            stat = CheckpointStore.path(checkpoint_dir, agent_id).stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @classmethod
+    def _load_checkpoint(
+        cls, checkpoint_dir: str, agent_id: str
+    ) -> tuple[tuple[int, int] | None, AgentCheckpoint | None]:
+        return cls._checkpoint_stat(checkpoint_dir, agent_id), CheckpointStore.load(checkpoint_dir, agent_id)
+
+    def _changed_checkpoints(self, suspended: list[tuple[str, SuspendedAgent]]) -> list[str]:
+        return [
+            agent_id
+            for agent_id, agent in suspended
+            if self._checkpoint_stat(agent.checkpoint_dir, agent_id) != agent.checkpoint_stat
+        ]
+
+    async def _drop_claimed(self) -> None:
+        """Forget the suspended agents whose checkpoint is no longer a
+        suspended one, e.g. claimed by another worker, checking only the
+        checkpoints that changed since they were read."""
+        changed = await asyncio.to_thread(self._changed_checkpoints, list(self._suspended.items()))
+        for agent_id in changed:
+            await self.get_suspended(agent_id)
+
+    def _expire(self, agent_id: str) -> None:
+        suspended = self._suspended.pop(agent_id)
+        CheckpointStore.delete(suspended.checkpoint_dir, agent_id)
+        self.expired += 1
+        logger.info(f"Suspended agent {agent_id} expired without being resumed")
+
+    def _spill_path(self, agent_id: str) -> Path:
+        return self.spill_dir / f"{agent_id}.json"
+
+    def _spill(self, agent: BaseAgent) -> None:
+        """Write the state of the agent; errors are logged and the state is
+        lost, as without spilling."""
+        state, item = agent_state(agent), agent_list_item(agent)
+        path = self._spill_path(agent.id)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"state": state.model_dump(mode="json"), "creation_time": item.creation_time.isoformat()},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to spill state of agent {agent.id} to {path}: {e}")
+            return
+        self._spilled[agent.id] = SpilledAgent(item, datetime.now())
+
+    def _forget_spilled(self, agent_id: str) -> None:
+        del self._spilled[agent_id]
+        self._spill_path(agent_id).unlink(missing_ok=True)
+        self.expired += 1
+        logger.info(f"Spilled state of agent {agent_id} expired")
+
+    def _read_spilled(self, agent_id: str) -> AgentStateResponse | None:
+        try:
+            with open(self._spill_path(agent_id), encoding="utf-8") as f:
+                return AgentStateResponse.model_validate(json.load(f)["state"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable spilled state of agent {agent_id}: {e}")
+            return None
+
+    def _load_spilled(self) -> None:
+        for path in self.spill_dir.glob("*.json"):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                state = data["state"]
+                item = AgentListItem(
+                    agent_id=state["agent_id"],
+                    task=state["task"],
+                    state=state["state"],
+                    creation_time=data["creation_time"],
+                )
+                self._spilled[item.agent_id] = SpilledAgent(item, datetime.fromtimestamp(path.stat().st_mtime))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable spilled agent state {path}: {e}")
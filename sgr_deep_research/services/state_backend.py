@@ -0,0 +1,324 @@
+import asyncio
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from sgr_agent_core import AgentStatesEnum
+from sgr_deep_research.api.models import AgentListItem
+
+T = TypeVar("T")
+
+
+class StateBackend(ABC):
+    """State shared by the API workers, so a request for an agent reaches
+    the worker running it.
+
+    Workers publish the agents they run and a heartbeat. A worker that
+    gets a request for an agent of another one sends it to that worker's
+    inbox, and the owner writes the response to a channel the sender
+    reads it from.
+    """
+
+    @abstractmethod
+    async def heartbeat(self, worker_id: str) -> None:
+        """Mark the worker alive."""
+
+    @abstractmethod
+    async def remove_worker(self, worker_id: str) -> None:
+        """Forget the worker, its agents and its inbox."""
+
+    @abstractmethod
+    async def live_workers(self, alive_within: float) -> list[str]:
+        """Workers with a heartbeat in the last alive_within seconds."""
+
+    @abstractmethod
+    async def publish_agents(self, worker_id: str, agents: list[AgentListItem]) -> None:
+        """Replace the agents published by the worker.
+
+        Workers sharing a checkpoint directory all publish the agents
+        suspended in it; a suspended agent does not take the ownership of
+        an agent over from the worker running it.
+        """
+
+    @abstractmethod
+    async def owner(self, agent_id: str, alive_within: float) -> str | None:
+        """Live worker running the agent, or one with it suspended, None if
+        there is none."""
+
+    @abstractmethod
+    async def list_agents(self, alive_within: float) -> dict[str, list[AgentListItem]]:
+        """Agents of the live workers by worker."""
+
+    @abstractmethod
+    async def send(self, worker_id: str, message: dict) -> None:
+        """Put a JSON serializable message into the inbox of the worker."""
+
+    @abstractmethod
+    async def receive(self, worker_id: str) -> list[dict]:
+        """Take the messages from the inbox of the worker, oldest first."""
+
+    @abstractmethod
+    async def push(self, channel: str, kind: str, data: bytes = b"") -> None:
+        """Append an entry to the response channel."""
+
+    @abstractmethod
+    async def pull(self, channel: str, after: int = 0) -> list[tuple[int, str, bytes]]:
+        """Entries of the channel after the cursor as (cursor, kind, data)."""
+
+    @abstractmethod
+    async def drop(self, channel: str) -> None:
+        """Delete the channel and its entries."""
+
+    @abstractmethod
+    async def expire(self, older_than: float) -> None:
+        """Delete inbox messages and channel entries written more than
+        older_than seconds ago, e.g. left behind by a worker that crashed
+        before reading or dropping them."""
+
+    async def close(self) -> None:
+        """Release the resources of the backend."""
+
+
+class InMemoryStateBackend(StateBackend):
+    """State shared by the workers of one process, e.g. in tests.
+
+    Workers in separate processes need a backend they all reach, such as
+    SQLiteStateBackend.
+    """
+
+    def __init__(self):
+        self._heartbeats: dict[str, float] = {}
+        self._agents: dict[str, dict[str, AgentListItem]] = {}
+        # entries with the time they were written
+        self._inboxes: defaultdict[str, list[tuple[float, dict]]] = defaultdict(list)
+        self._channels: defaultdict[str, list[tuple[int, str, bytes, float]]] = defaultdict(list)
+        self._cursor = 0
+
+    def _is_alive(self, worker_id: str, alive_within: float) -> bool:
+        return time.time() - self._heartbeats.get(worker_id, 0) <= alive_within
+
+    async def heartbeat(self, worker_id: str) -> None:
+        self._heartbeats[worker_id] = time.time()
+
+    async def remove_worker(self, worker_id: str) -> None:
+        self._heartbeats.pop(worker_id, None)
+        self._agents.pop(worker_id, None)
+        self._inboxes.pop(worker_id, None)
+
+    async def live_workers(self, alive_within: float) -> list[str]:
+        return [worker_id for worker_id in self._heartbeats if self._is_alive(worker_id, alive_within)]
+
+    async def publish_agents(self, worker_id: str, agents: list[AgentListItem]) -> None:
+        self._agents[worker_id] = {agent.agent_id: agent for agent in agents}
+
+    async def owner(self, agent_id: str, alive_within: float) -> str | None:
+        owners = sorted(
+            (agents[agent_id].state == AgentStatesEnum.SUSPENDED, worker_id)
+            for worker_id, agents in self._agents.items()
+            if agent_id in agents and self._is_alive(worker_id, alive_within)
+        )
+        return owners[0][1] if owners else None
+
+    async def list_agents(self, alive_within: float) -> dict[str, list[AgentListItem]]:
+        return {
+            worker_id: list(agents.values())
+            for worker_id, agents in self._agents.items()
+            if self._is_alive(worker_id, alive_within)
+        }
+
+    async def send(self, worker_id: str, message: dict) -> None:
+        self._inboxes[worker_id].append((time.time(), json.loads(json.dumps(message))))
+
+    async def receive(self, worker_id: str) -> list[dict]:
+        return [message for _, message in self._inboxes.pop(worker_id, [])]
+
+    async def push(self, channel: str, kind: str, data: bytes = b"") -> None:
+        self._cursor += 1
+        self._channels[channel].append((self._cursor, kind, data, time.time()))
+
+    async def pull(self, channel: str, after: int = 0) -> list[tuple[int, str, bytes]]:
+        return [(cursor, kind, data) for cursor, kind, data, _ in self._channels.get(channel, []) if cursor > after]
+
+    async def drop(self, channel: str) -> None:
+        self._channels.pop(channel, None)
+
+    async def expire(self, older_than: float) -> None:
+        expired_at = time.time() - older_than
+        self._inboxes = defaultdict(
+            list,
+            {
+                worker_id: [entry for entry in messages if entry[0] >= expired_at]
+                for worker_id, messages in self._inboxes.items()
+                if messages[-1][0] >= expired_at
+            },
+        )
+        self._channels = defaultdict(
+            list,
+            {
+                channel: [entry for entry in entries if entry[3] >= expired_at]
+                for channel, entries in self._channels.items()
+                if entries[-1][3] >= expired_at
+            },
+        )
+
+
+class SQLiteStateBackend(StateBackend):
+    """State shared through an SQLite database, for the worker processes
+    of one host.
+
+    Every call is a short transaction on a WAL mode database, run on a
+    thread of the backend, so waiting for the lock of another worker
+    does not block the event loop. The database must be on a local disk;
+    servers on several hosts need a backend on a service they all reach,
+    implementing StateBackend.
+    """
+
+    def __init__(self, path: str, timeout: float = 5):
+        self.path = path
+        # one thread, so the calls on the connection never overlap
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-state")
+        self._db = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS agents (
+                agent_id TEXT PRIMARY KEY, worker_id TEXT NOT NULL, item TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS agents_worker ON agents (worker_id);
+            CREATE TABLE IF NOT EXISTS inbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, worker_id TEXT NOT NULL, message TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS inbox_worker ON inbox (worker_id, id);
+            CREATE INDEX IF NOT EXISTS inbox_created ON inbox (created_at);
+            CREATE TABLE IF NOT EXISTS channels (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, kind TEXT NOT NULL, data BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS channels_channel ON channels (channel, id);
+            CREATE INDEX IF NOT EXISTS channels_created ON channels (created_at);
+            """
+        )
+
+    async def _run(self, query: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, query, *args)
+
+    async def close(self) -> None:
+        await self._run(self._db.close)
+        self._executor.shutdown()
+
+    async def heartbeat(self, worker_id: str) -> None:
+        await self._run(
+            self._db.execute,
+            "INSERT INTO workers (worker_id, heartbeat) VALUES (?, ?) "
+            "ON CONFLICT (worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+            (worker_id, time.time()),
+        )
+
+    def _remove_worker(self, worker_id: str) -> None:
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+            self._db.execute("DELETE FROM agents WHERE worker_id = ?", (worker_id,))
+            self._db.execute("DELETE FROM inbox WHERE worker_id = ?", (worker_id,))
+
+    async def remove_worker(self, worker_id: str) -> None:
+        await self._run(self._remove_worker, worker_id)
+
+    def _live_workers(self, alive_within: float) -> list[str]:
+        rows = self._db.execute(
+            "SELECT worker_id FROM workers WHERE heartbeat >= ? ORDER BY worker_id", (time.time() - alive_within,)
+        )
+        return [worker_id for (worker_id,) in rows]
+
+    async def live_workers(self, alive_within: float) -> list[str]:
+        return await self._run(self._live_workers, alive_within)
+
+    def _publish_agents(self, worker_id: str, agents: list[AgentListItem]) -> None:
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM agents WHERE worker_id = ?", (worker_id,))
+            for suspended, insert in ((False, "INSERT OR REPLACE"), (True, "INSERT OR IGNORE")):
+                self._db.executemany(
+                    f"{insert} INTO agents (agent_id, worker_id, item) VALUES (?, ?, ?)",
+                    [
+                        (agent.agent_id, worker_id, agent.model_dump_json())
+                        for agent in agents
+                        if (agent.state == AgentStatesEnum.SUSPENDED) == suspended
+                    ],
+                )
+
+    async def publish_agents(self, worker_id: str, agents: list[AgentListItem]) -> None:
+        await self._run(self._publish_agents, worker_id, agents)
+
+    def _owner(self, agent_id: str, alive_within: float) -> str | None:
+        row = self._db.execute(
+            "SELECT agents.worker_id FROM agents JOIN workers USING (worker_id) WHERE agent_id = ? AND heartbeat >= ?",
+            (agent_id, time.time() - alive_within),
+        ).fetchone()
+        return row[0] if row else None
+
+    async def owner(self, agent_id: str, alive_within: float) -> str | None:
+        return await self._run(self._owner, agent_id, alive_within)
+
+    def _list_agents(self, alive_within: float) -> dict[str, list[AgentListItem]]:
+        rows = self._db.execute(
+            "SELECT agents.worker_id, item FROM agents JOIN workers USING (worker_id) WHERE heartbeat >= ?",
+            (time.time() - alive_within,),
+        )
+        agents: dict[str, list[AgentListItem]] = {}
+        for worker_id, item in rows:
+            agents.setdefault(worker_id, []).append(AgentListItem.model_validate_json(item))
+        return agents
+
+    async def list_agents(self, alive_within: float) -> dict[str, list[AgentListItem]]:
+        return await self._run(self._list_agents, alive_within)
+
+    async def send(self, worker_id: str, message: dict) -> None:
+        await self._run(
+            self._db.execute,
+            "INSERT INTO inbox (worker_id, message, created_at) VALUES (?, ?, ?)",
+            (worker_id, json.dumps(message), time.time()),
+        )
+
+    def _receive(self, worker_id: str) -> list[dict]:
+        rows = self._db.execute("DELETE FROM inbox WHERE worker_id = ? RETURNING id, message", (worker_id,))
+        return [json.loads(message) for _, message in sorted(rows.fetchall())]
+
+    async def receive(self, worker_id: str) -> list[dict]:
+        return await self._run(self._receive, worker_id)
+
+    async def push(self, channel: str, kind: str, data: bytes = b"") -> None:
+        await self._run(
+            self._db.execute,
+            "INSERT INTO channels (channel, kind, data, created_at) VALUES (?, ?, ?, ?)",
+            (channel, kind, data, time.time()),
+        )
+
+    def _pull(self, channel: str, after: int) -> list[tuple[int, str, bytes]]:
+        rows = self._db.execute(
+            "SELECT id, kind, data FROM channels WHERE channel = ? AND id > ? ORDER BY id", (channel, after)
+        )
+        return [(cursor, kind, bytes(data)) for cursor, kind, data in rows]
+
+    async def pull(self, channel: str, after: int = 0) -> list[tuple[int, str, bytes]]:
+        return await self._run(self._pull, channel, after)
+
+    async def drop(self, channel: str) -> None:
+        await self._run(self._db.execute, "DELETE FROM channels WHERE channel = ?", (channel,))
+
+    def _expire(self, older_than: float) -> None:
+        expired_at = time.time() - older_than
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM inbox WHERE created_at < ?", (expired_at,))
+            self._db.execute("DELETE FROM channels WHERE created_at < ?", (expired_at,))
+
+    async def expire(self, older_than: float) -> None:
+        await self._run(self._expire, older_than)
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+from sgr_deep_research.api.models import AgentListItem
+from sgr_deep_research.services.agent_store import AgentStore
+from sgr_deep_research.services.state_backend import StateBackend
+
+logger = logging.getLogger(__name__)
+
+ForwardedRequestHandler = Callable[[dict], Awaitable[Response | BaseModel]]
+
+
+class WorkerRouter:
+    """Routes requests for agents of other API workers through the state
+    backend.
+
+    The router publishes the agents of its worker together with a
+    heartbeat, serves the requests other workers forward to it with the
+    handler and relays the responses of the requests it forwards. A
+    worker without a heartbeat for worker_timeout seconds is considered
+    gone together with its agents. Messages and response entries not
+    taken within message_ttl seconds, e.g. of a worker that crashed, are
+    deleted with every heartbeat.
+    """
+
+    def __init__(
+        self,
+        backend: StateBackend,
+        store: AgentStore,
+        handler: ForwardedRequestHandler,
+        worker_id: str | None = None,
+        poll_interval: float = 0.05,
+        heartbeat_interval: float = 1,
+        worker_timeout: float = 10,
+        message_ttl: float = 60,
+    ):
+        self.backend = backend
+        self.store = store
+        self.handler = handler
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.worker_timeout = worker_timeout
+        self.message_ttl = message_ttl
+        self._published: dict[str, str] | None = None
+        self._serving: dict[str, asyncio.Task] = {}
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        await self.backend.heartbeat(self.worker_id)
+        await self.publish()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Worker {self.worker_id} joined the state backend")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for task in list(self._serving.values()):
+            task.cancel()
+        await asyncio.gather(*self._serving.values(), return_exceptions=True)
+        await self.backend.remove_worker(self.worker_id)
+        await self.backend.close()
+
+    async def publish(self) -> None:
+        """Publish the agents of this worker if they changed since the last
+        time."""
+        agents = await self.store.list_agents()
+        published = {agent.agent_id: agent.state for agent in agents}
+        if published != self._published:
+            await self.backend.publish_agents(self.worker_id, agents)
+            self._published = published
+
+    async def owner(self, agent_id: str) -> str | None:
+        """Other live worker running the agent, None if there is none."""
+        owner = await self.backend.owner(agent_id, self.worker_timeout)
+        return owner if owner != self.worker_id else None
+
+    async def list_agents(self) -> list[AgentListItem]:
+        """Agents of the other live workers as of their last heartbeat."""
+        workers = await self.backend.list_agents(self.worker_timeout)
+        return [agent for worker_id, agents in workers.items() if worker_id != self.worker_id for agent in agents]
+
+    async def forward(self, owner: str, request: dict) -> Response:
+        """Response of the owner worker to the request.
+
+        Raises:
+            HTTPException: The owner failed the request or did not pick it
+                up within worker_timeout seconds
+        """
+        channel = uuid.uuid4().hex
+        await self.backend.send(owner, {"channel": channel, "request": request})
+        cursor, kind, data = await self._first_entry(owner, channel)
+        if kind == "error":
+            await self.backend.drop(channel)
+            raise HTTPException(**json.loads(data))
+
+        head = json.loads(data)
+        frames = self._relay(owner, channel, cursor)
+        if head["media_type"] == "text/event-stream":
+            return StreamingResponse(frames, media_type=head["media_type"], headers=head["headers"])
+        body = b"".join([frame async for frame in frames])
+        return Response(body, status_code=head["status_code"], media_type=head["media_type"])
+
+    async def _first_entry(self, owner: str, channel: str) -> tuple[int, str, bytes]:
+        deadline = asyncio.get_running_loop().time() + self.worker_timeout
+        while not (entries := await self.backend.pull(channel)):
+            if asyncio.get_running_loop().time() > deadline:
+                await self.backend.send(owner, {"close": channel})
+                raise HTTPException(status_code=503, detail=f"Worker {owner} running the agent did not respond")
+            await asyncio.sleep(self.poll_interval)
+        return entries[0]
+
+    async def _relay(self, owner: str, channel: str, cursor: int) -> AsyncIterator[bytes]:
+        """Frames of the channel until the owner ends it; a reader that goes
+        away asks the owner to stop serving the request."""
+        loop = asyncio.get_running_loop()
+        ended = False
+        last_entry_at = loop.time()
+        try:
+            while not ended:
+                entries = await self.backend.pull(channel, cursor)
+                for cursor, kind, data in entries:
+                    if kind == "frame":
+                        yield data
+                    else:
+                        ended = True
+                        break
+                if entries:
+                    last_entry_at = loop.time()
+                elif loop.time() - last_entry_at > self.worker_timeout and owner not in (
+                    await self.backend.live_workers(self.worker_timeout)
+                ):
+                    logger.warning(f"Worker {owner} went away while serving channel {channel}")
+                    ended = True
+                else:
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            if not ended:
+                await self.backend.send(owner, {"close": channel})
+            await self.backend.drop(channel)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        heartbeat_at = loop.time() + self.heartbeat_interval
+        while True:
+            try:
+                for message in await self.backend.receive(self.worker_id):
+                    self._dispatch(message)
+                if loop.time() >= heartbeat_at:
+                    heartbeat_at = loop.time() + self.heartbeat_interval
+                    await self.backend.heartbeat(self.worker_id)
+                    await self.publish()
+                    await self.backend.expire(self.message_ttl)
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} failed to sync with the state backend: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def _dispatch(self, message: dict) -> None:
+        if "close" in message:
+            task = self._serving.get(message["close"])
+            if task is not None:
+                task.cancel()
+            return
+        channel = message["channel"]
+        self._serving[channel] = asyncio.create_task(self._serve(channel, message["request"]))
+        self._serving[channel].add_done_callback(lambda _: self._serving.pop(channel, None))
+
+    async def _serve(self, channel: str, request: dict) -> None:
+        """Serve a request of another worker, writing the response to the
+        channel."""
+        try:
+            response = await self.handler(request)
+        except HTTPException as e:
+            error = {"status_code": e.status_code, "detail": e.detail}
+            await self.backend.push(channel, "error", json.dumps(error).encode())
+            return
+        except Exception as e:
+            logger.error(f"Failed to serve forwarded request {request}: {e}", exc_info=True)
+            await self.backend.push(channel, "error", json.dumps({"status_code": 500, "detail": str(e)}).encode())
+            return
+
+        if not isinstance(response, Response):
+            response = Response(response.model_dump_json(), media_type="application/json")
+        head = {
+            "status_code": response.status_code,
+            "media_type": response.media_type,
+            "headers": {name: value for name, value in response.headers.items() if name.startswith("x-")},
+        }
+        try:
+            await self.backend.push(channel, "head", json.dumps(head).encode())
+            if isinstance(response, StreamingResponse):
+                async for frame in response.body_iterator:
+                    await self.backend.push(channel, "frame", frame if isinstance(frame, bytes) else frame.encode())
+            else:
+                await self.backend.push(channel, "frame", response.body)
+        except Exception as e:
+            logger.error(f"Failed to relay response of forwarded request {request}: {e}", exc_info=True)
+        await self.backend.push(channel, "end")
@@ -17,6 +17,39 @@ class ServerConfig(BaseSettings):
     agents_file: str | None = Field(default=None, description="Optional agents definitions file path")
     host: str = Field(default="0.0.0.0", description="Host to listen on")
     port: int = Field(default=8010, gt=0, le=65535, description="Port to listen on")
+    finished_agent_ttl: float | None = Field(
+        default=3600, gt=0, description="Seconds a finished agent is kept in memory after its last access"
+    )
+    max_finished_agents: int | None = Field(
+        default=500, ge=0, description="Maximum number of finished agents kept in memory"
+    )
+    max_finished_agents_bytes: int | None = Field(
+        default=None, gt=0, description="Maximum estimated size of finished agents kept in memory"
+    )
+    agents_spill_dir: str | None = Field(
+        default=None, description="Directory the state of evicted agents is kept in for the state endpoint"
+    )
+    suspended_agent_ttl: float | None = Field(
+        default=86400,
+        gt=0,
+        description="Seconds an agent suspended while waiting for clarification can be resumed before it expires",
+    )
+    paused_agent_ttl: float | None = Field(
+        default=3600,
+        gt=0,
+        description="Seconds a paused agent is kept without a client before it is cancelled, None keeps it",
+    )
+    max_running_agents: int | None = Field(
+        default=None, gt=0, description="Maximum number of agents running at once per worker, None is unlimited"
+    )
+    max_queued_agents: int = Field(
+        default=100, ge=0, description="Maximum number of new agents waiting to run per worker, more are rejected"
+    )
+    workers: int = Field(default=1, ge=1, description="Number of worker processes running agents")
+    state_db: str | None = Field(
+        default=None,
+        description="SQLite database the workers share agent ownership through, sgr_state.db with several workers",
+    )
 
 
 def setup_logging() -> None:
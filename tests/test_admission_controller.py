@@ -0,0 +1,192 @@
+"""Tests for AdmissionController.
+
+This module contains tests for the running agents limit, the priority
+queue with its position updates, the rejection of agents over the
+queue size and the places given up by idle agents.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from sgr_agent_core.base_agent import BaseAgent
+from sgr_agent_core.models import AgentStatesEnum
+from sgr_deep_research.services import AdmissionController, AdmissionQueueFull
+from tests.conftest import create_test_agent
+
+
+def make_agent(release: asyncio.Event) -> BaseAgent:
+    """Agent with stub phases that completes once the event is set."""
+    agent = create_test_agent(BaseAgent, task="Test")
+    agent._reasoning_phase = AsyncMock()
+    agent._select_action_phase = AsyncMock(return_value=Mock())
+
+    async def action_phase(action_tool):
+        await release.wait()
+        agent._context.state = AgentStatesEnum.COMPLETED
+
+    agent._action_phase = action_phase
+    agent._save_agent_log = Mock()
+    return agent
+
+
+def queue_positions(agent: BaseAgent) -> list[dict]:
+    frames = list(agent.streaming_generator.queue._queue)
+    return [json.loads(frame[len(b"data: ") :])["queue"] for frame in frames if b'"queue"' in frame]
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController."""
+
+    @pytest.mark.asyncio
+    async def test_unlimited_by_default(self):
+        """Test that every agent runs at once without a limit."""
+        controller = AdmissionController()
+        release = asyncio.Event()
+        agents = [make_agent(release) for _ in range(3)]
+        tasks = [controller.submit(agent) for agent in agents]
+        await asyncio.sleep(0.01)
+
+        assert controller.stats()["running"] == 3
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.stats()["running"] == 0
+
+    @pytest.mark.asyncio
+    async def test_queued_until_place_is_free(self):
+        """Test that agents over the limit wait in the queued state."""
+        controller = AdmissionController(max_running=1)
+        first_release, second_release = asyncio.Event(), asyncio.Event()
+        first, second = make_agent(first_release), make_agent(second_release)
+        first_task = controller.submit(first)
+        second_task = controller.submit(second)
+        await asyncio.sleep(0.01)
+
+        assert second._context.state == AgentStatesEnum.QUEUED
+        assert second._context.iteration == 0
+        assert queue_positions(second) == [{"position": 1, "queued": 1}]
+
+        first_release.set()
+        await first_task
+        await asyncio.sleep(0.01)
+        assert second._context.state == AgentStatesEnum.INITED
+        assert second._context.iteration == 1
+
+        second_release.set()
+        await second_task
+        assert controller.stats() == {"running": 0, "queued": 0, "max_running": 1, "max_queued": 100, "rejected": 0}
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_first(self):
+        """Test that the queue is ordered by priority, then submission."""
+        controller = AdmissionController(max_running=1)
+        release = asyncio.Event()
+        running = make_agent(release)
+        low, high, later_high = make_agent(release), make_agent(release), make_agent(release)
+        tasks = [
+            controller.submit(running),
+            controller.submit(low, priority=0),
+            controller.submit(high, priority=5),
+            controller.submit(later_high, priority=5),
+        ]
+
+        assert queue_positions(low) == [
+            {"position": 1, "queued": 1},
+            {"position": 2, "queued": 2},
+            {"position": 3, "queued": 3},
+        ]
+        assert queue_positions(high) == [{"position": 1, "queued": 2}]
+        assert queue_positions(later_high) == [{"position": 2, "queued": 3}]
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert high.finish_time < later_high.finish_time < low.finish_time
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejected(self):
+        """Test that agents over the queue size are rejected with the
+        expected wait."""
+        controller = AdmissionController(max_running=1, max_queued=1, retry_after=20)
+        release = asyncio.Event()
+        tasks = [controller.submit(make_agent(release)), controller.submit(make_agent(release))]
+
+        with pytest.raises(AdmissionQueueFull) as exc_info:
+            controller.submit(make_agent(release))
+
+        assert exc_info.value.retry_after == 20
+        assert controller.stats()["rejected"] == 1
+        controller._mean_duration = 60
+        assert controller.expected_wait() == 60
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_while_queued(self):
+        """Test that a cancelled agent leaves the queue and its stream
+        ends."""
+        controller = AdmissionController(max_running=1)
+        release = asyncio.Event()
+        running, cancelled, waiting = make_agent(release), make_agent(release), make_agent(release)
+        tasks = [controller.submit(running)]
+        cancelled_task = controller.submit(cancelled)
+        tasks.append(controller.submit(waiting))
+        await asyncio.sleep(0.01)
+
+        assert cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled_task
+
+        assert cancelled._context.state == AgentStatesEnum.CANCELLED
+        assert cancelled.streaming_generator.queue._queue[-1] is None
+        assert queue_positions(waiting)[-1] == {"position": 1, "queued": 1}
+        assert controller.stats()["queued"] == 1
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_paused_agent_gives_up_place_and_queues_again(self):
+        """Test that a paused agent lets a queued one run, and waits for a
+        place with its priority once resumed."""
+        controller = AdmissionController(max_running=1)
+        release, other_release = asyncio.Event(), asyncio.Event()
+        paused, other, low = make_agent(release), make_agent(other_release), make_agent(release)
+        paused.pause()
+        tasks = [controller.submit(paused, priority=5), controller.submit(other)]
+        await asyncio.sleep(0.01)
+
+        assert paused._context.state == AgentStatesEnum.PAUSED
+        assert other._context.iteration == 1
+        assert controller.stats()["running"] == 1
+
+        tasks.append(controller.submit(low))
+        paused.resume()
+        await asyncio.sleep(0.01)
+        assert queue_positions(paused) == [{"position": 1, "queued": 2}]
+        assert paused._context.iteration == 0
+
+        other_release.set()
+        release.set()
+        await asyncio.gather(*tasks)
+        assert paused.finish_time < low.finish_time
+        assert controller.stats()["running"] == controller.stats()["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_agent_cancelled_while_paused_frees_place_once(self):
+        """Test that an agent that gives up its place and is cancelled while
+        paused does not free a place again."""
+        controller = AdmissionController(max_running=1)
+        release = asyncio.Event()
+        paused, other = make_agent(release), make_agent(release)
+        paused.config.execution.pause_timeout = 0.01
+        paused.pause()
+        tasks = [controller.submit(paused), controller.submit(other)]
+        await asyncio.sleep(0.05)
+
+        assert paused._context.state == AgentStatesEnum.CANCELLED
+        assert controller.stats()["running"] == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.stats()["running"] == 0
@@ -339,6 +339,45 @@ class TestAgentFactoryClientCreation:
         assert client.api_key == "test-key"
         assert client._client is not None
 
+    def test_same_endpoint_reuses_pooled_client(self):
+        """Test that agents with the same endpoint share one client."""
+        first = AgentFactory._create_client(LLMConfig(api_key="pool-key", base_url="https://pool.example/v1"))
+        second = AgentFactory._create_client(
+            LLMConfig(api_key="pool-key", base_url="https://pool.example/v1", model="other-model")
+        )
+        other = AgentFactory._create_client(LLMConfig(api_key="other-key", base_url="https://pool.example/v1"))
+
+        assert first is second
+        assert first is not other
+
+    def test_pooled_client_uses_connection_limits(self):
+        """Test that connection limits from LLMConfig are applied to the
+        pooled HTTP client."""
+        client = AgentFactory._create_client(
+            LLMConfig(api_key="limits-key", base_url="https://limits.example/v1", max_connections=7)
+        )
+
+        assert client._client._transport._pool._max_connections == 7
+
+    def test_connection_settings_not_sent_with_requests(self):
+        """Test that client settings are excluded from completion request
+        kwargs."""
+        kwargs = LLMConfig(api_key="test-key", max_connections=5, keepalive_expiry=1.0).to_openai_client_kwargs()
+
+        assert not {"max_connections", "max_keepalive_connections", "keepalive_expiry"} & kwargs.keys()
+
+    @pytest.mark.asyncio
+    async def test_close_clients_empties_pool(self):
+        """Test that closing the pool closes clients and recreates them on
+        next use."""
+        llm_config = LLMConfig(api_key="close-key", base_url="https://close.example/v1")
+        client = AgentFactory._create_client(llm_config)
+
+        await AgentFactory.close_clients()
+
+        assert client.is_closed()
+        assert AgentFactory._create_client(llm_config) is not client
+
     @pytest.mark.asyncio
     async def test_stream_request_with_extra_parameters(self):
         """Test that additional parameters from LLMConfig (extra='allow') are
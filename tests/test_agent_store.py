@@ -0,0 +1,288 @@
+"""Tests for InMemoryAgentStore.
+
+This module contains tests for TTL and LRU eviction of finished agents,
+for spilling their state to disk and for suspended agents.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from sgr_agent_core.agents import SGRAgent
+from sgr_agent_core.models import AgentStatesEnum, SourceData
+from sgr_agent_core.services import CheckpointStore
+from sgr_deep_research.services import InMemoryAgentStore
+from tests.conftest import create_test_agent
+
+
+def make_agent(state: AgentStatesEnum = AgentStatesEnum.COMPLETED, task: str = "Test task") -> SGRAgent:
+    agent = create_test_agent(SGRAgent, task=task)
+    agent._context.state = state
+    if state in AgentStatesEnum.FINISH_STATES.value:
+        agent.finish_time = datetime.now()
+    return agent
+
+
+class TestInMemoryAgentStore:
+    """Tests for InMemoryAgentStore."""
+
+    def test_unbounded_by_default(self):
+        """Test that nothing is evicted without limits."""
+        store = InMemoryAgentStore()
+        agents = [make_agent() for _ in range(5)]
+        for agent in agents:
+            store.add(agent)
+
+        assert len(store) == 5
+        assert all(agent.id in store for agent in agents)
+
+    def test_lru_evicts_least_recently_used_finished(self):
+        """Test that the finished agent accessed longest ago goes first."""
+        store = InMemoryAgentStore(max_finished=2)
+        first, second, third = make_agent(), make_agent(), make_agent()
+        store.add(first)
+        store.add(second)
+        store.get(first.id)
+        store.add(third)
+
+        assert first.id in store
+        assert second.id not in store
+        assert third.id in store
+        assert store.stats()["evicted"] == 1
+
+    def test_running_agents_never_evicted(self):
+        """Test that running and waiting agents stay over the limits."""
+        store = InMemoryAgentStore(ttl=0, max_finished=0)
+        running = make_agent(AgentStatesEnum.RESEARCHING)
+        waiting = make_agent(AgentStatesEnum.WAITING_FOR_CLARIFICATION)
+        finished = make_agent()
+        for agent in (running, waiting, finished):
+            store.add(agent)
+
+        assert running.id in store
+        assert waiting.id in store
+        assert finished.id not in store
+
+    @pytest.mark.asyncio
+    async def test_paused_agents_cancelled_after_ttl(self):
+        """Test that paused agents not accessed for longer than the paused
+        TTL are cancelled, and running ones are not."""
+        store = InMemoryAgentStore(paused_ttl=60)
+        paused, running = make_agent(AgentStatesEnum.PAUSED), make_agent(AgentStatesEnum.RESEARCHING)
+        for agent in (paused, running):
+            agent.cancel = Mock()
+            store.add(agent)
+            store._last_access[agent.id] = datetime.now() - timedelta(seconds=120)
+
+        await store.list_agents()
+
+        assert paused.cancel.called
+        assert not running.cancel.called
+
+    def test_ttl_counts_from_finish_and_last_access(self):
+        """Test that finished agents idle for longer than the TTL are
+        evicted."""
+        store = InMemoryAgentStore(ttl=60)
+        recent, stale = make_agent(), make_agent()
+        store.add(recent)
+        store.add(stale)
+        stale.finish_time = datetime.now() - timedelta(seconds=120)
+        store._last_access[stale.id] = datetime.now() - timedelta(seconds=120)
+
+        assert recent.id in store
+        assert stale.id not in store
+
+    def test_bytes_limit(self):
+        """Test that finished agents are evicted by their estimated size."""
+        store = InMemoryAgentStore(max_finished_bytes=15_000)
+        agents = [make_agent() for _ in range(3)]
+        for agent in agents:
+            agent._context.sources["https://example.com"] = SourceData(
+                number=1, url="https://example.com", full_content="x" * 10_000
+            )
+            store.add(agent)
+
+        assert [agent.id in store for agent in agents] == [False, False, True]
+        assert store.stats()["finished_bytes"] > 10_000
+
+    @pytest.mark.asyncio
+    async def test_evicted_agent_forgotten_without_spill(self):
+        """Test that an evicted agent is unknown without a spill dir."""
+        store = InMemoryAgentStore(max_finished=0)
+        agent = make_agent()
+        store.add(agent)
+
+        assert await store.get_state(agent.id) is None
+        assert await store.list_agents() == []
+
+    @pytest.mark.asyncio
+    async def test_evicted_agent_stream_spool_deleted(self, tmp_path):
+        """Test that the stream spool file of a detached agent is gone once
+        its stream completed and the agent is evicted."""
+        store = InMemoryAgentStore(max_finished=0)
+        agent = make_agent(AgentStatesEnum.RESEARCHING)
+        agent.stream_broadcaster.replay_size = 1
+        agent.stream_broadcaster.spool(tmp_path / f"{agent.id}.sse")
+        store.add(agent)
+        for i in range(3):
+            agent.streaming_generator.add_chunk_from_str(str(i))
+        agent.streaming_generator.finish()
+        frames = [frame async for frame in agent.stream_broadcaster.subscribe(segment=0)]
+        assert len(frames) == 5
+        assert (tmp_path / f"{agent.id}.sse").exists()
+
+        agent._context.state = AgentStatesEnum.COMPLETED
+        agent.finish_time = datetime.now()
+        await store.list_agents()
+
+        assert agent.id not in store
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_spilled_state_served_after_eviction_and_restart(self, tmp_path):
+        """Test that the state of evicted agents is read back from disk."""
+        store = InMemoryAgentStore(max_finished=0, spill_dir=str(tmp_path))
+        agent = make_agent(task="Spilled task")
+        agent._context.execution_result = "Report"
+        agent._context.iteration = 3
+        store.add(agent)
+
+        state = await store.get_state(agent.id)
+        assert agent.id not in store
+        assert state.task == "Spilled task"
+        assert state.execution_result == "Report"
+        assert state.iteration == 3
+        assert state.stream is not None
+
+        restarted = InMemoryAgentStore(spill_dir=str(tmp_path))
+        assert [item.agent_id for item in await restarted.list_agents()] == [agent.id]
+        assert (await restarted.get_state(agent.id)).state == AgentStatesEnum.COMPLETED.value
+
+    @pytest.mark.asyncio
+    async def test_spilled_state_expires_after_ttl(self, tmp_path):
+        """Test that a state spilled longer than the TTL ago is forgotten and
+        its file deleted."""
+        store = InMemoryAgentStore(ttl=60, max_finished=0, spill_dir=str(tmp_path))
+        agent = make_agent()
+        store.add(agent)
+        assert [item.agent_id for item in await store.list_agents()] == [agent.id]
+
+        spilled = store._spilled[agent.id]
+        store._spilled[agent.id] = spilled._replace(spilled_at=datetime.now() - timedelta(seconds=120))
+
+        assert await store.get_state(agent.id) is None
+        assert await store.list_agents() == []
+        assert list(tmp_path.iterdir()) == []
+
+
+def make_suspended_agent(checkpoint_dir) -> SGRAgent:
+    agent = create_test_agent(SGRAgent, task="Suspended task")
+    agent.config.execution.checkpoint_dir = str(checkpoint_dir)
+    agent._context.iteration = 2
+    agent._context.state = AgentStatesEnum.WAITING_FOR_CLARIFICATION
+    CheckpointStore.save(str(checkpoint_dir), agent.checkpoint())
+    agent._context.state = AgentStatesEnum.SUSPENDED
+    agent.finish_time = datetime.now()
+    return agent
+
+
+class TestSuspendedAgents:
+    """Tests for agents suspended while waiting for clarification."""
+
+    @pytest.mark.asyncio
+    async def test_suspended_agent_dropped_from_memory(self, tmp_path):
+        """Test that only the checkpoint of a suspended agent is kept."""
+        store = InMemoryAgentStore()
+        agent = make_suspended_agent(tmp_path)
+        store.add(agent)
+
+        assert agent.id not in store
+        assert (await store.get_suspended(agent.id)).iteration == 2
+        assert [item.state for item in await store.list_agents()] == [AgentStatesEnum.SUSPENDED]
+        state = await store.get_state(agent.id)
+        assert state.state == AgentStatesEnum.SUSPENDED.value
+        assert state.iteration == 2
+        assert store.stats()["suspended"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resumed_agent_replaces_suspended(self, tmp_path):
+        """Test that the agent rebuilt from the checkpoint is served
+        again."""
+        store = InMemoryAgentStore()
+        agent = make_suspended_agent(tmp_path)
+        store.add(agent)
+        resumed = create_test_agent(SGRAgent, task="Suspended task")
+        resumed.restore(await store.get_suspended(agent.id))
+        store.add(resumed)
+
+        assert store.get(agent.id) is resumed
+        assert await store.get_suspended(agent.id) is None
+        assert len(store) == 1
+
+    @pytest.mark.asyncio
+    async def test_suspended_agent_expires(self, tmp_path):
+        """Test that the checkpoint of an agent suspended for longer than
+        the TTL is deleted."""
+        store = InMemoryAgentStore(suspended_ttl=60)
+        agent = make_suspended_agent(tmp_path)
+        agent.finish_time = datetime.now() - timedelta(seconds=120)
+        store.add(agent)
+
+        assert await store.get_state(agent.id) is None
+        assert CheckpointStore.load(str(tmp_path), agent.id) is None
+        assert store.stats()["expired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_only_one_worker_claims_suspended_agent(self, tmp_path):
+        """Test that of two workers sharing the checkpoint directory only one
+        gets the checkpoint, and the other forgets the agent."""
+        agent = make_suspended_agent(tmp_path)
+        first, second = InMemoryAgentStore(), InMemoryAgentStore()
+        first.load_suspended(str(tmp_path))
+        second.load_suspended(str(tmp_path))
+
+        assert (await first.claim_suspended(agent.id)).agent_id == agent.id
+        assert await second.claim_suspended(agent.id) is None
+        assert await second.list_agents() == []
+
+    @pytest.mark.asyncio
+    async def test_released_claim_can_be_resumed_again(self, tmp_path):
+        """Test that a checkpoint put back after a failed resume is
+        suspended again."""
+        agent = make_suspended_agent(tmp_path)
+        store = InMemoryAgentStore()
+        store.load_suspended(str(tmp_path))
+        await store.claim_suspended(agent.id)
+        await store.release_suspended(agent.id)
+
+        assert (await store.get_suspended(agent.id)).agent_id == agent.id
+        assert [item.agent_id for item in await store.list_agents()] == [agent.id]
+
+    @pytest.mark.asyncio
+    async def test_agent_resumed_elsewhere_dropped_from_listing(self, tmp_path):
+        """Test that a worker forgets an agent another worker resumed once
+        its checkpoint changed."""
+        agent = make_suspended_agent(tmp_path)
+        store = InMemoryAgentStore()
+        store.load_suspended(str(tmp_path))
+        resumed = create_test_agent(SGRAgent, task="Suspended task")
+        resumed.restore(CheckpointStore.claim(str(tmp_path), agent.id))
+        resumed._context.state = AgentStatesEnum.RESEARCHING
+        CheckpointStore.save(str(tmp_path), resumed.checkpoint())
+
+        assert await store.list_agents() == []
+
+    @pytest.mark.asyncio
+    async def test_suspended_agents_loaded_after_restart(self, tmp_path):
+        """Test that agents suspended in the checkpoint directory are taken
+        over, and running ones are not."""
+        suspended = make_suspended_agent(tmp_path)
+        running = create_test_agent(SGRAgent, task="Running task")
+        CheckpointStore.save(str(tmp_path), running.checkpoint())
+
+        store = InMemoryAgentStore()
+        store.load_suspended(str(tmp_path))
+
+        assert [item.agent_id for item in await store.list_agents()] == [suspended.id]
+        assert (await store.get_suspended(suspended.id)).task == "Suspended task"
@@ -0,0 +1,457 @@
+"""Tests for concrete agent implementations.
+
+This module contains tests for the LLM interaction of ToolCallingAgent
+and SGRToolCallingAgent with a mocked OpenAI streaming API.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from sgr_agent_core.agent_definition import AgentConfig, ExecutionConfig, SearchConfig
+from sgr_agent_core.agents import ResearchToolCallingAgent, SGRToolCallingAgent, ToolCallingAgent
+from sgr_agent_core.models import AgentStatesEnum, SourceData
+from sgr_agent_core.tools import BaseTool, CreateReportTool, FinalAnswerTool, ReasoningTool, WebSearchTool
+from tests.conftest import create_test_agent
+
+
+class SleepyTool(BaseTool):
+    """Test tool that sleeps before answering."""
+
+    tool_name = "sleepytool"
+    delay: float = 0.05
+    answer: str = "done"
+
+    async def __call__(self, context, config, **_) -> str:
+        await asyncio.sleep(self.delay)
+        return self.answer
+
+
+def mock_stream_context(tool_calls: list, content: str | None = None) -> AsyncMock:
+    """Create a mock of `chat.completions.stream(...)` returning the given
+    parsed tool calls."""
+
+    async def async_iter(self):
+        return
+        yield
+
+    stream = AsyncMock()
+    stream.__aiter__ = async_iter
+    stream.get_final_completion = AsyncMock(
+        return_value=Mock(
+            choices=[
+                Mock(
+                    message=Mock(
+                        content=content,
+                        tool_calls=[Mock(function=Mock(parsed_arguments=tool)) for tool in tool_calls],
+                    )
+                )
+            ]
+        )
+    )
+    context = AsyncMock()
+    context.__aenter__ = AsyncMock(return_value=stream)
+    context.__aexit__ = AsyncMock(return_value=None)
+    return context
+
+
+def make_reasoning() -> ReasoningTool:
+    return ReasoningTool(
+        reasoning_steps=["Step 1", "Step 2"],
+        current_situation="Test",
+        plan_status="Test",
+        enough_data=False,
+        remaining_steps=["Search"],
+        task_completed=False,
+    )
+
+
+class TestParallelToolCalls:
+    """Tests for the parallel multi-tool execution mode."""
+
+    @pytest.mark.asyncio
+    async def test_sequential_mode_uses_first_tool_call_only(self):
+        """Test that only the first tool call is taken by default."""
+        agent = create_test_agent(ToolCallingAgent, toolkit=[SleepyTool])
+        agent._context.iteration = 1
+        agent.openai_client.chat.completions.stream = Mock(
+            return_value=mock_stream_context([SleepyTool(answer="a"), SleepyTool(answer="b")])
+        )
+
+        tool = await agent._select_action_phase()
+
+        assert isinstance(tool, SleepyTool)
+        assert tool.answer == "a"
+        assert [call["id"] for call in agent.conversation[-1]["tool_calls"]] == ["1-action"]
+
+    @pytest.mark.asyncio
+    async def test_parallel_mode_returns_all_tool_calls(self):
+        """Test that every tool call is selected in parallel mode."""
+        agent = create_test_agent(
+            ToolCallingAgent,
+            toolkit=[SleepyTool],
+            execution_config=ExecutionConfig(parallel_tool_calls=True),
+        )
+        agent._context.iteration = 2
+        agent.openai_client.chat.completions.stream = Mock(
+            return_value=mock_stream_context([SleepyTool(answer="a"), SleepyTool(answer="b")])
+        )
+
+        tools = await agent._select_action_phase()
+
+        assert [tool.answer for tool in tools] == ["a", "b"]
+        assert len(agent.conversation) == 1
+        assert [call["id"] for call in agent.conversation[0]["tool_calls"]] == ["2-action-0", "2-action-1"]
+
+    @pytest.mark.asyncio
+    async def test_parallel_action_phase_runs_concurrently_and_keeps_order(self):
+        """Test that tools run concurrently and results follow tool call
+        order."""
+        agent = create_test_agent(
+            ToolCallingAgent,
+            toolkit=[SleepyTool],
+            execution_config=ExecutionConfig(parallel_tool_calls=True),
+        )
+        agent._context.iteration = 1
+        tools = [SleepyTool(delay=0.2, answer="slow"), SleepyTool(delay=0.2, answer="fast")]
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await agent._action_phase(tools)
+        elapsed = loop.time() - started
+
+        assert results == ["slow", "fast"]
+        assert elapsed < 0.35
+        assert [(m["tool_call_id"], m["content"]) for m in agent.conversation] == [
+            ("1-action-0", "slow"),
+            ("1-action-1", "fast"),
+        ]
+        assert len(agent.log) == 2
+        assert agent._context.statistics.tools["sleepytool"].calls == 2
+
+    @pytest.mark.asyncio
+    async def test_parallel_action_phase_raises_tool_error(self):
+        """Test that a failing tool fails the whole batch after all tools
+        finished."""
+
+        class FailingTool(BaseTool):
+            async def __call__(self, context, config, **_) -> str:
+                raise RuntimeError("boom")
+
+        agent = create_test_agent(ToolCallingAgent, toolkit=[SleepyTool, FailingTool])
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await agent._action_phase([SleepyTool(), FailingTool()])
+        assert agent.conversation == []
+
+    @pytest.mark.asyncio
+    async def test_parallel_batch_is_trimmed_to_budgets(self):
+        """Test that searches over the remaining budget and extra final tool
+        calls are dropped from the batch."""
+        agent = create_test_agent(
+            ToolCallingAgent,
+            toolkit=[WebSearchTool, FinalAnswerTool],
+            agent_config=AgentConfig(
+                search=SearchConfig(max_searches=3), execution=ExecutionConfig(parallel_tool_calls=True)
+            ),
+        )
+        agent._context.iteration = 1
+        agent._context.searches_used = 1
+        searches = [WebSearchTool(reasoning="Test", query=f"query {i}") for i in range(4)]
+        finals = [
+            FinalAnswerTool(reasoning="Test", completed_steps=["Step"], answer=answer, status=AgentStatesEnum.COMPLETED)
+            for answer in ("a", "b")
+        ]
+        agent.openai_client.chat.completions.stream = Mock(return_value=mock_stream_context([*searches, *finals]))
+
+        tools = await agent._select_action_phase()
+
+        assert tools == [searches[0], searches[1], finals[0]]
+        assert len(agent.conversation[-1]["tool_calls"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_parallel_searches_number_sources_in_tool_call_order(self):
+        """Test that citation numbers follow tool call order, not completion
+        order."""
+        agent = create_test_agent(
+            ToolCallingAgent,
+            toolkit=[WebSearchTool],
+            agent_config=AgentConfig(
+                search=SearchConfig(tavily_api_key="test-key"), execution=ExecutionConfig(parallel_tool_calls=True)
+            ),
+        )
+        agent._context.iteration = 1
+
+        async def search(query, **_):
+            await asyncio.sleep(0.1 if query == "slow" else 0)
+            return [SourceData(number=0, url=f"https://{query}.com")]
+
+        with patch("sgr_agent_core.tools.web_search_tool.TavilySearchService") as mock_service:
+            mock_service.return_value.search = AsyncMock(side_effect=search)
+            await agent._action_phase(
+                [WebSearchTool(reasoning="Test", query="slow"), WebSearchTool(reasoning="Test", query="fast")]
+            )
+
+        assert {url: source.number for url, source in agent._context.sources.items()} == {
+            "https://slow.com": 1,
+            "https://fast.com": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_sgr_tool_calling_agent_parallel_mode(self):
+        """Test that SGRToolCallingAgent selects all tool calls in parallel
+        mode."""
+        agent = create_test_agent(
+            SGRToolCallingAgent,
+            toolkit=[SleepyTool],
+            execution_config=ExecutionConfig(parallel_tool_calls=True),
+        )
+        agent._context.iteration = 3
+        agent.openai_client.chat.completions.stream = Mock(
+            return_value=mock_stream_context([SleepyTool(answer="a"), SleepyTool(answer="b")])
+        )
+
+        tools = await agent._select_action_phase(make_reasoning())
+
+        assert len(tools) == 2
+        assert agent.conversation[-1]["content"] == "Search"
+        assert [call["id"] for call in agent.conversation[-1]["tool_calls"]] == ["3-action-0", "3-action-1"]
+
+
+class TestFusedReasoningAction:
+    """Tests for the single-call reasoning and action mode of
+    SGRToolCallingAgent."""
+
+    @pytest.mark.asyncio
+    async def test_fused_mode_uses_one_llm_call(self):
+        """Test that reasoning and action come from one completion."""
+        agent = create_test_agent(
+            SGRToolCallingAgent,
+            toolkit=[SleepyTool],
+            execution_config=ExecutionConfig(fused_reasoning_action=True),
+        )
+        agent._context.iteration = 1
+        agent.openai_client.chat.completions.stream = Mock(
+            return_value=mock_stream_context([make_reasoning(), SleepyTool(answer="a")])
+        )
+
+        reasoning = await agent._reasoning_phase()
+        tool = await agent._select_action_phase(reasoning)
+
+        assert agent.openai_client.chat.completions.stream.call_count == 1
+        request = agent.openai_client.chat.completions.stream.call_args.kwargs
+        tool_names = [tool["function"]["name"] for tool in request["tools"]]
+        assert tool_names == ["reasoningtool", "sleepytool"]
+        assert isinstance(reasoning, ReasoningTool)
+        assert tool.answer == "a"
+        assert [message["role"] for message in agent.conversation] == ["assistant", "tool", "assistant"]
+        assert agent.conversation[-1]["tool_calls"][0]["id"] == "1-action"
+
+    @pytest.mark.asyncio
+    async def test_fused_mode_without_action_requests_it_separately(self):
+        """Test that a missing action falls back to the regular action
+        call."""
+        agent = create_test_agent(
+            SGRToolCallingAgent,
+            toolkit=[SleepyTool],
+            execution_config=ExecutionConfig(fused_reasoning_action=True),
+        )
+        agent.openai_client.chat.completions.stream = Mock(
+            side_effect=[mock_stream_context([make_reasoning()]), mock_stream_context([SleepyTool(answer="b")])]
+        )
+
+        reasoning = await agent._reasoning_phase()
+        tool = await agent._select_action_phase(reasoning)
+
+        assert agent.openai_client.chat.completions.stream.call_count == 2
+        assert tool.answer == "b"
+
+    @pytest.mark.asyncio
+    async def test_fused_mode_without_reasoning_falls_back(self):
+        """Test that the forced reasoning call is made if the model skipped
+        reasoning."""
+        agent = create_test_agent(
+            SGRToolCallingAgent,
+            toolkit=[SleepyTool],
+            execution_config=ExecutionConfig(fused_reasoning_action=True),
+        )
+        agent.openai_client.chat.completions.stream = Mock(
+            side_effect=[mock_stream_context([SleepyTool()]), mock_stream_context([make_reasoning()])]
+        )
+
+        reasoning = await agent._reasoning_phase()
+
+        assert isinstance(reasoning, ReasoningTool)
+        assert agent._fused_actions == []
+        forced_call = agent.openai_client.chat.completions.stream.call_args_list[1].kwargs
+        assert forced_call["tool_choice"]["function"]["name"] == "reasoningtool"
+
+    @pytest.mark.asyncio
+    async def test_fused_mode_with_malformed_tool_calls_falls_back(self):
+        """Test that unparsed tool calls are skipped and a missing reasoning
+        falls back to the separate calls."""
+        agent = create_test_agent(
+            SGRToolCallingAgent,
+            toolkit=[SleepyTool],
+            execution_config=ExecutionConfig(fused_reasoning_action=True),
+        )
+        agent.openai_client.chat.completions.stream = Mock(
+            side_effect=[
+                mock_stream_context([None, SleepyTool(answer="a")]),
+                mock_stream_context([make_reasoning()]),
+            ]
+        )
+
+        reasoning = await agent._reasoning_phase()
+
+        assert isinstance(reasoning, ReasoningTool)
+        assert agent.openai_client.chat.completions.stream.call_count == 2
+        fused_call = agent.openai_client.chat.completions.stream.call_args_list[0].kwargs
+        assert fused_call["messages"][0]["role"] == "system"
+        assert [message["role"] for message in fused_call["messages"][1:]] == ["user", "user"]
+
+
+class TestDeadlinesAndTimeouts:
+    """Tests for the run deadline and per-call timeouts."""
+
+    @pytest.mark.asyncio
+    async def test_tool_timeout_is_reported_as_tool_result(self):
+        """Test that a hung tool is cancelled and reported to the LLM."""
+        agent = create_test_agent(
+            ToolCallingAgent,
+            toolkit=[SleepyTool],
+            execution_config=ExecutionConfig(tool_timeout=0.05),
+        )
+        agent._context.iteration = 1
+
+        result = await agent._action_phase(SleepyTool(delay=5))
+
+        assert "timed out" in result
+        assert agent.conversation[-1]["content"] == result
+        assert agent._context.statistics.tools["sleepytool"].calls == 1
+
+    @pytest.mark.asyncio
+    async def test_llm_call_timeout_raises(self):
+        """Test that a hung LLM stream fails the call."""
+        agent = create_test_agent(
+            ToolCallingAgent,
+            toolkit=[SleepyTool],
+            execution_config=ExecutionConfig(llm_call_timeout=0.05),
+        )
+        context = mock_stream_context([SleepyTool()])
+
+        async def hang(*args):
+            await asyncio.sleep(5)
+
+        context.__aenter__ = AsyncMock(side_effect=hang)
+        agent.openai_client.chat.completions.stream = Mock(return_value=context)
+
+        with pytest.raises(TimeoutError, match="select_action"):
+            await agent._select_action_phase()
+
+    def test_call_timeout_is_bounded_by_deadline(self):
+        """Test that call timeouts never exceed the time left."""
+        agent = create_test_agent(ToolCallingAgent, toolkit=[SleepyTool])
+
+        assert agent._call_timeout(30) == 30
+        assert agent._call_timeout(None) is None
+
+        agent._deadline_at = time.monotonic() + 100
+        assert agent._call_timeout(300) <= 100
+        assert agent._call_timeout(5) == 5
+        assert not agent._deadline_near()
+
+        agent._deadline_at = time.monotonic() - 1
+        assert agent._call_timeout(None) == 0
+        assert agent._deadline_near()
+
+    def test_calls_outside_final_phase_leave_the_reserve(self):
+        """Test that only final calls may run into the deadline reserve."""
+        agent = create_test_agent(
+            ToolCallingAgent, toolkit=[SleepyTool], execution_config=ExecutionConfig(deadline_reserve=60)
+        )
+        agent._deadline_at = time.monotonic() + 100
+
+        assert 39 < agent._call_timeout(None) <= 40
+        assert 99 < agent._call_timeout(None, final=True) <= 100
+
+        agent._deadline_at = time.monotonic() + 30
+        assert agent._call_timeout(None) == 0
+
+    @pytest.mark.asyncio
+    async def test_llm_call_cut_by_reserve_finishes_with_final_tools(self):
+        """Test that an LLM call running into the reserve moves the agent to
+        the final tools instead of failing the run."""
+        agent = create_test_agent(
+            ResearchToolCallingAgent,
+            toolkit=[WebSearchTool, CreateReportTool, FinalAnswerTool],
+            agent_config=AgentConfig(
+                search=SearchConfig(), execution=ExecutionConfig(deadline=0.4, deadline_reserve=0.3)
+            ),
+        )
+        agent._save_agent_log = Mock()
+        hung = mock_stream_context([])
+
+        async def hang(*args):
+            await asyncio.sleep(5)
+
+        hung.__aenter__ = AsyncMock(side_effect=hang)
+        final = FinalAnswerTool(
+            reasoning="Test", completed_steps=["Step"], answer="answer", status=AgentStatesEnum.COMPLETED
+        )
+        agent.openai_client.chat.completions.stream = Mock(side_effect=[hung, mock_stream_context([final])])
+
+        result = await agent.execute()
+
+        assert result == "answer"
+        assert agent._context.state == AgentStatesEnum.COMPLETED
+        final_call = agent.openai_client.chat.completions.stream.call_args_list[1].kwargs
+        assert [tool["function"]["name"] for tool in final_call["tools"]] == ["createreporttool", "finalanswertool"]
+
+    @pytest.mark.asyncio
+    async def test_plain_agent_cut_by_reserve_finishes_with_final_tools(self):
+        """Test that an agent on the base tool setup also gets only the final
+        tools once an LLM call runs into the reserve."""
+        agent = create_test_agent(
+            ToolCallingAgent,
+            toolkit=[SleepyTool, FinalAnswerTool],
+            execution_config=ExecutionConfig(deadline=0.4, deadline_reserve=0.3),
+        )
+        agent._save_agent_log = Mock()
+        hung = mock_stream_context([])
+
+        async def hang(*args):
+            await asyncio.sleep(5)
+
+        hung.__aenter__ = AsyncMock(side_effect=hang)
+        final = FinalAnswerTool(
+            reasoning="Test", completed_steps=["Step"], answer="answer", status=AgentStatesEnum.COMPLETED
+        )
+        agent.openai_client.chat.completions.stream = Mock(side_effect=[hung, mock_stream_context([final])])
+
+        result = await agent.execute()
+
+        assert result == "answer"
+        assert agent._context.state == AgentStatesEnum.COMPLETED
+        final_call = agent.openai_client.chat.completions.stream.call_args_list[1].kwargs
+        assert [tool["function"]["name"] for tool in final_call["tools"]] == ["finalanswertool"]
+
+    @pytest.mark.asyncio
+    async def test_near_deadline_forces_final_tools(self):
+        """Test that only the final tools are offered close to the
+        deadline."""
+        agent = create_test_agent(
+            ResearchToolCallingAgent,
+            toolkit=[WebSearchTool, CreateReportTool, FinalAnswerTool],
+            agent_config=AgentConfig(
+                search=SearchConfig(), execution=ExecutionConfig(deadline=30, deadline_reserve=60)
+            ),
+        )
+        agent._deadline_at = time.monotonic() + 30
+
+        tools = await agent._prepare_tools()
+
+        assert agent._deadline_near()
+        assert [tool["function"]["name"] for tool in tools] == ["createreporttool", "finalanswertool"]
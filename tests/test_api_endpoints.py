@@ -5,23 +5,34 @@ including agent creation, agent state management, and chat completions.
 """
 
 import asyncio
+from datetime import datetime
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastapi import HTTPException
+from fastapi.responses import Response
 
 from sgr_agent_core.agents import SGRAgent
 from sgr_agent_core.models import AgentStatesEnum
 from sgr_deep_research.api.endpoints import (
     _is_agent_id,
-    agents_storage,
+    agent_store,
     create_chat_completion,
     extract_user_content_from_messages,
     get_agent_state,
     get_agents_list,
     provide_clarification,
+    serve_forwarded_request,
+    stream_agent,
+)
+from sgr_deep_research.api.models import AgentListItem, ChatCompletionRequest, ChatMessage, ClarificationRequest
+from sgr_deep_research.services import (
+    AdmissionController,
+    AdmissionQueueFull,
+    InMemoryAgentStore,
+    InMemoryStateBackend,
+    WorkerRouter,
 )
-from sgr_deep_research.api.models import ChatCompletionRequest, ChatMessage, ClarificationRequest
 from tests.conftest import create_test_agent
 
 
@@ -115,7 +126,7 @@ class TestChatCompletionEndpoint:
     def setup_method(self):
         """Setup for each test method."""
         # Clear agents storage
-        agents_storage.clear()
+        agent_store.clear()
 
     @patch("sgr_deep_research.api.endpoints.AgentFactory")
     @pytest.mark.asyncio
@@ -123,6 +134,7 @@ class TestChatCompletionEndpoint:
         """Test successful creation of new agent."""
         mock_agent = Mock()
         mock_agent.id = "test_agent_12345678-1234-1234-1234-123456789012"
+        mock_agent._context.state = AgentStatesEnum.INITED
         mock_agent.streaming_generator.stream.return_value = iter(["chunk1", "chunk2"])
 
         # Use actual async function instead of AsyncMock to avoid warnings
@@ -155,8 +167,8 @@ class TestChatCompletionEndpoint:
 
             # Verify agent was created and stored
             mock_factory.create.assert_called_once()
-            assert mock_agent.id in agents_storage
-            assert agents_storage[mock_agent.id] == mock_agent
+            assert mock_agent.id in agent_store
+            assert agent_store.get(mock_agent.id) == mock_agent
 
             # Verify execute task was created
             mock_create_task.assert_called_once()
@@ -193,7 +205,7 @@ class TestChatCompletionEndpoint:
         # Create and store an agent waiting for clarification
         agent = create_test_agent(SGRAgent, task="Test task")
         agent._context.state = AgentStatesEnum.WAITING_FOR_CLARIFICATION
-        agents_storage[agent.id] = agent
+        agent_store.add(agent)
 
         # Mock the agent's methods with actual async function
         async def mock_provide_clarification(clarifications):
@@ -212,12 +224,58 @@ class TestChatCompletionEndpoint:
         agent.provide_clarification.assert_called_once_with("Here is my clarification")
 
 
+class TestChatCompletionAdmission:
+    """Tests for admission control of new agents."""
+
+    def setup_method(self):
+        """Setup for each test method."""
+        agent_store.clear()
+
+    @staticmethod
+    def make_request() -> ChatCompletionRequest:
+        return ChatCompletionRequest(model="sgr_agent", messages=[ChatMessage(role="user", content="Test task")])
+
+    @staticmethod
+    def patch_factory(agent):
+        agent_def = Mock()
+        agent_def.name = "sgr_agent"
+        factory = Mock(get_definitions_list=Mock(return_value=[agent_def]), create=AsyncMock(return_value=agent))
+        return patch("sgr_deep_research.api.endpoints.AgentFactory", factory)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("header, priority", [(None, 3), (7, 7)])
+    async def test_priority_from_header_or_definition(self, header, priority):
+        """Test that the priority header overrides the definition one."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        agent.config.execution.priority = 3
+        controller = Mock()
+        with self.patch_factory(agent), patch("sgr_deep_research.api.endpoints.admission_controller", controller):
+            await create_chat_completion(self.make_request(), x_agent_priority=header)
+
+        controller.submit.assert_called_once_with(agent, priority)
+        assert agent.id in agent_store
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejected_with_retry_after(self):
+        """Test that a task over the queue size gets 429 with Retry-After."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        controller = AdmissionController(max_running=1, max_queued=0, retry_after=12.5)
+        controller.running = 1
+        with self.patch_factory(agent), patch("sgr_deep_research.api.endpoints.admission_controller", controller):
+            with pytest.raises(HTTPException) as exc_info:
+                await create_chat_completion(self.make_request())
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers == {"Retry-After": "13"}
+        assert agent.id not in agent_store
+
+
 class TestAgentStateEndpoint:
     """Tests for get_agent_state endpoint."""
 
     def setup_method(self):
         """Setup for each test method."""
-        agents_storage.clear()
+        agent_store.clear()
 
     @pytest.mark.asyncio
     async def test_get_agent_state_success(self):
@@ -230,7 +288,7 @@ class TestAgentStateEndpoint:
             "https://example.com/1": SourceData(number=1, url="https://example.com/1", title="Source 1"),
             "https://example.com/2": SourceData(number=2, url="https://example.com/2", title="Source 2"),
         }
-        agents_storage[agent.id] = agent
+        agent_store.add(agent)
 
         response = await get_agent_state(agent.id)
 
@@ -250,12 +308,121 @@ class TestAgentStateEndpoint:
         assert "Agent not found" in str(exc_info.value.detail)
 
 
+class TestAgentStreamEndpoint:
+    """Tests for stream_agent endpoint."""
+
+    def setup_method(self):
+        """Setup for each test method."""
+        agent_store.clear()
+
+    @pytest.mark.asyncio
+    async def test_stream_agent_resumes_after_last_event_id(self):
+        """Test that the stream resumes after the Last-Event-ID."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        agent_store.add(agent)
+        agent.streaming_generator.add(b"data: first\n\n")
+        agent.streaming_generator.add(b"data: second\n\n")
+        agent.streaming_generator.finish()
+
+        response = await stream_agent(agent.id, last_event_id="0")
+        frames = [frame async for frame in response.body_iterator]
+
+        assert frames[0] == b"id: 1\ndata: second\n\n"
+        assert frames[-1].endswith(b"data: [DONE]\n\n")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("policy", ["pause", "cancel", "detach"])
+    async def test_disconnect_policy_applied(self, policy, tmp_path):
+        """Test that the policy is applied when the client goes away before
+        the end of the stream."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        agent.config.execution.disconnect_policy = policy
+        agent.config.execution.disconnect_grace = 0
+        agent.config.execution.detach_dir = str(tmp_path)
+        agent._context.state = AgentStatesEnum.RESEARCHING
+        agent.cancel = Mock()
+        agent_store.add(agent)
+        agent.streaming_generator.add(b"data: first\n\n")
+
+        response = await stream_agent(agent.id, last_event_id=None)
+        frames = response.body_iterator
+        await frames.__anext__()
+        await frames.aclose()
+        await asyncio.sleep(0.01)
+
+        assert agent.cancel.called == (policy == "cancel")
+        assert agent._resumed.is_set() == (policy != "pause")
+        assert (agent.stream_broadcaster._spool_path is not None) == (policy == "detach")
+
+    @pytest.mark.asyncio
+    async def test_reconnect_within_grace_keeps_agent_running(self):
+        """Test that the policy is not applied when a client is back in
+        time, and that a reconnect resumes a paused agent."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        agent.config.execution.disconnect_grace = 0.01
+        agent._context.state = AgentStatesEnum.RESEARCHING
+        agent_store.add(agent)
+        agent.streaming_generator.add(b"data: first\n\n")
+
+        first = (await stream_agent(agent.id, last_event_id=None)).body_iterator
+        await first.__anext__()
+        await first.aclose()
+        agent.pause()
+        second = (await stream_agent(agent.id, last_event_id=None)).body_iterator
+        await second.__anext__()
+        await asyncio.sleep(0.05)
+
+        assert agent._resumed.is_set()
+        await second.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_resumes_agent_suspended_while_paused(self):
+        """Test that a client of an agent suspended while paused rebuilds it
+        and gets its new stream from the beginning."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        agent.streaming_generator.add(b"data: first\n\n")
+        checkpoint = Mock(context={"state": AgentStatesEnum.PAUSED.value})
+        controller = Mock()
+        with (
+            patch.object(agent_store, "get_suspended", AsyncMock(return_value=checkpoint)),
+            patch.object(agent_store, "claim_suspended", AsyncMock(return_value=checkpoint)),
+            patch("sgr_deep_research.api.endpoints.AgentFactory.resume", AsyncMock(return_value=agent)) as resume,
+            patch("sgr_deep_research.api.endpoints.admission_controller", controller),
+        ):
+            response = await stream_agent(agent.id, last_event_id="42")
+        frames = response.body_iterator
+
+        resume.assert_awaited_once_with(checkpoint)
+        controller.submit.assert_called_once_with(agent, agent.config.execution.priority)
+        assert await frames.__anext__() == b"id: 0\ndata: first\n\n"
+        await frames.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_agent_invalid_last_event_id(self):
+        """Test that a malformed Last-Event-ID is rejected."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        agent_store.add(agent)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await stream_agent(agent.id, last_event_id="abc")
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_stream_agent_not_found(self):
+        """Test streaming of a non-existent agent."""
+        with pytest.raises(HTTPException) as exc_info:
+            await stream_agent("non_existent_agent_id")
+
+        assert exc_info.value.status_code == 404
+
+
 class TestAgentsListEndpoint:
     """Tests for get_agents_list endpoint."""
 
     def setup_method(self):
         """Setup for each test method."""
-        agents_storage.clear()
+        agent_store.clear()
 
     @pytest.mark.asyncio
     async def test_get_agents_list_empty(self):
@@ -272,8 +439,8 @@ class TestAgentsListEndpoint:
         agent1 = create_test_agent(SGRAgent, task="Task 1")
         agent2 = create_test_agent(SGRAgent, task="Task 2")
 
-        agents_storage[agent1.id] = agent1
-        agents_storage[agent2.id] = agent2
+        agent_store.add(agent1)
+        agent_store.add(agent2)
 
         response = await get_agents_list()
 
@@ -291,7 +458,7 @@ class TestProvideClarificationEndpoint:
 
     def setup_method(self):
         """Setup for each test method."""
-        agents_storage.clear()
+        agent_store.clear()
 
     @pytest.mark.asyncio
     async def test_provide_clarification_success(self):
@@ -305,7 +472,7 @@ class TestProvideClarificationEndpoint:
 
         agent.provide_clarification = Mock(side_effect=mock_provide_clarification)
         agent.streaming_generator.stream = Mock(return_value=iter(["clarification response"]))
-        agents_storage[agent.id] = agent
+        agent_store.add(agent)
 
         request = ClarificationRequest(clarifications="This is my clarification")
 
@@ -340,7 +507,7 @@ class TestProvideClarificationEndpoint:
             raise Exception("Test error")
 
         agent.provide_clarification = Mock(side_effect=mock_provide_clarification_error)
-        agents_storage[agent.id] = agent
+        agent_store.add(agent)
 
         request = ClarificationRequest(clarifications="Some clarification")
 
@@ -350,13 +517,69 @@ class TestProvideClarificationEndpoint:
         assert exc_info.value.status_code == 500
         assert "Test error" in str(exc_info.value.detail)
 
+    @pytest.mark.asyncio
+    async def test_suspended_agent_resumed_from_checkpoint(self):
+        """Test that a clarification for a suspended agent rebuilds it and
+        runs it again."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        agent.provide_clarification = AsyncMock()
+        checkpoint = Mock(context={"state": AgentStatesEnum.WAITING_FOR_CLARIFICATION.value})
+        controller = Mock()
+        with (
+            patch.object(agent_store, "get_suspended", AsyncMock(return_value=checkpoint)),
+            patch.object(agent_store, "claim_suspended", AsyncMock(return_value=checkpoint)),
+            patch("sgr_deep_research.api.endpoints.AgentFactory.resume", AsyncMock(return_value=agent)) as resume,
+            patch("sgr_deep_research.api.endpoints.admission_controller", controller),
+        ):
+            await provide_clarification(agent.id, ClarificationRequest(clarifications="Answer"))
+
+        resume.assert_awaited_once_with(checkpoint)
+        controller.submit.assert_called_once_with(agent, agent.config.execution.priority)
+        agent.provide_clarification.assert_awaited_once_with("Answer")
+        assert agent_store.get(agent.id) is agent
+
+    @pytest.mark.asyncio
+    async def test_running_owner_served_before_resuming(self):
+        """Test that a clarification for an agent another worker runs is
+        forwarded to it instead of resuming a stale suspended copy."""
+        forwarded = Response(b"{}", media_type="application/json")
+        with (
+            patch("sgr_deep_research.api.endpoints._forward_to_owner", AsyncMock(return_value=forwarded)),
+            patch.object(agent_store, "get_suspended") as get_suspended,
+        ):
+            response = await provide_clarification("sgr_agent_remote", ClarificationRequest(clarifications="Answer"))
+
+        assert response is forwarded
+        get_suspended.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_resume_releases_claim(self):
+        """Test that the checkpoint is put back when the resumed agent is
+        not admitted."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        checkpoint = Mock(context={"state": AgentStatesEnum.WAITING_FOR_CLARIFICATION.value})
+        controller = Mock()
+        controller.submit.side_effect = AdmissionQueueFull(retry_after=5)
+        with (
+            patch.object(agent_store, "get_suspended", AsyncMock(return_value=checkpoint)),
+            patch.object(agent_store, "claim_suspended", AsyncMock(return_value=checkpoint)),
+            patch.object(agent_store, "release_suspended") as release,
+            patch("sgr_deep_research.api.endpoints.AgentFactory.resume", AsyncMock(return_value=agent)),
+            patch("sgr_deep_research.api.endpoints.admission_controller", controller),
+            pytest.raises(HTTPException) as exc_info,
+        ):
+            await provide_clarification(agent.id, ClarificationRequest(clarifications="Answer"))
+
+        assert exc_info.value.status_code == 429
+        release.assert_awaited_once_with(agent.id)
+
 
 class TestAgentStorageIntegration:
     """Tests for agent storage integration across endpoints."""
 
     def setup_method(self):
         """Setup for each test method."""
-        agents_storage.clear()
+        agent_store.clear()
 
     def test_agent_storage_persistence(self):
         """Test that agents persist in storage across operations."""
@@ -364,18 +587,114 @@ class TestAgentStorageIntegration:
         agent1 = create_test_agent(SGRAgent, task="Task 1")
         agent2 = create_test_agent(SGRAgent, task="Task 2")
 
-        # Store in agents_storage
-        agents_storage[agent1.id] = agent1
-        agents_storage[agent2.id] = agent2
+        # Store in agent_store
+        agent_store.add(agent1)
+        agent_store.add(agent2)
 
         # Verify storage state
-        assert len(agents_storage) == 2
-        assert agent1.id in agents_storage
-        assert agent2.id in agents_storage
-        assert agents_storage[agent1.id].task == "Task 1"
-        assert agents_storage[agent2.id].task == "Task 2"
+        assert len(agent_store) == 2
+        assert agent1.id in agent_store
+        assert agent2.id in agent_store
+        assert agent_store.get(agent1.id).task == "Task 1"
+        assert agent_store.get(agent2.id).task == "Task 2"
 
     def test_agent_storage_isolation(self):
         """Test that different test methods have isolated storage."""
         # This test verifies that setup_method clears storage properly
-        assert len(agents_storage) == 0
+        assert len(agent_store) == 0
+
+
+class TestForwardingToOwnerWorker:
+    """Tests for requests for agents running on another worker."""
+
+    def setup_method(self):
+        """Setup for each test method."""
+        agent_store.clear()
+
+    @staticmethod
+    def make_router(owner: str | None = "owner"):
+        router = Mock()
+        router.owner = AsyncMock(return_value=owner)
+        router.forward = AsyncMock(return_value=Response(b"{}", media_type="application/json"))
+        router.list_agents = AsyncMock(return_value=[])
+        return router
+
+    @pytest.mark.asyncio
+    async def test_state_forwarded_to_owner(self):
+        """Test that the state of an agent of another worker comes from
+        it."""
+        router = self.make_router()
+        with patch("sgr_deep_research.api.endpoints.worker_router", router):
+            response = await get_agent_state("sgr_agent_remote")
+
+        assert response is router.forward.return_value
+        router.forward.assert_called_once_with("owner", {"endpoint": "state", "agent_id": "sgr_agent_remote"})
+
+    @pytest.mark.asyncio
+    async def test_unknown_agent_not_forwarded(self):
+        """Test that an agent no worker runs is not found."""
+        router = self.make_router(owner=None)
+        with patch("sgr_deep_research.api.endpoints.worker_router", router):
+            with pytest.raises(HTTPException) as exc_info:
+                await stream_agent("sgr_agent_remote", last_event_id=None)
+
+        assert exc_info.value.status_code == 404
+        router.forward.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_chat_completion_for_remote_agent_forwarded(self):
+        """Test that a follow-up addressed to an agent of another worker is
+        sent to it."""
+        router = self.make_router()
+        agent_id = "sgr_agent_12345678-1234-1234-1234-123456789012"
+        request = ChatCompletionRequest(model=agent_id, messages=[ChatMessage(role="user", content="Answer")])
+        with patch("sgr_deep_research.api.endpoints.worker_router", router):
+            await create_chat_completion(request)
+
+        owner, forwarded = router.forward.call_args.args
+        assert forwarded["endpoint"] == "chat_completions"
+        assert ChatCompletionRequest.model_validate(forwarded["body"]) == request
+
+    @pytest.mark.asyncio
+    async def test_agents_of_other_workers_listed(self):
+        """Test that the list includes agents published by other
+        workers."""
+        agent = create_test_agent(SGRAgent, task="Local task")
+        agent_store.add(agent)
+        router = self.make_router()
+        router.list_agents.return_value = [
+            AgentListItem(agent_id="remote", task="Remote task", state="researching", creation_time=datetime.now())
+        ]
+        with patch("sgr_deep_research.api.endpoints.worker_router", router):
+            response = await get_agents_list()
+
+        assert [item.task for item in response.agents] == ["Local task", "Remote task"]
+        assert response.total == 2
+
+    @pytest.mark.asyncio
+    async def test_owner_serves_forwarded_clarification(self):
+        """Test that the owner provides a forwarded clarification and
+        relays the agent stream to the other worker."""
+        agent = create_test_agent(SGRAgent, task="Test task")
+        agent._context.state = AgentStatesEnum.WAITING_FOR_CLARIFICATION
+        agent.provide_clarification = AsyncMock()
+        agent_store.add(agent)
+        backend = InMemoryStateBackend()
+        owner = WorkerRouter(backend, agent_store, serve_forwarded_request, worker_id="owner", poll_interval=0.001)
+        other = WorkerRouter(backend, InMemoryAgentStore(), Mock(), worker_id="other", poll_interval=0.001)
+        await owner.start()
+        try:
+            request = ChatCompletionRequest(model=agent.id, messages=[ChatMessage(role="user", content="Answer")])
+            response = await other.forward(
+                "owner", {"endpoint": "chat_completions", "agent_id": agent.id, "body": request.model_dump()}
+            )
+            agent.streaming_generator.add(b"data: answer\n\n")
+            frames = response.body_iterator
+            frame = await asyncio.wait_for(anext(frames), timeout=1)
+            await frames.aclose()
+        finally:
+            await owner.stop()
+
+        agent.provide_clarification.assert_called_once_with("Answer")
+        assert response.headers["x-agent-id"] == agent.id
+        assert frame.endswith(b"data: answer\n\n")
@@ -5,9 +5,10 @@ including initialization, logging, clarification handling, and execution
 flow.
 """
 
+import asyncio
 import uuid
 from datetime import datetime
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
@@ -163,6 +164,60 @@ class TestBaseAgentClarificationHandling:
         assert agent._context.state == AgentStatesEnum.RESEARCHING
 
 
+def make_looping_agent(iterations: int = 2) -> BaseAgent:
+    """Agent with stub phases that completes after the given number of
+    iterations."""
+    agent = create_test_agent(BaseAgent, task="Test")
+    agent._reasoning_phase = AsyncMock()
+    agent._select_action_phase = AsyncMock(return_value=Mock())
+
+    async def action_phase(action_tool):
+        await asyncio.sleep(0)
+        if agent._context.iteration >= iterations:
+            agent._context.state = AgentStatesEnum.COMPLETED
+
+    agent._action_phase = action_phase
+    agent._save_agent_log = Mock()
+    return agent
+
+
+class TestBaseAgentPauseAndCancel:
+    """Tests for pausing and cancelling a running agent."""
+
+    @pytest.mark.asyncio
+    async def test_paused_agent_waits_at_iteration_boundary(self):
+        """Test that a paused agent does not start the next iteration until
+        resumed."""
+        agent = make_looping_agent()
+        agent.pause()
+        execution = asyncio.create_task(agent.execute())
+        await asyncio.sleep(0.01)
+
+        assert agent._context.state == AgentStatesEnum.PAUSED
+        assert agent._context.iteration == 0
+
+        agent.resume()
+        await asyncio.wait_for(execution, timeout=1)
+        assert agent._context.state == AgentStatesEnum.COMPLETED
+        assert agent._context.iteration == 2
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_execution(self):
+        """Test that a cancelled agent finishes its stream in the cancelled
+        state."""
+        agent = make_looping_agent()
+        agent.pause()
+        execution = asyncio.create_task(agent.execute())
+        await asyncio.sleep(0.01)
+
+        assert agent.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await execution
+        assert agent._context.state == AgentStatesEnum.CANCELLED
+        assert agent.streaming_generator.closed
+        assert not agent.cancel()
+
+
 class TestBaseAgentLogging:
     """Tests for logging functionality."""
 
@@ -409,3 +464,119 @@ class TestBaseAgentSaveLog:
         log_files = list(os.listdir(logs_dir))
         assert len(log_files) == 1
         assert log_files[0].endswith("-log.json")
+
+    def test_save_agent_log_leaves_out_api_keys(self, tmp_path):
+        """Test that no API key of the LLM, its hedge or its endpoints is
+        written to the log."""
+        from unittest.mock import patch
+
+        from sgr_agent_core.agent_definition import AgentConfig, LLMConfig, LLMEndpoint
+
+        agent = create_test_agent(
+            BaseAgent,
+            task="Test",
+            agent_config=AgentConfig(
+                llm=LLMConfig(
+                    api_key="main-secret",
+                    hedge_api_key="hedge-secret",
+                    endpoints=[
+                        LLMEndpoint(base_url="https://replica-1.example.com/v1", api_key="replica-secret"),
+                        LLMEndpoint(base_url="https://replica-2.example.com/v1"),
+                    ],
+                ),
+            ),
+        )
+
+        with patch(
+            "sgr_agent_core.agent_config.GlobalConfig", return_value=Mock(execution=Mock(logs_dir=str(tmp_path)))
+        ):
+            agent._save_agent_log()
+
+        (log_file,) = tmp_path.iterdir()
+        content = log_file.read_text()
+        assert "replica-1.example.com" in content
+        assert "secret" not in content
+
+
+class TestBaseAgentPromptCaching:
+    """Tests for deterministic, prefix-cache-friendly requests."""
+
+    def test_stable_tool_order_follows_toolkit(self):
+        """Test that tools are ordered as in the toolkit regardless of set
+        order."""
+
+        class FirstTool(BaseTool):
+            pass
+
+        class SecondTool(BaseTool):
+            pass
+
+        class OutsideTool(BaseTool):
+            pass
+
+        agent = create_test_agent(BaseAgent, task="Test", toolkit=[SecondTool, FirstTool])
+
+        assert agent._stable_tool_order({OutsideTool, FirstTool, SecondTool}) == [SecondTool, FirstTool, OutsideTool]
+
+    @pytest.mark.asyncio
+    async def test_prepare_context_prefix_is_identical_between_calls(self):
+        """Test that system prompt and task message do not change between
+        iterations."""
+        from sgr_agent_core.agent_definition import PromptsConfig
+
+        agent = create_test_agent(
+            BaseAgent,
+            task="Test",
+            prompts_config=PromptsConfig(
+                system_prompt_str="System",
+                initial_user_request_str="{current_date} {task}",
+                clarification_response_str="{clarifications}",
+            ),
+        )
+
+        first = await agent._prepare_context()
+        agent.conversation.append({"role": "user", "content": "later"})
+        second = await agent._prepare_context()
+
+        assert second[:2] == first
+        assert agent.creation_time.strftime("%Y-%m-%d %H:%M:%S") in first[1]["content"]
+
+    @pytest.mark.asyncio
+    async def test_stream_completion_requests_usage(self):
+        """Test that completions request usage and skip the usage-only
+        chunk."""
+        from unittest.mock import AsyncMock
+
+        from openai.types import CompletionUsage
+
+        content_chunk = Mock(choices=[Mock()])
+        usage_chunk = Mock(choices=[])
+
+        async def async_iter(self):
+            for chunk in (content_chunk, usage_chunk):
+                yield Mock(type="chunk", chunk=chunk)
+
+        stream = AsyncMock()
+        stream.__aiter__ = async_iter
+        completion = Mock(usage=CompletionUsage(prompt_tokens=100, completion_tokens=10, total_tokens=110))
+        stream.get_final_completion = AsyncMock(return_value=completion)
+        stream_context = AsyncMock()
+        stream_context.__aenter__ = AsyncMock(return_value=stream)
+        stream_context.__aexit__ = AsyncMock(return_value=None)
+
+        agent = create_test_agent(BaseAgent, task="Test")
+        agent.openai_client.chat.completions.stream = Mock(return_value=stream_context)
+        agent.streaming_generator = Mock()
+
+        result = await agent._stream_completion("reasoning", messages=[])
+
+        assert result is completion
+        kwargs = agent.openai_client.chat.completions.stream.call_args.kwargs
+        assert kwargs["stream_options"] == {"include_usage": True}
+        assert kwargs["model"] == "gpt-4o-mini"
+        agent.streaming_generator.add_chunk.assert_called_once_with(content_chunk)
+        statistics = agent._context.statistics
+        assert statistics.phases["reasoning"].calls == 1
+        assert statistics.llm.prompt_tokens == 100
+        assert statistics.llm.completion_tokens == 10
+        assert statistics.llm.latency >= statistics.llm.time_to_first_token >= 0
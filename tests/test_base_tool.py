@@ -4,9 +4,12 @@ This module contains tests for the BaseTool base class, covering
 initialization, subclassing, and tool_name generation.
 """
 
+import pytest
+from openai import pydantic_function_tool
 from pydantic import BaseModel
 
 from sgr_agent_core.base_tool import BaseTool
+from sgr_agent_core.services.tool_schema_cache import ToolSchemaCache
 
 
 class TestBaseTool:
@@ -52,3 +55,77 @@ class TestBaseTool:
             description = "Custom tool description"
 
         assert MyCustomTool.description == "Custom tool description"
+
+
+class TestToolSchemaCache:
+    """Test memoized function tool params of tool classes."""
+
+    def test_cached_params_match_pydantic_function_tool(self):
+        """Test that cached params equal freshly compiled ones."""
+
+        class CachedTool(BaseTool):
+            """Cached tool."""
+
+            query: str
+
+        assert ToolSchemaCache.get(CachedTool) == pydantic_function_tool(CachedTool, name="cachedtool")
+
+    def test_params_are_compiled_once(self):
+        """Test that repeated requests return the same params object."""
+
+        class CachedTool(BaseTool):
+            query: str
+
+        assert ToolSchemaCache.get(CachedTool) is ToolSchemaCache.get(CachedTool)
+
+    def test_overrides_are_cached_separately(self):
+        """Test that name and description overrides get their own
+        entries."""
+
+        class CachedTool(BaseTool):
+            """Cached tool."""
+
+            query: str
+
+        default = ToolSchemaCache.get(CachedTool)
+        no_description = ToolSchemaCache.get(CachedTool, description="")
+        renamed = ToolSchemaCache.get(CachedTool, name="renamed")
+
+        assert default["function"]["description"] == "Cached tool."
+        assert no_description["function"]["description"] == ""
+        assert renamed["function"]["name"] == "renamed"
+
+    def test_invalidate_by_tool(self):
+        """Test that invalidation by class drops all its entries."""
+
+        class CachedTool(BaseTool):
+            query: str
+
+        params = ToolSchemaCache.get(CachedTool)
+        ToolSchemaCache.get(CachedTool, description="")
+        ToolSchemaCache.invalidate(CachedTool)
+
+        assert ToolSchemaCache.get(CachedTool) is not params
+
+    def test_reregistered_tool_invalidates_params(self):
+        """Test that a new tool registered under the same name replaces
+        the old schema."""
+
+        class CachedTool(BaseTool):
+            tool_name = "schema_cache_tool"
+            query: str
+
+        old_params = ToolSchemaCache.get(CachedTool)
+
+        class CachedTool(BaseTool):  # noqa: F811
+            tool_name = "schema_cache_tool"
+            limit: int
+
+        assert all(key[1] != "schema_cache_tool" for key in ToolSchemaCache._items)
+        assert "limit" in ToolSchemaCache.get(CachedTool)["function"]["parameters"]["properties"]
+        assert "query" in old_params["function"]["parameters"]["properties"]
+
+    def test_static_class_cannot_be_instantiated(self):
+        """Test that ToolSchemaCache cannot be instantiated."""
+        with pytest.raises(TypeError):
+            ToolSchemaCache()
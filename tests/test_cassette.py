@@ -0,0 +1,147 @@
+"""Tests for Cassette service.
+
+This module contains tests for recording and replaying LLM streams,
+Tavily responses and MCP tool calls.
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from sgr_agent_core.agent_definition import AgentConfig, LLMConfig, SearchConfig
+from sgr_agent_core.base_agent import BaseAgent
+from sgr_agent_core.base_tool import MCPBaseTool
+from sgr_agent_core.models import AgentContext
+from sgr_agent_core.services import Cassette, TavilySearchService
+from tests.conftest import create_test_agent
+from tests.test_response_cache import WEATHER_TOOL, Weather, make_chunks, make_stream_context
+
+TAVILY_RESPONSE = {"results": [{"url": "https://example.com", "title": "Example", "content": "Snippet"}]}
+
+
+class CassetteEchoTool(MCPBaseTool):
+    tool_name = "cassette_echo"
+    text: str
+
+
+def make_search_service() -> TavilySearchService:
+    service = TavilySearchService(SearchConfig(tavily_api_key="test-key"))
+    service._client = Mock()
+    service._client.search = AsyncMock(return_value=TAVILY_RESPONSE)
+    return service
+
+
+class TestCassette:
+    """Tests for Cassette."""
+
+    def test_cannot_be_instantiated(self):
+        """Test that Cassette is a static class."""
+        with pytest.raises(TypeError):
+            Cassette()
+
+    @pytest.mark.asyncio
+    async def test_call_passes_through_when_stopped(self):
+        """Test that calls run as is without a cassette."""
+        call = AsyncMock(return_value={"ok": True})
+
+        assert await Cassette.call("test", {"a": 1}, call) == {"ok": True}
+        call.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_tavily_search_replayed_without_network(self, tmp_path):
+        """Test that recorded Tavily responses are replayed offline."""
+        path = tmp_path / "cassette.json"
+        with Cassette.use(path, "record"):
+            recorded = await make_search_service().search("query", max_results=1)
+
+        service = make_search_service()
+        with Cassette.use(path, "replay", time_scale=0):
+            replayed = await service.search("query", max_results=1)
+            with pytest.raises(LookupError):
+                await service.search("query", max_results=1)
+
+        service._client.search.assert_not_awaited()
+        assert [source.model_dump() for source in replayed] == [source.model_dump() for source in recorded]
+
+    @pytest.mark.asyncio
+    async def test_replay_matches_request(self, tmp_path):
+        """Test that a request that was not recorded is not served."""
+        path = tmp_path / "cassette.json"
+        with Cassette.use(path, "record"):
+            await make_search_service().search("query", max_results=1)
+
+        with Cassette.use(path, "replay", time_scale=0):
+            with pytest.raises(LookupError):
+                await make_search_service().search("other query", max_results=1)
+
+    @pytest.mark.asyncio
+    async def test_mcp_tool_call_replayed(self, tmp_path):
+        """Test that MCP tool results are recorded and replayed."""
+        path = tmp_path / "cassette.json"
+        tool = CassetteEchoTool(text="hello")
+        tool._call_mcp_tool = AsyncMock(return_value=['{"type": "text", "text": "hello"}'])
+        with Cassette.use(path, "record"):
+            recorded = await tool(AgentContext(), Mock())
+
+        replay_tool = CassetteEchoTool(text="hello")
+        replay_tool._call_mcp_tool = AsyncMock()
+        with Cassette.use(path, "replay", time_scale=0):
+            replayed = await replay_tool(AgentContext(), Mock())
+
+        replay_tool._call_mcp_tool.assert_not_awaited()
+        assert replayed == recorded
+
+
+class TestAgentCassette:
+    """Tests for LLM streams on a cassette."""
+
+    @pytest.mark.asyncio
+    async def test_llm_stream_replayed_with_timing(self, tmp_path, monkeypatch):
+        """Test that recorded streams are replayed to the client with the
+        recorded chunk offsets."""
+        path = tmp_path / "cassette.json"
+        agent = create_test_agent(BaseAgent, task="Test")
+        agent.openai_client.chat.completions.stream = Mock(return_value=make_stream_context(make_chunks()))
+        agent.streaming_generator = Mock()
+        with Cassette.use(path, "record"):
+            live = await agent._stream_completion("select_action", messages=[], tools=[WEATHER_TOOL])
+
+        agent = create_test_agent(BaseAgent, task="Test")
+        agent.openai_client.chat.completions.stream = Mock()
+        agent.streaming_generator = Mock()
+        sleep = AsyncMock()
+        monkeypatch.setattr(Cassette, "sleep", sleep)
+        with Cassette.use(path, "replay", time_scale=0.5):
+            replayed = await agent._stream_completion("select_action", messages=[], tools=[WEATHER_TOOL])
+
+        agent.openai_client.chat.completions.stream.assert_not_called()
+        assert sleep.await_count == len(make_chunks())
+        assert agent.streaming_generator.add_chunk.call_count == 2
+        assert replayed.choices[0].message.tool_calls[0].function.parsed_arguments == Weather(city="Paris")
+        assert replayed.choices[0].message.model_dump() == live.choices[0].message.model_dump()
+        assert agent._context.statistics.llm.prompt_tokens == 100
+
+    @pytest.mark.asyncio
+    async def test_response_cache_hits_are_recorded(self, tmp_path):
+        """Test that a cassette recorded with the response cache replays
+        without it."""
+        path = tmp_path / "cassette.json"
+        llm_config = LLMConfig(api_key="test-key", temperature=0, response_cache_dir=str(tmp_path / "cache"))
+        agent = create_test_agent(BaseAgent, task="Test", agent_config=AgentConfig(llm=llm_config))
+        agent.openai_client.chat.completions.stream = Mock(return_value=make_stream_context(make_chunks()))
+        agent.streaming_generator = Mock()
+        with Cassette.use(path, "record"):
+            for _ in range(2):
+                await agent._stream_completion("select_action", messages=[], tools=[WEATHER_TOOL])
+        assert agent.openai_client.chat.completions.stream.call_count == 1
+
+        uncached_config = llm_config.model_copy(update={"response_cache_dir": None})
+        agent = create_test_agent(BaseAgent, task="Test", agent_config=AgentConfig(llm=uncached_config))
+        agent.openai_client.chat.completions.stream = Mock()
+        agent.streaming_generator = Mock()
+        with Cassette.use(path, "replay", time_scale=0):
+            for _ in range(2):
+                replayed = await agent._stream_completion("select_action", messages=[], tools=[WEATHER_TOOL])
+
+        agent.openai_client.chat.completions.stream.assert_not_called()
+        assert replayed.choices[0].message.tool_calls[0].function.parsed_arguments == Weather(city="Paris")
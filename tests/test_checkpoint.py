@@ -0,0 +1,321 @@
+"""Tests for agent checkpoints.
+
+This module contains tests for CheckpointStore, checkpoint and restore
+of BaseAgent state and AgentFactory.resume.
+"""
+
+import asyncio
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from sgr_agent_core.agent_definition import AgentDefinition
+from sgr_agent_core.agent_factory import AgentFactory
+from sgr_agent_core.agents import SGRToolCallingAgent
+from sgr_agent_core.models import AgentCheckpoint, AgentStatesEnum, SourceData
+from sgr_agent_core.services import CheckpointStore
+from sgr_agent_core.tools import ClarificationTool, FinalAnswerTool, ReasoningTool, WebSearchTool
+from tests.conftest import create_test_agent
+from tests.test_base_agent import make_looping_agent
+
+TOOLKIT = [ReasoningTool, WebSearchTool, FinalAnswerTool, ClarificationTool]
+
+
+def make_agent() -> SGRToolCallingAgent:
+    agent = create_test_agent(SGRToolCallingAgent, task="Research task", toolkit=TOOLKIT)
+    agent._context.iteration = 2
+    agent._context.state = AgentStatesEnum.RESEARCHING
+    agent._context.searches_used = 1
+    agent._context.sources["https://example.com"] = SourceData(number=1, url="https://example.com", snippet="Text")
+    agent._context.statistics.llm.prompt_tokens = 100
+    agent.conversation = [{"role": "tool", "content": "Result", "tool_call_id": "2-action"}]
+    agent.log = [{"step_number": 2, "step_type": "tool_execution"}]
+    return agent
+
+
+def make_definition(tmp_path) -> AgentDefinition:
+    return AgentDefinition(
+        name="checkpoint_agent",
+        base_class=SGRToolCallingAgent,
+        tools=[ClarificationTool, FinalAnswerTool, ReasoningTool, WebSearchTool],
+        llm={"api_key": "test-key", "base_url": "https://api.openai.com/v1"},
+        prompts={
+            "system_prompt_str": "Test system prompt",
+            "initial_user_request_str": "Test initial request",
+            "clarification_response_str": "Test clarification response",
+        },
+        execution={"checkpoint_dir": str(tmp_path)},
+    )
+
+
+class TestCheckpointStore:
+    """Tests for CheckpointStore."""
+
+    def test_cannot_be_instantiated(self):
+        """Test that CheckpointStore is a static class."""
+        with pytest.raises(TypeError):
+            CheckpointStore()
+
+    def test_save_load_delete(self, tmp_path):
+        """Test that a saved checkpoint is read back until deleted."""
+        checkpoint = make_agent().checkpoint()
+
+        assert CheckpointStore.save(str(tmp_path), checkpoint)
+        assert CheckpointStore.list_ids(str(tmp_path)) == [checkpoint.agent_id]
+        assert CheckpointStore.load(str(tmp_path), checkpoint.agent_id) == checkpoint
+
+        CheckpointStore.delete(str(tmp_path), checkpoint.agent_id)
+        assert CheckpointStore.load(str(tmp_path), checkpoint.agent_id) is None
+        assert CheckpointStore.list_ids(str(tmp_path)) == []
+
+    def test_claim_once(self, tmp_path):
+        """Test that a claimed checkpoint is taken off the disk."""
+        checkpoint = make_agent().checkpoint()
+        CheckpointStore.save(str(tmp_path), checkpoint)
+
+        assert CheckpointStore.claim(str(tmp_path), checkpoint.agent_id) == checkpoint
+        assert CheckpointStore.claim(str(tmp_path), checkpoint.agent_id) is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_load_corrupted(self, tmp_path):
+        """Test that an unreadable checkpoint is ignored."""
+        CheckpointStore.path(str(tmp_path), "agent").write_text("{not json")
+
+        assert CheckpointStore.load(str(tmp_path), "agent") is None
+
+
+class TestAgentCheckpoint:
+    """Tests for checkpoint and restore of BaseAgent."""
+
+    def test_checkpoint_is_json_serializable(self):
+        """Test that the event and live objects are left out."""
+        agent = make_agent()
+        agent._context.custom_context = {"key": "value"}
+
+        checkpoint = AgentCheckpoint.model_validate_json(agent.checkpoint().model_dump_json())
+
+        assert checkpoint.toolkit == [tool.tool_name for tool in TOOLKIT]
+        assert checkpoint.iteration == 2
+        assert checkpoint.definition_name == agent.def_name
+        assert "clarification_received" not in checkpoint.context
+        assert checkpoint.context["custom_context"] == {"key": "value"}
+
+    def test_unserializable_custom_context_left_out(self):
+        """Test that a custom context that cannot be serialized does not
+        prevent the checkpoint."""
+        agent = make_agent()
+        agent._context.custom_context = {"lock": asyncio.Lock()}
+
+        checkpoint = agent.checkpoint()
+
+        assert "custom_context" not in checkpoint.context
+        assert checkpoint.conversation == agent.conversation
+
+    def test_restore(self):
+        """Test that a new agent continues with the checkpointed state."""
+        agent = make_agent()
+        checkpoint = AgentCheckpoint.model_validate_json(agent.checkpoint().model_dump_json())
+        restored = create_test_agent(SGRToolCallingAgent, task="Other", toolkit=list(reversed(TOOLKIT)))
+
+        restored.restore(checkpoint)
+
+        assert restored.id == agent.id
+        assert restored.streaming_generator.model == agent.id
+        assert restored.task == "Research task"
+        assert restored.creation_time == agent.creation_time
+        assert restored.toolkit == TOOLKIT
+        assert restored.conversation == agent.conversation
+        assert restored.log == agent.log
+        assert restored._context.iteration == 2
+        assert restored._context.sources["https://example.com"].snippet == "Text"
+        assert restored._context.statistics.llm.prompt_tokens == 100
+        assert not restored._context.clarification_received.is_set()
+
+    def test_restore_missing_tool(self):
+        """Test that a checkpoint needing an unavailable tool is rejected."""
+        checkpoint = make_agent().checkpoint()
+        restored = create_test_agent(SGRToolCallingAgent, toolkit=[ReasoningTool])
+
+        with pytest.raises(ValueError, match="not available"):
+            restored.restore(checkpoint)
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_written_at_iterations_and_deleted_at_finish(self, tmp_path):
+        """Test that running agents keep a checkpoint of the last boundary."""
+        agent = make_looping_agent(iterations=2)
+        agent.config.execution.checkpoint_dir = str(tmp_path)
+        saved = []
+        with patch.object(CheckpointStore, "save", side_effect=lambda d, c: saved.append(c.iteration)):
+            await agent.execute()
+
+        assert saved == [0, 1]
+        assert CheckpointStore.list_ids(str(tmp_path)) == []
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_written_off_event_loop(self, tmp_path):
+        """Test that checkpoints are serialized and written in a thread."""
+        agent = make_looping_agent(iterations=2)
+        agent.config.execution.checkpoint_dir = str(tmp_path)
+        threads = []
+        with patch.object(CheckpointStore, "save", side_effect=lambda d, c: threads.append(threading.current_thread())):
+            await agent.execute()
+
+        assert len(threads) == 2
+        assert threading.current_thread() not in threads
+
+    @pytest.mark.asyncio
+    async def test_interrupted_agent_keeps_checkpoint(self, tmp_path):
+        """Test that a checkpoint survives a cancellation not requested with
+        cancel(), e.g. on shutdown."""
+        agent = make_looping_agent()
+        agent.config.execution.checkpoint_dir = str(tmp_path)
+        agent.pause()
+        execution = asyncio.create_task(agent.execute())
+        await asyncio.sleep(0.01)
+        execution.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await execution
+
+        assert CheckpointStore.list_ids(str(tmp_path)) == [agent.id]
+
+
+class TestAgentFactoryResume:
+    """Tests for AgentFactory.resume."""
+
+    @pytest.mark.asyncio
+    async def test_resume_by_agent_id(self, tmp_path):
+        """Test that an agent is rebuilt from the definition named in its
+        checkpoint."""
+        agent_def = make_definition(tmp_path)
+        with patch("sgr_agent_core.agent_factory.MCP2ToolConverter.build_tools_from_mcp", return_value=[]):
+            agent = await AgentFactory.create(agent_def, task="Research task")
+            agent._context.iteration = 3
+            await agent._save_checkpoint()
+            config = Mock(agents={"checkpoint_agent": agent_def})
+            with patch("sgr_agent_core.agent_factory.GlobalConfig", return_value=config):
+                resumed = await AgentFactory.resume(agent.id, checkpoint_dir=str(tmp_path))
+
+        assert isinstance(resumed, SGRToolCallingAgent)
+        assert resumed.id == agent.id
+        assert resumed._context.iteration == 3
+        assert resumed.toolkit == agent.toolkit
+
+    @pytest.mark.asyncio
+    async def test_resume_unknown_definition(self, tmp_path):
+        """Test that a checkpoint of an unknown definition is rejected."""
+        checkpoint = make_agent().checkpoint()
+        with patch("sgr_agent_core.agent_factory.GlobalConfig", return_value=Mock(agents={})):
+            with pytest.raises(ValueError, match="not found"):
+                await AgentFactory.resume(checkpoint)
+
+    @pytest.mark.asyncio
+    async def test_resumed_agent_waits_for_clarification(self):
+        """Test that an agent checkpointed while waiting for the user
+        continues only after the clarification."""
+        agent = make_looping_agent(iterations=2)
+        agent._context.iteration = 1
+        agent._context.state = AgentStatesEnum.WAITING_FOR_CLARIFICATION
+        checkpoint = agent.checkpoint()
+        resumed = make_looping_agent(iterations=2)
+        resumed.restore(checkpoint)
+
+        execution = asyncio.create_task(resumed.execute())
+        await asyncio.sleep(0.01)
+        assert resumed._context.iteration == 1
+        await resumed.provide_clarification("Answer")
+        await asyncio.wait_for(execution, timeout=1)
+
+        assert resumed._context.state == AgentStatesEnum.COMPLETED
+        assert resumed._context.iteration == 2
+
+
+def make_asking_agent(checkpoint_dir) -> SGRToolCallingAgent:
+    """Agent with stub phases that asks for a clarification in its first
+    iteration and completes in the next one."""
+    agent = make_looping_agent(iterations=2)
+    agent._select_action_phase.return_value = Mock(spec=ClarificationTool)
+    agent.config.execution.checkpoint_dir = str(checkpoint_dir)
+    agent.config.execution.clarification_idle_timeout = 0.01
+    return agent
+
+
+class TestSuspension:
+    """Tests for suspending agents waiting for a clarification or paused."""
+
+    @pytest.mark.asyncio
+    async def test_idle_agent_suspended_with_checkpoint(self, tmp_path):
+        """Test that the task of an agent without an answer ends and its
+        checkpoint is kept for resuming."""
+        agent = make_asking_agent(tmp_path)
+
+        assert await asyncio.wait_for(agent.execute(), timeout=1) is None
+
+        assert agent._context.state == AgentStatesEnum.SUSPENDED
+        checkpoint = CheckpointStore.load(str(tmp_path), agent.id)
+        assert checkpoint.context["state"] == AgentStatesEnum.WAITING_FOR_CLARIFICATION
+        assert checkpoint.iteration == 1
+
+    @pytest.mark.asyncio
+    async def test_not_suspended_without_checkpoints(self, tmp_path):
+        """Test that an agent that cannot be resumed keeps waiting."""
+        agent = make_asking_agent(tmp_path)
+        agent.config.execution.checkpoint_dir = None
+        execution = asyncio.create_task(agent.execute())
+        await asyncio.sleep(0.05)
+
+        assert agent._context.state == AgentStatesEnum.WAITING_FOR_CLARIFICATION
+        agent._select_action_phase.return_value = Mock()
+        await agent.provide_clarification("Answer")
+        await asyncio.wait_for(execution, timeout=1)
+        assert agent._context.state == AgentStatesEnum.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_suspended_agent_resumed_with_answer(self, tmp_path):
+        """Test that an agent rebuilt from the checkpoint of a suspended one
+        continues with the answer."""
+        agent = make_asking_agent(tmp_path)
+        await agent.execute()
+        resumed = make_looping_agent(iterations=2)
+        resumed.config.execution.checkpoint_dir = str(tmp_path)
+        resumed.restore(CheckpointStore.load(str(tmp_path), agent.id))
+
+        await resumed.provide_clarification("Answer")
+        await asyncio.wait_for(resumed.execute(), timeout=1)
+
+        assert resumed._context.state == AgentStatesEnum.COMPLETED
+        assert resumed._context.iteration == 2
+        assert CheckpointStore.load(str(tmp_path), agent.id) is None
+
+    @pytest.mark.asyncio
+    async def test_paused_agent_suspended_after_pause_timeout(self, tmp_path):
+        """Test that an agent paused for too long ends its task and is
+        resumed from its checkpoint as if never paused."""
+        agent = make_looping_agent(iterations=2)
+        agent.config.execution.checkpoint_dir = str(tmp_path)
+        agent.config.execution.pause_timeout = 0.01
+        agent.pause()
+
+        assert await asyncio.wait_for(agent.execute(), timeout=1) is None
+
+        assert agent._context.state == AgentStatesEnum.SUSPENDED
+        checkpoint = CheckpointStore.load(str(tmp_path), agent.id)
+        assert checkpoint.context["state"] == AgentStatesEnum.PAUSED
+        resumed = make_looping_agent(iterations=2)
+        resumed.restore(checkpoint)
+        assert resumed._context.state == AgentStatesEnum.RESEARCHING
+        await asyncio.wait_for(resumed.execute(), timeout=1)
+        assert resumed._context.state == AgentStatesEnum.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_paused_agent_cancelled_without_checkpoints(self):
+        """Test that an agent paused for too long that cannot be resumed is
+        cancelled."""
+        agent = make_looping_agent()
+        agent.config.execution.pause_timeout = 0.01
+        agent.pause()
+
+        assert await asyncio.wait_for(agent.execute(), timeout=1) is None
+
+        assert agent._context.state == AgentStatesEnum.CANCELLED
+        assert agent.streaming_generator.closed
@@ -0,0 +1,165 @@
+"""Tests for ConcurrencyLimiter service.
+
+This module contains tests for the adaptive per-endpoint limit of
+concurrent LLM requests.
+"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from sgr_agent_core.agent_definition import LLMConfig
+from sgr_agent_core.services import AdaptiveLimit, ConcurrencyLimiter
+
+KEY = "https://llm.example.com/v1"
+
+
+@pytest.fixture(autouse=True)
+def reset_limiter():
+    ConcurrencyLimiter.reset()
+    yield
+    ConcurrencyLimiter.reset()
+
+
+def make_rate_limit_error() -> openai.RateLimitError:
+    response = httpx.Response(429, request=httpx.Request("POST", KEY))
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class TestAdaptiveLimit:
+    """Tests for AdaptiveLimit."""
+
+    def test_additive_increase_is_capped(self):
+        """Test that the limit grows slowly up to the maximum."""
+        limit = AdaptiveLimit(min_limit=1, max_limit=4)
+        limit.limit = 2.0
+
+        limit.increase()
+        assert limit.limit == 2.5
+        for _ in range(20):
+            limit.increase()
+        assert limit.limit == 4
+
+    def test_multiplicative_decrease_is_floored(self):
+        """Test that the limit shrinks fast down to the minimum."""
+        limit = AdaptiveLimit(min_limit=2, max_limit=16)
+
+        limit.decrease(0.5)
+        assert limit.limit == 8
+        for _ in range(10):
+            limit.decrease(0.5)
+        assert limit.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_requests_over_limit_wait_in_order(self):
+        """Test that waiting requests get slots in FIFO order."""
+        limit = AdaptiveLimit(min_limit=1, max_limit=1)
+        order = []
+
+        async def request(name):
+            await limit.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limit.release()
+
+        await limit.acquire()
+        tasks = [asyncio.create_task(request(name)) for name in ("a", "b", "c")]
+        await asyncio.sleep(0.01)
+        assert limit.queue_depth == 3
+        limit.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b", "c"]
+        assert limit.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test that a cancelled request does not hold a slot."""
+        limit = AdaptiveLimit(min_limit=1, max_limit=1)
+        await limit.acquire()
+        waiter = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limit.release()
+
+        assert limit.queue_depth == 0
+        assert limit.in_flight == 0
+
+
+class TestConcurrencyLimiter:
+    """Tests for ConcurrencyLimiter."""
+
+    def test_cannot_be_instantiated(self):
+        """Test that ConcurrencyLimiter is a static class."""
+        with pytest.raises(TypeError):
+            ConcurrencyLimiter()
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_max_concurrent_requests(self):
+        """Test that nothing is limited by default."""
+        async with ConcurrencyLimiter.slot(KEY, LLMConfig()):
+            pass
+
+        assert ConcurrencyLimiter.stats() == {}
+
+    @pytest.mark.asyncio
+    async def test_in_flight_requests_are_capped(self):
+        """Test that at most max_concurrent_requests run at once."""
+        llm_config = LLMConfig(max_concurrent_requests=2)
+        running, peak = 0, 0
+
+        async def request():
+            nonlocal running, peak
+            async with ConcurrencyLimiter.slot(KEY, llm_config):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(request() for _ in range(6)))
+
+        assert peak == 2
+        assert ConcurrencyLimiter.stats()[KEY]["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_halves_the_limit(self):
+        """Test that a 429 lowers the endpoint limit."""
+        llm_config = LLMConfig(max_concurrent_requests=8)
+
+        with pytest.raises(openai.RateLimitError):
+            async with ConcurrencyLimiter.slot(KEY, llm_config):
+                raise make_rate_limit_error()
+
+        assert ConcurrencyLimiter.stats()[KEY]["limit"] == 4
+
+    @pytest.mark.asyncio
+    async def test_slow_call_lowers_the_limit(self):
+        """Test that calls above the latency target lower the limit."""
+        llm_config = LLMConfig(max_concurrent_requests=10, latency_target=0.001)
+
+        async with ConcurrencyLimiter.slot(KEY, llm_config):
+            await asyncio.sleep(0.01)
+
+        assert ConcurrencyLimiter.stats()[KEY]["limit"] == 9
+
+    @pytest.mark.asyncio
+    async def test_slow_client_after_first_token_keeps_the_limit(self):
+        """Test that only the time to the first token is compared to the
+        latency target."""
+        llm_config = LLMConfig(max_concurrent_requests=10, latency_target=0.005)
+
+        async with ConcurrencyLimiter.slot(KEY, llm_config) as first_token:
+            first_token()
+            await asyncio.sleep(0.02)
+
+        assert ConcurrencyLimiter.stats()[KEY]["limit"] == 10
+
+    def test_min_limit_above_max_is_rejected(self):
+        """Test that inconsistent limit bounds fail validation."""
+        with pytest.raises(ValueError, match="min_concurrent_requests"):
+            LLMConfig(max_concurrent_requests=2, min_concurrent_requests=4)
@@ -0,0 +1,121 @@
+"""Tests for ContextCompactor service.
+
+This module contains tests for token estimation and budgeted compaction
+of agent conversations.
+"""
+
+import pytest
+
+from sgr_agent_core.agent_definition import ExecutionConfig
+from sgr_agent_core.base_agent import BaseAgent
+from sgr_agent_core.services import ContextCompactor
+from tests.conftest import create_test_agent
+
+
+def make_page_result(number: int, size: int = 4000) -> str:
+    return (
+        "Extracted Page Content:\n\n"
+        f"[{number}] Page {number} - https://example.com/{number}\n\n"
+        f"**Full Content:**\n{'x' * size}\n\n---\n\n"
+    )
+
+
+def make_conversation(results: int) -> list[dict]:
+    conversation = []
+    for i in range(1, results + 1):
+        conversation.append({"role": "assistant", "content": None, "tool_calls": []})
+        conversation.append({"role": "tool", "content": make_page_result(i), "tool_call_id": f"{i}-action"})
+    return conversation
+
+
+class TestContextCompactor:
+    """Tests for ContextCompactor."""
+
+    def test_cannot_be_instantiated(self):
+        """Test that ContextCompactor is a static class."""
+        with pytest.raises(TypeError):
+            ContextCompactor()
+
+    def test_estimate_tokens_counts_content_and_tool_call_arguments(self):
+        """Test token estimation of messages."""
+        messages = [
+            {"role": "user", "content": "a" * 40},
+            {"role": "assistant", "content": None, "tool_calls": [{"function": {"arguments": "b" * 40}}]},
+        ]
+
+        assert ContextCompactor.estimate_tokens(messages) == 20
+
+    def test_digest_keeps_head_and_citations(self):
+        """Test that digest keeps citation lines of the whole result."""
+        content = "Search Results:\n\n" + "\n".join(
+            f"[{i}] Title {i} - https://example.com/{i}\n{'snippet ' * 20}" for i in range(1, 6)
+        )
+
+        digest = ContextCompactor.digest(content, max_chars=50)
+
+        assert digest.startswith(ContextCompactor.DIGEST_MARKER)
+        for i in range(1, 6):
+            assert f"[{i}] Title {i} - https://example.com/{i}" in digest
+        assert len(digest) < len(content)
+
+    def test_compact_within_budget_does_nothing(self):
+        """Test that conversation under budget is left untouched."""
+        conversation = make_conversation(3)
+        original = [dict(message) for message in conversation]
+
+        assert ContextCompactor.compact(conversation, token_budget=100000, keep_recent=2, digest_chars=100) == 0
+        assert conversation == original
+
+    def test_compact_replaces_oldest_results_and_keeps_recent(self):
+        """Test that oldest tool results are compacted first and recent ones
+        stay intact."""
+        conversation = make_conversation(5)
+        recent = conversation[-1]["content"]
+
+        compacted = ContextCompactor.compact(conversation, token_budget=3000, keep_recent=2, digest_chars=100)
+
+        assert compacted > 0
+        assert ContextCompactor.estimate_tokens(conversation) <= 3000
+        assert conversation[1]["content"].startswith(ContextCompactor.DIGEST_MARKER)
+        assert "[1] Page 1 - https://example.com/1" in conversation[1]["content"]
+        assert conversation[-1]["content"] == recent
+
+    def test_compacted_messages_are_stable(self):
+        """Test that repeated compaction does not change digests again."""
+        conversation = make_conversation(5)
+        ContextCompactor.compact(conversation, token_budget=10, keep_recent=2, digest_chars=100)
+        first = [message["content"] for message in conversation]
+
+        assert ContextCompactor.compact(conversation, token_budget=10, keep_recent=2, digest_chars=100) == 0
+        assert [message["content"] for message in conversation] == first
+
+
+class TestAgentContextCompaction:
+    """Tests for compaction in BaseAgent._prepare_context."""
+
+    @pytest.mark.asyncio
+    async def test_prepare_context_keeps_prompt_size_flat(self):
+        """Test that prompt size stays within budget as results pile up."""
+        agent = create_test_agent(
+            BaseAgent,
+            task="Test",
+            execution_config=ExecutionConfig(context_token_budget=4000, compaction_keep_recent=2),
+        )
+
+        for i in range(1, 11):
+            agent.conversation.extend(make_conversation(1))
+            agent.conversation[-1]["content"] = make_page_result(i)
+            messages = await agent._prepare_context()
+            assert ContextCompactor.estimate_tokens(messages) <= 4000
+
+        assert messages[-1]["content"] == make_page_result(10)
+
+    @pytest.mark.asyncio
+    async def test_compaction_disabled_by_default(self):
+        """Test that conversation is sent as is without a budget."""
+        agent = create_test_agent(BaseAgent, task="Test")
+        agent.conversation = make_conversation(10)
+
+        messages = await agent._prepare_context()
+
+        assert messages[2:] == make_conversation(10)
@@ -0,0 +1,169 @@
+"""Tests for EndpointBalancer service.
+
+This module contains tests for routing between LLM endpoints, circuit
+breaking and failover of agent completion calls.
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import openai
+import pytest
+
+from sgr_agent_core.agent_definition import AgentConfig, LLMConfig, LLMEndpoint
+from sgr_agent_core.agent_factory import AgentFactory
+from sgr_agent_core.base_agent import BaseAgent
+from sgr_agent_core.services import EndpointBalancer, LLMClientPool
+from tests.conftest import create_test_agent
+
+FIRST = LLMEndpoint(base_url="https://first.example.com/v1", api_key="first-key")
+SECOND = LLMEndpoint(base_url="https://second.example.com/v1")
+
+
+@pytest.fixture(autouse=True)
+def reset_balancer():
+    EndpointBalancer.reset()
+    yield
+    EndpointBalancer.reset()
+
+
+def make_status_error(status_code: int) -> openai.APIStatusError:
+    response = httpx.Response(status_code, request=httpx.Request("POST", "https://first.example.com/v1"))
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+def fail_with(error: Exception, llm_config: LLMConfig, endpoint: LLMEndpoint = FIRST):
+    with pytest.raises(type(error)):
+        with EndpointBalancer.track(endpoint, llm_config):
+            raise error
+
+
+class TestEndpointBalancer:
+    """Tests for EndpointBalancer."""
+
+    def test_cannot_be_instantiated(self):
+        """Test that EndpointBalancer is a static class."""
+        with pytest.raises(TypeError):
+            EndpointBalancer()
+
+    def test_least_outstanding_routing(self):
+        """Test that the endpoint with fewer requests in flight is
+        selected."""
+        llm_config = LLMConfig(endpoints=[FIRST, SECOND])
+
+        with EndpointBalancer.track(FIRST, llm_config):
+            assert EndpointBalancer.select(llm_config) == SECOND
+        assert EndpointBalancer.state(FIRST).outstanding == 0
+
+    def test_weighted_routing(self):
+        """Test that weighted routing skips zero-share endpoints."""
+        heavy = LLMEndpoint(base_url="https://heavy.example.com/v1", weight=1000)
+        light = LLMEndpoint(base_url="https://light.example.com/v1", weight=0.001)
+        llm_config = LLMConfig(endpoints=[heavy, light], routing="weighted")
+
+        selected = [EndpointBalancer.select(llm_config) for _ in range(20)]
+
+        assert selected.count(heavy) >= 19
+
+    def test_endpoint_failures_open_circuit(self):
+        """Test that consecutive 5xx/429 failures take the endpoint out of
+        rotation."""
+        llm_config = LLMConfig(endpoints=[FIRST, SECOND], circuit_breaker_threshold=2, circuit_breaker_cooldown=60)
+
+        fail_with(make_status_error(503), llm_config)
+        assert EndpointBalancer.is_available(FIRST)
+        fail_with(make_status_error(429), llm_config)
+
+        assert not EndpointBalancer.is_available(FIRST)
+        assert EndpointBalancer.select(llm_config, exclude=[SECOND]) == FIRST
+        assert all(EndpointBalancer.select(llm_config) == SECOND for _ in range(5))
+
+    def test_client_errors_do_not_open_circuit(self):
+        """Test that request errors are not endpoint failures."""
+        llm_config = LLMConfig(endpoints=[FIRST, SECOND], circuit_breaker_threshold=1)
+
+        fail_with(make_status_error(400), llm_config)
+
+        assert EndpointBalancer.is_available(FIRST)
+
+    def test_circuit_closes_after_successful_probe(self):
+        """Test that an endpoint is back after cooldown and success."""
+        llm_config = LLMConfig(endpoints=[FIRST, SECOND], circuit_breaker_threshold=1, circuit_breaker_cooldown=0)
+        fail_with(make_status_error(500), llm_config)
+
+        with EndpointBalancer.track(FIRST, llm_config):
+            pass
+
+        assert EndpointBalancer.state(FIRST).consecutive_failures == 0
+        assert EndpointBalancer.is_available(FIRST)
+
+    def test_factory_creates_client_of_selected_endpoint(self):
+        """Test that AgentFactory uses the balancer for agent clients."""
+        llm_config = LLMConfig(api_key="default-key", endpoints=[FIRST, SECOND])
+        EndpointBalancer.state(FIRST).outstanding = 5
+
+        client = AgentFactory._create_client(llm_config)
+
+        assert str(client.base_url).startswith(SECOND.base_url)
+        assert client.api_key == "default-key"
+        LLMClientPool._clients.clear()
+
+
+class TestAgentFailover:
+    """Tests for failover of agent completion calls between endpoints."""
+
+    @staticmethod
+    def make_client(error: Exception | None = None, chunks: int = 1) -> Mock:
+        chunk_events = [Mock(type="chunk", chunk=Mock(choices=[Mock()])) for _ in range(chunks)]
+
+        async def async_iter(self):
+            for event in chunk_events:
+                yield event
+            if error is not None:
+                raise error
+
+        stream = AsyncMock()
+        stream.__aiter__ = async_iter
+        stream.get_final_completion = AsyncMock(return_value=Mock(usage=None))
+        context = AsyncMock()
+        context.__aenter__ = AsyncMock(return_value=stream)
+        context.__aexit__ = AsyncMock(return_value=None)
+        client = Mock()
+        client.chat.completions.stream = Mock(return_value=context)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_request_fails_over_to_healthy_endpoint(self, monkeypatch):
+        """Test that a request failing before streaming goes to the next
+        endpoint."""
+        clients = {
+            FIRST.base_url: self.make_client(make_status_error(502), chunks=0),
+            SECOND.base_url: self.make_client(),
+        }
+        monkeypatch.setattr(LLMClientPool, "get", classmethod(lambda cls, llm_config: clients[llm_config.base_url]))
+        agent = create_test_agent(
+            BaseAgent, task="Test", agent_config=AgentConfig(llm=LLMConfig(endpoints=[FIRST, SECOND]))
+        )
+        agent.streaming_generator = Mock()
+
+        await agent._stream_completion("reasoning", messages=[])
+
+        assert clients[FIRST.base_url].chat.completions.stream.call_count == 1
+        assert clients[SECOND.base_url].chat.completions.stream.call_count == 1
+        assert EndpointBalancer.state(FIRST).consecutive_failures == 1
+        request = clients[SECOND.base_url].chat.completions.stream.call_args.kwargs
+        assert "endpoints" not in request
+
+    @pytest.mark.asyncio
+    async def test_no_failover_after_streaming_started(self, monkeypatch):
+        """Test that a failure mid-stream is raised instead of retried."""
+        clients = {FIRST.base_url: self.make_client(make_status_error(502)), SECOND.base_url: self.make_client()}
+        monkeypatch.setattr(LLMClientPool, "get", classmethod(lambda cls, llm_config: clients[llm_config.base_url]))
+        agent = create_test_agent(
+            BaseAgent, task="Test", agent_config=AgentConfig(llm=LLMConfig(endpoints=[FIRST, SECOND]))
+        )
+        agent.streaming_generator = Mock()
+
+        with pytest.raises(openai.APIStatusError):
+            await agent._stream_completion("reasoning", messages=[])
+        assert clients[SECOND.base_url].chat.completions.stream.call_count == 0
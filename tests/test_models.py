@@ -13,6 +13,7 @@ from pydantic import ValidationError
 from sgr_agent_core.models import (
     AgentContext,
     AgentStatesEnum,
+    AgentStatistics,
     SearchResult,
     SourceData,
 )
@@ -311,3 +312,46 @@ class TestResearchContext:
         reasoning_data = {"step": 1, "action": "search"}
         context.current_step_reasoning = reasoning_data
         assert context.current_step_reasoning == reasoning_data
+
+
+class TestAgentStatistics:
+    """Tests for AgentStatistics model."""
+
+    def test_llm_calls_are_accounted_per_phase_and_in_total(self):
+        """Test that LLM calls add up per phase and in totals."""
+        statistics = AgentStatistics()
+        statistics.add_llm_call(
+            "reasoning", latency=1.0, time_to_first_token=0.2, prompt_tokens=100, cached_tokens=80, completion_tokens=10
+        )
+        statistics.add_llm_call("reasoning", latency=2.0, time_to_first_token=0.3, prompt_tokens=120)
+        statistics.add_llm_call("select_action", latency=0.5, time_to_first_token=0.1, completion_tokens=5)
+
+        assert statistics.phases["reasoning"].calls == 2
+        assert statistics.phases["reasoning"].prompt_tokens == 220
+        assert statistics.phases["select_action"].completion_tokens == 5
+        assert statistics.llm.calls == 3
+        assert statistics.llm.latency == pytest.approx(3.5)
+        assert statistics.llm.time_to_first_token == pytest.approx(0.6)
+        assert statistics.usage() == {
+            "prompt_tokens": 220,
+            "completion_tokens": 15,
+            "total_tokens": 235,
+            "prompt_tokens_details": {"cached_tokens": 80},
+        }
+
+    def test_tool_calls_are_accounted_per_tool(self):
+        """Test that tool latencies add up per tool name."""
+        statistics = AgentStatistics()
+        statistics.add_tool_call("websearchtool", latency=1.5)
+        statistics.add_tool_call("websearchtool", latency=0.5)
+
+        assert statistics.tools["websearchtool"].calls == 2
+        assert statistics.tools["websearchtool"].latency == pytest.approx(2.0)
+        assert statistics.llm.calls == 0
+
+    def test_context_state_includes_statistics(self):
+        """Test that agent state exposes the statistics."""
+        context = AgentContext()
+        context.statistics.add_tool_call("finalanswertool", latency=0.1)
+
+        assert context.agent_state()["statistics"]["tools"]["finalanswertool"]["calls"] == 1
@@ -279,6 +279,19 @@ class TestPromptLoader:
             date_part = parts[0]
             assert len(date_part) == 19  # YYYY-MM-DD HH:MM:SS
 
+    def test_get_initial_user_request_uses_given_datetime(self):
+        """Test that an explicit datetime is used instead of the current
+        time."""
+        prompts_config = PromptsConfig(
+            system_prompt_str="System",
+            initial_user_request_str="{current_date}|{task}",
+            clarification_response_str="{clarifications}",
+        )
+
+        result = PromptLoader.get_initial_user_request("task", prompts_config, datetime(2024, 1, 2, 3, 4, 5))
+
+        assert result == "2024-01-02 03:04:05|task"
+
     def test_load_prompt_file_falls_back_to_lib_dir(self):
         """Test that PromptsConfig can load files from default library
         directory."""
@@ -0,0 +1,175 @@
+"""Tests for RequestHedger service.
+
+This module contains tests for hedging of slow streamed requests and
+the hedge rate cap.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from sgr_agent_core.agent_definition import AgentConfig, LLMConfig, LLMEndpoint
+from sgr_agent_core.base_agent import BaseAgent
+from sgr_agent_core.services import EndpointBalancer, LLMClientPool, RequestHedger
+from tests.conftest import create_test_agent
+
+KEY = "https://llm.example.com/v1#model"
+
+
+@pytest.fixture(autouse=True)
+def reset_hedger():
+    RequestHedger.reset()
+    yield
+    RequestHedger.reset()
+
+
+def warm_up(latency: float = 0.01, samples: int = RequestHedger.MIN_SAMPLES):
+    for _ in range(samples):
+        RequestHedger.record_latency(KEY, latency)
+
+
+def make_attempt(delays: list[float], started: list[int], cancelled: list[int]):
+    """Attempt streaming its first token after delays[index] seconds."""
+
+    async def attempt(index, claim):
+        started.append(index)
+        try:
+            await asyncio.sleep(delays[index])
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        if not claim():
+            return None
+        return f"answer-{index}"
+
+    return attempt
+
+
+class TestRequestHedger:
+    """Tests for RequestHedger."""
+
+    def test_cannot_be_instantiated(self):
+        """Test that RequestHedger is a static class."""
+        with pytest.raises(TypeError):
+            RequestHedger()
+
+    def test_hedge_delay_needs_samples(self):
+        """Test that no hedging happens without latency history."""
+        assert RequestHedger.hedge_delay(KEY, percentile=95, min_delay=0) is None
+        warm_up(latency=0.5)
+        assert RequestHedger.hedge_delay(KEY, percentile=95, min_delay=0) == 0.5
+        assert RequestHedger.hedge_delay(KEY, percentile=95, min_delay=2) == 2
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        """Test that a request answering in time is not duplicated."""
+        warm_up(latency=0.1)
+        started, cancelled = [], []
+
+        result = await RequestHedger.run(
+            KEY, make_attempt([0.01, 0.01], started, cancelled), percentile=95, min_delay=0, max_rate=1
+        )
+
+        assert result == "answer-0"
+        assert started == [0]
+        assert RequestHedger.hedge_rate(KEY) == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged_and_loser_cancelled(self):
+        """Test that a late first token triggers the hedge and the faster
+        copy wins."""
+        warm_up(latency=0.01)
+        started, cancelled = [], []
+
+        result = await RequestHedger.run(
+            KEY, make_attempt([1.0, 0.01], started, cancelled), percentile=95, min_delay=0.05, max_rate=1
+        )
+        await asyncio.sleep(0)
+
+        assert result == "answer-1"
+        assert started == [0, 1]
+        assert cancelled == [0]
+        assert RequestHedger.hedge_rate(KEY) == 1
+
+    @pytest.mark.asyncio
+    async def test_hedge_rate_is_capped(self):
+        """Test that no hedge is sent above the allowed share."""
+        warm_up(latency=0.01)
+        started, cancelled = [], []
+
+        result = await RequestHedger.run(
+            KEY, make_attempt([0.1, 0.01], started, cancelled), percentile=95, min_delay=0.01, max_rate=0.5
+        )
+
+        assert result == "answer-0"
+        assert started == [0]
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_error_is_raised(self):
+        """Test that the primary error is raised when nothing was
+        streamed."""
+
+        async def attempt(index, claim):
+            raise RuntimeError("endpoint down")
+
+        with pytest.raises(RuntimeError, match="endpoint down"):
+            await RequestHedger.run(KEY, attempt, percentile=95, min_delay=0, max_rate=1)
+
+
+class TestAgentHedging:
+    """Tests for hedged LLM calls of agents."""
+
+    @staticmethod
+    def make_stream_context(first_chunk_delay: float, name: str):
+        chunk = Mock(choices=[Mock()], name=name)
+
+        async def async_iter(self):
+            await asyncio.sleep(first_chunk_delay)
+            yield Mock(type="chunk", chunk=chunk)
+
+        stream = AsyncMock()
+        stream.__aiter__ = async_iter
+        stream.get_final_completion = AsyncMock(return_value=Mock(usage=None, name=f"{name}-completion"))
+        context = AsyncMock()
+        context.__aenter__ = AsyncMock(return_value=stream)
+        context.__aexit__ = AsyncMock(return_value=None)
+        return context, chunk
+
+    @pytest.mark.asyncio
+    async def test_hedged_completion_forwards_only_winner_chunks(self):
+        """Test that the faster copy is returned and streamed to the
+        client."""
+        llm_config = LLMConfig(hedge_requests=True, hedge_min_delay=0.05, hedge_max_rate=1)
+        for _ in range(RequestHedger.MIN_SAMPLES):
+            RequestHedger.record_latency(f"{llm_config.base_url}#{llm_config.model}", 0.01)
+        slow_context, slow_chunk = self.make_stream_context(1.0, "slow")
+        fast_context, fast_chunk = self.make_stream_context(0.01, "fast")
+
+        agent = create_test_agent(BaseAgent, task="Test", agent_config=AgentConfig(llm=llm_config))
+        agent.openai_client.chat.completions.stream = Mock(side_effect=[slow_context, fast_context])
+        agent.streaming_generator = Mock()
+
+        completion = await agent._stream_completion("reasoning", messages=[])
+
+        assert completion is await fast_context.__aenter__.return_value.get_final_completion()
+        agent.streaming_generator.add_chunk.assert_called_once_with(fast_chunk)
+        request = agent.openai_client.chat.completions.stream.call_args.kwargs
+        assert not any(key.startswith("hedge_") for key in request)
+
+    @pytest.mark.asyncio
+    async def test_latency_is_tracked_per_chosen_endpoint(self, monkeypatch):
+        """Test that replicas keep separate latency statistics."""
+        first = LLMEndpoint(base_url="https://first.example.com/v1")
+        second = LLMEndpoint(base_url="https://second.example.com/v1")
+        llm_config = LLMConfig(hedge_requests=True, endpoints=[first, second])
+        client = Mock()
+        client.chat.completions.stream = Mock(return_value=self.make_stream_context(0.01, "answer")[0])
+        monkeypatch.setattr(LLMClientPool, "get", classmethod(lambda cls, llm_config: client))
+        monkeypatch.setattr(EndpointBalancer, "select", classmethod(lambda cls, llm_config, exclude=None: second))
+        agent = create_test_agent(BaseAgent, task="Test", agent_config=AgentConfig(llm=llm_config))
+        agent.streaming_generator = Mock()
+
+        await agent._stream_completion("reasoning", messages=[])
+
+        assert list(RequestHedger._latencies) == [f"{second.base_url}#{llm_config.model}"]
@@ -0,0 +1,170 @@
+"""Tests for ResponseCache service.
+
+This module contains tests for request keys, storage and replay of
+cached LLM responses, and for the cache in BaseAgent completion calls.
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from openai import pydantic_function_tool
+from openai.lib.streaming.chat import ChatCompletionStreamState
+from openai.types.chat import ChatCompletionChunk
+from pydantic import BaseModel
+
+from sgr_agent_core.agent_definition import LLMConfig
+from sgr_agent_core.base_agent import BaseAgent
+from sgr_agent_core.services import ResponseCache
+from tests.conftest import create_test_agent
+
+
+class Weather(BaseModel):
+    city: str
+
+
+WEATHER_TOOL = pydantic_function_tool(Weather, name="weather")
+
+
+def make_chunks() -> list[ChatCompletionChunk]:
+    base = {"id": "completion", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o-mini"}
+    tool_call = {
+        "index": 0,
+        "id": "call_1",
+        "type": "function",
+        "function": {"name": "weather", "arguments": '{"city": "Paris"}'},
+    }
+    return [
+        ChatCompletionChunk.model_validate(
+            {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "tool_calls": [tool_call]}}]}
+        ),
+        ChatCompletionChunk.model_validate(
+            {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "tool_calls"}]}
+        ),
+        ChatCompletionChunk.model_validate(
+            {**base, "choices": [], "usage": {"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110}}
+        ),
+    ]
+
+
+def make_stream_context(chunks: list[ChatCompletionChunk]) -> AsyncMock:
+    """Stream of the chunks producing events and final completion like the
+    OpenAI client does."""
+    state = ChatCompletionStreamState(input_tools=[WEATHER_TOOL])
+
+    async def async_iter(self):
+        for chunk in chunks:
+            for event in state.handle_chunk(chunk):
+                yield event
+
+    stream = AsyncMock()
+    stream.__aiter__ = async_iter
+    stream.get_final_completion = AsyncMock(side_effect=state.get_final_completion)
+    stream_context = AsyncMock()
+    stream_context.__aenter__ = AsyncMock(return_value=stream)
+    stream_context.__aexit__ = AsyncMock(return_value=None)
+    return stream_context
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_cannot_be_instantiated(self):
+        """Test that ResponseCache is a static class."""
+        with pytest.raises(TypeError):
+            ResponseCache()
+
+    def test_enabled_for_greedy_sampling_or_opt_in(self):
+        """Test that caching needs a directory and temperature 0 or
+        opt-in."""
+        assert not ResponseCache.is_enabled(LLMConfig(temperature=0))
+        assert ResponseCache.is_enabled(LLMConfig(temperature=0, response_cache_dir="cache"))
+        assert not ResponseCache.is_enabled(LLMConfig(temperature=0.4, response_cache_dir="cache"))
+        assert ResponseCache.is_enabled(
+            LLMConfig(temperature=0.4, response_cache_dir="cache", response_cache_any_temperature=True)
+        )
+
+    def test_cache_settings_not_sent_with_requests(self):
+        """Test that cache settings are client fields."""
+        kwargs = LLMConfig(response_cache_dir="cache", response_cache_any_temperature=True).to_openai_client_kwargs()
+
+        assert "response_cache_dir" not in kwargs
+        assert "response_cache_any_temperature" not in kwargs
+
+    def test_key_depends_on_request(self):
+        """Test that keys differ by messages, tools and response format."""
+        request = {"model": "m", "messages": [{"role": "user", "content": "Hi"}], "tools": [WEATHER_TOOL]}
+
+        assert ResponseCache.key(request) == ResponseCache.key(dict(request))
+        assert ResponseCache.key(request) != ResponseCache.key({**request, "messages": []})
+        assert ResponseCache.key(request) != ResponseCache.key({**request, "tools": []})
+        assert ResponseCache.key({**request, "response_format": Weather}) != ResponseCache.key(request)
+
+    def test_key_ignores_timestamps(self):
+        """Test that the task date in the prompt does not change the key."""
+        first = {"messages": [{"role": "user", "content": "Current Date: 2025-01-01 10:00:00 Task"}]}
+        second = {"messages": [{"role": "user", "content": "Current Date: 2025-06-30 23:59:59 Task"}]}
+
+        assert ResponseCache.key(first) == ResponseCache.key(second)
+
+    def test_load_missing_or_corrupted(self, tmp_path):
+        """Test that misses and unreadable files return None."""
+        key = ResponseCache.key({"messages": []})
+        assert ResponseCache.load(str(tmp_path), key) is None
+
+        path = tmp_path / key[:2] / f"{key}.json"
+        path.parent.mkdir()
+        path.write_text("{not json")
+        assert ResponseCache.load(str(tmp_path), key) is None
+
+    def test_replay_produces_parsed_completion(self, tmp_path):
+        """Test that stored chunks replay to the parsed completion."""
+        key = ResponseCache.key({"messages": []})
+        ResponseCache.save(str(tmp_path), key, make_chunks())
+
+        events, state = ResponseCache.replay(ResponseCache.load(str(tmp_path), key), {"tools": [WEATHER_TOOL]})
+        chunk_events = [event for chunk_events in events for event in chunk_events if event.type == "chunk"]
+        completion = state.get_final_completion()
+
+        assert len(chunk_events) == 3
+        assert completion.choices[0].message.tool_calls[0].function.parsed_arguments == Weather(city="Paris")
+        assert completion.usage.prompt_tokens == 100
+
+
+class TestAgentResponseCache:
+    """Tests for the response cache in BaseAgent._stream_completion."""
+
+    @pytest.mark.asyncio
+    async def test_second_identical_call_is_replayed(self, tmp_path):
+        """Test that a cached response is streamed to the client without
+        calling the LLM."""
+        agent = create_test_agent(BaseAgent, task="Test")
+        agent.config.llm = LLMConfig(temperature=0, response_cache_dir=str(tmp_path))
+        agent.openai_client.chat.completions.stream = Mock(return_value=make_stream_context(make_chunks()))
+        agent.streaming_generator = Mock()
+
+        live = await agent._stream_completion("select_action", messages=[], tools=[WEATHER_TOOL])
+        replayed = await agent._stream_completion("select_action", messages=[], tools=[WEATHER_TOOL])
+
+        assert agent.openai_client.chat.completions.stream.call_count == 1
+        assert agent.streaming_generator.add_chunk.call_count == 4
+        assert replayed.choices[0].message.tool_calls[0].function.parsed_arguments == Weather(city="Paris")
+        assert replayed.choices[0].message.model_dump() == live.choices[0].message.model_dump()
+        statistics = agent._context.statistics
+        assert statistics.phases["select_action"].calls == 2
+        assert statistics.llm.prompt_tokens == 100
+
+    @pytest.mark.asyncio
+    async def test_cache_not_used_with_sampling_temperature(self, tmp_path):
+        """Test that responses sampled with temperature are not cached."""
+        agent = create_test_agent(BaseAgent, task="Test")
+        agent.config.llm = LLMConfig(temperature=0.4, response_cache_dir=str(tmp_path))
+        agent.openai_client.chat.completions.stream = Mock(
+            side_effect=lambda **kwargs: make_stream_context(make_chunks())
+        )
+        agent.streaming_generator = Mock()
+
+        await agent._stream_completion("select_action", messages=[], tools=[WEATHER_TOOL])
+        await agent._stream_completion("select_action", messages=[], tools=[WEATHER_TOOL])
+
+        assert agent.openai_client.chat.completions.stream.call_count == 2
+        assert not any(tmp_path.iterdir())
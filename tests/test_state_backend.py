@@ -0,0 +1,279 @@
+"""Tests for the state backends and WorkerRouter.
+
+This module contains tests for the in-memory and SQLite state backends
+and for routing requests to the worker running an agent.
+"""
+
+import asyncio
+import json
+import sqlite3
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from sgr_agent_core.agents import SGRAgent
+from sgr_deep_research.api.models import AgentListItem
+from sgr_deep_research.services import InMemoryAgentStore, InMemoryStateBackend, SQLiteStateBackend, WorkerRouter
+from tests.conftest import create_test_agent
+
+
+def make_item(agent_id: str, state: str = "researching") -> AgentListItem:
+    return AgentListItem(agent_id=agent_id, task="Test task", state=state, creation_time=datetime.now())
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryStateBackend()
+    return SQLiteStateBackend(str(tmp_path / "state.db"))
+
+
+class TestStateBackend:
+    """Tests for the StateBackend implementations."""
+
+    @pytest.mark.asyncio
+    async def test_owner_of_live_worker(self, backend):
+        """Test that agents are owned by the live worker that published
+        them."""
+        await backend.heartbeat("worker-1")
+        await backend.publish_agents("worker-1", [make_item("agent_1"), make_item("agent_2")])
+        await backend.publish_agents("worker-1", [make_item("agent_2", "completed")])
+
+        assert await backend.owner("agent_1", alive_within=10) is None
+        assert await backend.owner("agent_2", alive_within=10) == "worker-1"
+        agents = await backend.list_agents(alive_within=10)
+        assert [item.state for item in agents["worker-1"]] == ["completed"]
+
+    @pytest.mark.asyncio
+    async def test_suspended_copy_does_not_take_over_running_agent(self, backend):
+        """Test that a worker still listing an agent as suspended does not
+        take the agent over from the worker that resumed it."""
+        await backend.heartbeat("worker-1")
+        await backend.heartbeat("worker-2")
+        await backend.publish_agents("worker-1", [make_item("agent_1")])
+        await backend.publish_agents("worker-2", [make_item("agent_1", "suspended")])
+
+        assert await backend.owner("agent_1", alive_within=10) == "worker-1"
+
+    @pytest.mark.asyncio
+    async def test_dead_worker_owns_nothing(self, backend):
+        """Test that agents of workers without a recent heartbeat are
+        gone."""
+        await backend.heartbeat("worker-1")
+        await backend.publish_agents("worker-1", [make_item("agent_1")])
+        await asyncio.sleep(0.02)
+
+        assert await backend.owner("agent_1", alive_within=0.01) is None
+        assert await backend.list_agents(alive_within=0.01) == {}
+        assert await backend.live_workers(alive_within=0.01) == []
+
+    @pytest.mark.asyncio
+    async def test_remove_worker(self, backend):
+        """Test that a removed worker leaves no agents or messages."""
+        await backend.heartbeat("worker-1")
+        await backend.publish_agents("worker-1", [make_item("agent_1")])
+        await backend.send("worker-1", {"close": "channel"})
+        await backend.remove_worker("worker-1")
+
+        assert await backend.owner("agent_1", alive_within=10) is None
+        assert await backend.receive("worker-1") == []
+
+    @pytest.mark.asyncio
+    async def test_inbox_in_order_and_taken_once(self, backend):
+        """Test that messages are received oldest first and only once."""
+        await backend.send("worker-1", {"n": 1})
+        await backend.send("worker-1", {"n": 2})
+        await backend.send("worker-2", {"n": 3})
+
+        assert await backend.receive("worker-1") == [{"n": 1}, {"n": 2}]
+        assert await backend.receive("worker-1") == []
+        assert await backend.receive("worker-2") == [{"n": 3}]
+
+    @pytest.mark.asyncio
+    async def test_channel_pull_after_cursor(self, backend):
+        """Test that channel entries are read after the cursor until
+        dropped."""
+        await backend.push("channel", "head", b"{}")
+        await backend.push("channel", "frame", b"data: 1\n\n")
+        await backend.push("other", "frame", b"data: 2\n\n")
+
+        entries = await backend.pull("channel")
+        assert [(kind, data) for _, kind, data in entries] == [("head", b"{}"), ("frame", b"data: 1\n\n")]
+        assert await backend.pull("channel", entries[-1][0]) == []
+
+        await backend.drop("channel")
+        assert await backend.pull("channel") == []
+        assert len(await backend.pull("other")) == 1
+
+    @pytest.mark.asyncio
+    async def test_expire_left_behind_entries(self, backend):
+        """Test that messages and channel entries nobody took in time are
+        deleted, and recent ones are kept."""
+        await backend.send("crashed-worker", {"n": 1})
+        await backend.push("abandoned", "frame", b"data: 1\n\n")
+        await asyncio.sleep(0.05)
+        await backend.send("worker-1", {"n": 2})
+        await backend.push("channel", "frame", b"data: 2\n\n")
+
+        await backend.expire(older_than=0.03)
+
+        assert await backend.receive("crashed-worker") == []
+        assert await backend.pull("abandoned") == []
+        assert await backend.receive("worker-1") == [{"n": 2}]
+        assert len(await backend.pull("channel")) == 1
+
+    @pytest.mark.asyncio
+    async def test_sqlite_locked_database_does_not_block_event_loop(self, tmp_path):
+        """Test that a call waiting for the lock held by another worker lets
+        other tasks run."""
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"), timeout=1)
+        locker = sqlite3.connect(str(tmp_path / "state.db"), isolation_level=None)
+        locker.execute("BEGIN IMMEDIATE")
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        call = asyncio.create_task(backend.send("worker-1", {"n": 1}))
+        await asyncio.sleep(0.1)
+        locker.rollback()
+        await call
+        ticker.cancel()
+        locker.close()
+
+        assert ticks >= 5
+        assert await backend.receive("worker-1") == [{"n": 1}]
+        await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_shared_between_connections(self, tmp_path):
+        """Test that workers with their own connection see each other, as
+        separate processes do."""
+        first = SQLiteStateBackend(str(tmp_path / "state.db"))
+        second = SQLiteStateBackend(str(tmp_path / "state.db"))
+        await first.heartbeat("worker-1")
+        await first.publish_agents("worker-1", [make_item("agent_1")])
+        await second.send("worker-1", {"n": 1})
+
+        assert await second.owner("agent_1", alive_within=10) == "worker-1"
+        assert await first.receive("worker-1") == [{"n": 1}]
+        await first.close()
+        await second.close()
+
+
+async def stream_frames(count: int, delay: float = 0):
+    for i in range(count):
+        await asyncio.sleep(delay)
+        yield f"data: {i}\n\n"
+
+
+class TestWorkerRouter:
+    """Tests for WorkerRouter."""
+
+    @staticmethod
+    @asynccontextmanager
+    async def start_workers():
+        """Two workers sharing a backend; the first one runs an agent."""
+        backend = InMemoryStateBackend()
+        owner_store, other_store = InMemoryAgentStore(), InMemoryAgentStore()
+        agent = create_test_agent(SGRAgent, task="Owned task")
+        owner_store.add(agent)
+        requests = []
+
+        async def handler(request: dict):
+            requests.append(request)
+            if request["endpoint"] == "missing":
+                raise HTTPException(status_code=404, detail="Agent not found")
+            if request["endpoint"] == "stream":
+                return StreamingResponse(
+                    stream_frames(request["frames"], request.get("delay", 0)),
+                    media_type="text/event-stream",
+                    headers={"X-Agent-ID": agent.id},
+                )
+            return await owner_store.get_state(request["agent_id"])
+
+        owner = WorkerRouter(backend, owner_store, handler, worker_id="owner", poll_interval=0.001)
+        other = WorkerRouter(backend, other_store, handler, worker_id="other", poll_interval=0.001)
+        await owner.start()
+        await other.start()
+        try:
+            yield owner, other, agent, requests
+        finally:
+            await other.stop()
+            await owner.stop()
+
+    @pytest.mark.asyncio
+    async def test_owner_and_listing(self):
+        """Test that only agents of other workers are routed."""
+        async with self.start_workers() as (owner, other, agent, _):
+            assert await other.owner(agent.id) == "owner"
+            assert await owner.owner(agent.id) is None
+            assert [item.agent_id for item in await other.list_agents()] == [agent.id]
+            assert await owner.list_agents() == []
+
+    @pytest.mark.asyncio
+    async def test_forward_json_response(self):
+        """Test that a model returned by the owner reaches the other worker
+        as JSON."""
+        async with self.start_workers() as (_, other, agent, requests):
+            response = await other.forward("owner", {"endpoint": "state", "agent_id": agent.id})
+
+            assert requests == [{"endpoint": "state", "agent_id": agent.id}]
+            assert response.media_type == "application/json"
+            assert json.loads(response.body)["task"] == "Owned task"
+
+    @pytest.mark.asyncio
+    async def test_forward_stream(self):
+        """Test that stream frames and agent headers are relayed."""
+        async with self.start_workers() as (_, other, agent, _):
+            response = await other.forward("owner", {"endpoint": "stream", "agent_id": agent.id, "frames": 3})
+            frames = [frame async for frame in response.body_iterator]
+
+            assert response.headers["x-agent-id"] == agent.id
+            assert frames == [b"data: 0\n\n", b"data: 1\n\n", b"data: 2\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_forward_error(self):
+        """Test that an HTTP error of the owner is raised on the other
+        worker."""
+        async with self.start_workers() as (_, other, agent, _):
+            with pytest.raises(HTTPException) as exc_info:
+                await other.forward("owner", {"endpoint": "missing", "agent_id": agent.id})
+
+            assert exc_info.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_closed_relay_stops_owner(self):
+        """Test that a reader going away stops the owner serving the
+        stream."""
+        async with self.start_workers() as (owner, other, agent, _):
+            request = {"endpoint": "stream", "agent_id": agent.id, "frames": 1000, "delay": 0.001}
+            response = await other.forward("owner", request)
+            frames = response.body_iterator
+            await anext(frames)
+            await frames.aclose()
+
+            for _ in range(100):
+                if not owner._serving:
+                    break
+                await asyncio.sleep(0.01)
+            assert owner._serving == {}
+
+    @pytest.mark.asyncio
+    async def test_unresponsive_owner(self):
+        """Test that a request to a worker that does not serve it fails."""
+        router = WorkerRouter(
+            InMemoryStateBackend(), InMemoryAgentStore(), None, poll_interval=0.001, worker_timeout=0.01
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await router.forward("gone", {"endpoint": "state", "agent_id": "agent"})
+
+        assert exc_info.value.status_code == 503
@@ -7,8 +7,9 @@ OpenAIStreamingGenerator classes used for SSE-like streaming.
 import json
 
 import pytest
+from openai.types.chat import ChatCompletionChunk
 
-from sgr_agent_core.stream import OpenAIStreamingGenerator, StreamingGenerator
+from sgr_agent_core.stream import OpenAIStreamingGenerator, StreamBroadcaster, StreamingGenerator
 
 
 class TestStreamingGenerator:
@@ -220,7 +221,7 @@ class TestOpenAIStreamingGenerator:
 
         # Should have 3 items: content chunk, final chunk, [DONE]
         assert len(items) >= 2
-        assert items[0].startswith("data: ")
+        assert items[0].startswith(b"data: ")
 
     @pytest.mark.asyncio
     async def test_add_chunk_from_str_json_structure(self):
@@ -235,7 +236,7 @@ class TestOpenAIStreamingGenerator:
 
         # Parse first chunk
         first_chunk = items[0]
-        assert first_chunk.startswith("data: ")
+        assert first_chunk.startswith(b"data: ")
         json_str = first_chunk[6:].strip()  # Remove "data: "
         data = json.loads(json_str)
 
@@ -377,6 +378,18 @@ class TestOpenAIStreamingGenerator:
         assert "completion_tokens" in data["usage"]
         assert "total_tokens" in data["usage"]
 
+    @pytest.mark.asyncio
+    async def test_finish_sends_given_usage(self):
+        """Test that final chunk carries the agent usage totals."""
+        generator = OpenAIStreamingGenerator()
+        usage = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+        generator.finish(usage=usage)
+
+        items = [item async for item in generator.stream()]
+        data = json.loads(items[-2][6:].strip())
+
+        assert data["usage"] == usage
+
     @pytest.mark.asyncio
     async def test_finish_adds_done_marker(self):
         """Test that finish() adds [DONE] marker."""
@@ -388,7 +401,7 @@ class TestOpenAIStreamingGenerator:
             items.append(item)
 
         # Last item should be [DONE]
-        assert items[-1] == "data: [DONE]\n\n"
+        assert items[-1] == b"data: [DONE]\n\n"
 
     @pytest.mark.asyncio
     async def test_complete_flow_text_only(self):
@@ -520,8 +533,8 @@ class TestOpenAIStreamingGenerator:
 
         # All items should start with "data: " and end with "\n\n"
         for item in items:
-            assert item.startswith("data: ")
-            assert item.endswith("\n\n")
+            assert item.startswith(b"data: ")
+            assert item.endswith(b"\n\n")
 
     def test_model_preserved_across_chunks(self):
         """Test that model name is consistent across all chunks."""
@@ -581,3 +594,502 @@ class TestOpenAIStreamingGenerator:
         data = json.loads(json_str)
 
         assert len(data["choices"][0]["delta"]["content"]) == 10000
+
+
+def make_content_chunk(content: str) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "completion",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "delta": {"content": content}}],
+        }
+    )
+
+
+def make_tool_call_chunk(arguments: str, call_id: str | None = None) -> ChatCompletionChunk:
+    tool_call = {"index": 0, "function": {"arguments": arguments}}
+    if call_id:
+        tool_call.update(id=call_id, type="function")
+        tool_call["function"]["name"] = "web_search"
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "completion",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "delta": {"tool_calls": [tool_call]}}],
+        }
+    )
+
+
+async def collect(generator: StreamingGenerator) -> list[str]:
+    return [item async for item in generator.stream()]
+
+
+class TestStreamBuffer:
+    """Tests for bounded stream buffer overflow policies."""
+
+    def test_unbounded_by_default(self):
+        """Test that without max_size nothing is dropped or coalesced."""
+        generator = OpenAIStreamingGenerator()
+        for i in range(100):
+            generator.add_chunk(make_content_chunk(str(i)))
+
+        assert generator.stats() == {"buffered": 100, "dropped": 0, "coalesced": 0, "merged": 0}
+
+    @pytest.mark.asyncio
+    async def test_drop_keeps_tool_calls_and_final_frames(self):
+        """Test that the drop policy discards only token chunks over the
+        bound."""
+        generator = OpenAIStreamingGenerator(max_size=2, overflow="drop")
+        for i in range(5):
+            generator.add_chunk(make_content_chunk(str(i)))
+        generator.add_tool_call("1-action", "final_answer", "{}")
+        generator.finish("done")
+
+        items = await collect(generator)
+
+        assert generator.dropped == 3
+        assert len(items) == 2 + 1 + 2
+        assert b"final_answer" in items[2]
+        assert items[-1] == b"data: [DONE]\n\n"
+
+    @pytest.mark.asyncio
+    async def test_coalesce_merges_content_in_order(self):
+        """Test that overflowing token chunks are merged into one frame
+        before the next tool call."""
+        generator = OpenAIStreamingGenerator(max_size=2, overflow="coalesce")
+        for i in range(6):
+            generator.add_chunk(make_content_chunk(str(i)))
+        generator.add_tool_call("1-action", "final_answer", "{}")
+        generator.finish()
+
+        items = await collect(generator)
+        contents = [json.loads(item[6:])["choices"][0]["delta"]["content"] for item in items[:3]]
+
+        assert generator.coalesced == 3
+        assert contents == ["0", "1", "2345"]
+        assert b"final_answer" in items[3]
+
+    def test_coalesce_appends_tool_call_arguments(self):
+        """Test that streamed tool call argument deltas are concatenated."""
+        generator = OpenAIStreamingGenerator(max_size=1, overflow="coalesce")
+        generator.add_chunk(make_content_chunk("thinking"))
+        first = make_tool_call_chunk('{"query": ', call_id="call_1")
+        generator.add_chunk(first)
+        generator.add_chunk(make_tool_call_chunk('"news"}'))
+        generator.finish()
+
+        generator.queue.get_nowait()
+        merged = json.loads(generator.queue.get_nowait()[6:])["choices"][0]["delta"]["tool_calls"][0]
+
+        assert merged["id"] == "call_1"
+        assert merged["function"] == {"name": "web_search", "arguments": '{"query": "news"}'}
+        assert first.choices[0].delta.tool_calls[0].function.arguments == '{"query": '
+
+    @pytest.mark.asyncio
+    async def test_block_waits_for_client(self):
+        """Test that the block policy makes the producer wait until the
+        client reads."""
+        import asyncio
+
+        generator = OpenAIStreamingGenerator(max_size=2, overflow="block")
+        for i in range(3):
+            generator.add_chunk(make_content_chunk(str(i)))
+        waiter = asyncio.create_task(generator.wait_for_room())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        stream = generator.stream()
+        await stream.__anext__()
+        await stream.__anext__()
+        await asyncio.wait_for(waiter, timeout=1)
+
+        assert generator.dropped == generator.coalesced == 0
+        await stream.aclose()
+
+
+async def collect_subscriber(subscriber) -> list[tuple[int, str]]:
+    frames = []
+    async for frame in subscriber:
+        event_id, data = frame.split("\n", 1)
+        frames.append((int(event_id.removeprefix("id: ")), data))
+    return frames
+
+
+async def collect_frames(subscriber) -> list[bytes]:
+    return [frame async for frame in subscriber]
+
+
+def frame_contents(frames: list[bytes]) -> list[str | None]:
+    """Content deltas of the chunk frames, without the [DONE] frame."""
+    return [
+        json.loads(frame.split(b"data: ", 1)[1])["choices"][0]["delta"].get("content")
+        for frame in frames
+        if not frame.endswith(b"data: [DONE]\n\n")
+    ]
+
+
+class TestStreamBroadcaster:
+    """Tests for fan-out of the stream with replay log."""
+
+    @pytest.mark.asyncio
+    async def test_subscribers_get_every_frame_with_ids(self):
+        """Test that a second viewer does not steal frames."""
+        generator = StreamingGenerator()
+        broadcaster = StreamBroadcaster(generator)
+        for i in range(3):
+            generator.add(f"frame {i}")
+        generator.finish()
+
+        first = await collect_subscriber(broadcaster.subscribe())
+        second = await collect_subscriber(broadcaster.subscribe())
+
+        assert first == second == [(0, "frame 0"), (1, "frame 1"), (2, "frame 2")]
+
+    @pytest.mark.asyncio
+    async def test_resume_after_last_event_id(self):
+        """Test that a reconnecting client gets only frames after the last
+        one it saw."""
+        generator = StreamingGenerator()
+        broadcaster = StreamBroadcaster(generator)
+        for i in range(5):
+            generator.add(f"frame {i}")
+        generator.finish()
+
+        frames = await collect_subscriber(broadcaster.subscribe(last_event_id=2))
+
+        assert frames == [(3, "frame 3"), (4, "frame 4")]
+
+    @pytest.mark.asyncio
+    async def test_segments_stream_separately(self):
+        """Test that the response after a clarification starts at its own
+        segment."""
+        import asyncio
+
+        generator = StreamingGenerator()
+        broadcaster = StreamBroadcaster(generator)
+        generator.add("question")
+        generator.finish(final=False)
+        assert await collect_subscriber(broadcaster.subscribe(segment=0)) == [(0, "question")]
+
+        answer = asyncio.create_task(collect_subscriber(broadcaster.subscribe(segment=generator.segments)))
+        await asyncio.sleep(0)
+        generator.add("answer")
+        generator.finish()
+
+        assert await asyncio.wait_for(answer, timeout=1) == [(2, "answer")]
+        # a late viewer replays the latest segment, resuming past the end returns at once
+        assert await collect_subscriber(broadcaster.subscribe()) == [(2, "answer")]
+        assert await collect_subscriber(broadcaster.subscribe(last_event_id=3)) == []
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_falls_off_replay_log(self):
+        """Test that a slow subscriber does not hold the pump and is
+        disconnected once its next frame is evicted."""
+        import asyncio
+
+        generator = StreamingGenerator(max_size=1, overflow="block")
+        broadcaster = StreamBroadcaster(generator, replay_size=2)
+        slow = broadcaster.subscribe()
+        generator.add("frame 0")
+        assert (await slow.__anext__()).startswith("id: 0")
+
+        for i in range(1, 5):
+            generator.add(f"frame {i}")
+        generator.finish()
+        await asyncio.sleep(0.01)
+        assert generator.queue.qsize() == 0
+        assert broadcaster.stats()["replay_log"] == 2
+
+        assert await collect_subscriber(slow) == []
+        assert broadcaster.stats()["lagged"] == 1
+        assert broadcaster.stats()["subscribers"] == 0
+
+    async def stream_to_slow_and_fast(self, overflow: str) -> tuple[StreamBroadcaster, list[bytes], list[bytes]]:
+        """Stream token chunks to a subscriber reading along and one
+        starting after the end, 2 frames of buffer each."""
+        import asyncio
+
+        generator = OpenAIStreamingGenerator()
+        broadcaster = StreamBroadcaster(generator, buffer_size=2, overflow=overflow)
+        fast = asyncio.create_task(collect_frames(broadcaster.subscribe()))
+        await asyncio.sleep(0)
+        for i in range(6):
+            generator.add_chunk(make_content_chunk(str(i)))
+            await asyncio.sleep(0.001)
+        generator.add_tool_call("1-action", "final_answer", "{}")
+        generator.finish("done")
+        slow = await collect_frames(broadcaster.subscribe(segment=0))
+        return broadcaster, await asyncio.wait_for(fast, timeout=1), slow
+
+    @pytest.mark.asyncio
+    async def test_drop_skips_token_chunks_for_slow_subscriber(self):
+        """Test that only the subscriber over the buffer loses token
+        chunks, tool calls and final frames are kept."""
+        broadcaster, fast, slow = await self.stream_to_slow_and_fast("drop")
+
+        assert frame_contents(fast) == ["0", "1", "2", "3", "4", "5", None, "done"]
+        assert frame_contents(slow) == [None, "done"]
+        assert b"final_answer" in slow[0]
+        assert broadcaster.stats()["dropped"] == 6
+
+    @pytest.mark.asyncio
+    async def test_coalesce_merges_token_chunks_for_slow_subscriber(self):
+        """Test that the subscriber over the buffer gets token chunks
+        merged into one frame with the id of the last one."""
+        broadcaster, fast, slow = await self.stream_to_slow_and_fast("coalesce")
+
+        assert frame_contents(fast) == ["0", "1", "2", "3", "4", "5", None, "done"]
+        assert frame_contents(slow) == ["012345", None, "done"]
+        assert slow[0].startswith(b"id: 5\n")
+        assert broadcaster.stats()["coalesced"] == 5
+
+    @pytest.mark.asyncio
+    async def test_block_waits_for_slow_subscriber(self):
+        """Test that the producer waits until the slowest subscriber reads
+        back within the buffer."""
+        import asyncio
+
+        generator = OpenAIStreamingGenerator()
+        broadcaster = StreamBroadcaster(generator, buffer_size=2, overflow="block")
+        slow = broadcaster.subscribe()
+        generator.add_chunk(make_content_chunk("0"))
+        await slow.__anext__()
+        generator.add_chunk(make_content_chunk("1"))
+        generator.add_chunk(make_content_chunk("2"))
+        waiter = asyncio.create_task(broadcaster.wait_for_room())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await slow.__anext__()
+        await asyncio.wait_for(waiter, timeout=1)
+
+        assert broadcaster.stats()["dropped"] == broadcaster.stats()["coalesced"] == 0
+        await slow.aclose()
+
+    @pytest.mark.asyncio
+    async def test_resume_out_of_window_starts_at_oldest(self):
+        """Test that a client resuming past the replay log gets the oldest
+        kept frames."""
+        generator = StreamingGenerator()
+        broadcaster = StreamBroadcaster(generator, replay_size=2)
+        for i in range(5):
+            generator.add(f"frame {i}")
+        generator.finish()
+        await collect_subscriber(broadcaster.subscribe())
+
+        frames = await collect_subscriber(broadcaster.subscribe(last_event_id=0))
+
+        assert frames == [(4, "frame 4")]
+
+
+class TestWindowCoalescing:
+    """Tests for time-window coalescing of token chunks."""
+
+    def frames(self, generator: OpenAIStreamingGenerator) -> list[dict]:
+        frames = []
+        while not generator.queue.empty():
+            item = generator.queue.get_nowait()
+            if item is not None and item != b"data: [DONE]\n\n":
+                frames.append(json.loads(item[6:]))
+        return frames
+
+    def test_content_merged_until_flush(self):
+        """Test that consecutive content chunks become one frame."""
+        generator = OpenAIStreamingGenerator(coalesce_window=10)
+        for token in ["Hel", "lo", " world"]:
+            generator.add_chunk(make_content_chunk(token))
+
+        assert generator.queue.empty()
+        generator.add_tool_call("1-action", "final_answer", "{}")
+        frames = self.frames(generator)
+
+        assert frames[0]["choices"][0]["delta"]["content"] == "Hello world"
+        assert frames[1]["choices"][0]["delta"]["tool_calls"][0]["function"]["name"] == "final_answer"
+        assert generator.merged == 2
+
+    def test_tool_call_boundaries_preserved(self):
+        """Test that content, and each streamed tool call, get own frames."""
+        generator = OpenAIStreamingGenerator(coalesce_window=10)
+        generator.add_chunk(make_content_chunk("thinking"))
+        generator.add_chunk(make_tool_call_chunk('{"query": ', call_id="call_1"))
+        generator.add_chunk(make_tool_call_chunk('"news"}'))
+        generator.add_chunk(make_tool_call_chunk('{"url": ', call_id="call_2"))
+        generator.finish()
+
+        frames = self.frames(generator)
+        deltas = [frame["choices"][0]["delta"] for frame in frames[:3]]
+
+        assert deltas[0]["content"] == "thinking"
+        assert deltas[1]["tool_calls"][0]["function"]["arguments"] == '{"query": "news"}'
+        assert deltas[2]["tool_calls"][0]["id"] == "call_2"
+        assert frames[3]["choices"][0]["finish_reason"] == "stop"
+
+    def test_bytes_limit_flushes_early(self):
+        """Test that a merged frame is flushed at coalesce_bytes."""
+        generator = OpenAIStreamingGenerator(coalesce_window=10, coalesce_bytes=4)
+        for token in ["ab", "cd", "ef"]:
+            generator.add_chunk(make_content_chunk(token))
+        generator.finish()
+
+        contents = [frame["choices"][0]["delta"]["content"] for frame in self.frames(generator)]
+
+        assert contents[:2] == ["abcd", "ef"]
+
+    @pytest.mark.asyncio
+    async def test_window_expiry_flushes(self):
+        """Test that a merged frame is sent when the window passes."""
+        import asyncio
+
+        generator = OpenAIStreamingGenerator(coalesce_window=0.01)
+        generator.add_chunk(make_content_chunk("a"))
+        generator.add_chunk(make_content_chunk("b"))
+        await asyncio.sleep(0.05)
+
+        assert [frame["choices"][0]["delta"]["content"] for frame in self.frames(generator)] == ["ab"]
+
+
+class TestFrameEncoding:
+    """Tests for pre-encoded SSE frames."""
+
+    def test_json_bytes_without_orjson(self, monkeypatch):
+        """Test that the json fallback encodes the same compact UTF-8."""
+        from sgr_agent_core import stream
+
+        value = {"content": 'Привет "мир"\n', "usage": None, "index": 0}
+        encoded = stream.json_bytes(value)
+        monkeypatch.setattr(stream, "orjson", None)
+
+        assert stream.json_bytes(value) == encoded
+        assert json.loads(encoded) == value
+
+    def test_llm_chunk_frame_uses_stream_envelope(self):
+        """Test that LLM chunks are sent with the stream id and model and
+        their own delta."""
+        generator = OpenAIStreamingGenerator(model="sgr-agent")
+        generator.add_chunk(make_tool_call_chunk('{"query": ', call_id="call_1"))
+        generator.add_chunk_from_str("text")
+
+        frames = [json.loads(generator.queue.get_nowait()[6:]) for _ in range(2)]
+
+        assert {frame["id"] for frame in frames} == {generator.id}
+        assert {frame["model"] for frame in frames} == {"sgr-agent"}
+        assert {frame["system_fingerprint"] for frame in frames} == {generator.fingerprint}
+        assert frames[0]["choices"][0]["delta"]["tool_calls"][0] == {
+            "index": 0,
+            "id": "call_1",
+            "type": "function",
+            "function": {"name": "web_search", "arguments": '{"query": '},
+        }
+        assert frames[0]["usage"] is None
+
+    def test_frame_matches_pydantic_dump(self):
+        """Test that the fast encoding parses to the same chunk as the
+        pydantic dump of it."""
+        generator = OpenAIStreamingGenerator()
+        chunk = make_tool_call_chunk('"news"}')
+        chunk.model = generator.model
+        generator.add_chunk(chunk)
+
+        frame = ChatCompletionChunk.model_validate_json(generator.queue.get_nowait()[6:])
+
+        assert frame.choices == chunk.choices
+
+    @pytest.mark.asyncio
+    async def test_broadcaster_prefixes_bytes_frames(self):
+        """Test that byte frames get a byte event id line."""
+        generator = OpenAIStreamingGenerator()
+        broadcaster = StreamBroadcaster(generator)
+        generator.finish()
+
+        frames = [frame async for frame in broadcaster.subscribe()]
+
+        assert frames[-1] == b"id: 1\ndata: [DONE]\n\n"
+
+
+class TestStreamSpool:
+    """Tests for keeping evicted stream frames on disk."""
+
+    @pytest.mark.asyncio
+    async def test_reconnect_gets_spooled_frames(self, tmp_path):
+        """Test that a client reconnecting after a detached run gets frames
+        evicted from the replay log."""
+        import asyncio
+
+        generator = OpenAIStreamingGenerator()
+        broadcaster = StreamBroadcaster(generator, replay_size=2)
+        broadcaster.spool(tmp_path / "agent.sse")
+        for i in range(5):
+            generator.add_chunk_from_str(str(i))
+        generator.finish()
+        broadcaster.start()
+        await asyncio.sleep(0.01)
+
+        frames = [frame async for frame in broadcaster.subscribe(segment=0)]
+        contents = [json.loads(frame.split(b"data: ", 1)[1])["choices"][0]["delta"]["content"] for frame in frames[:5]]
+
+        assert broadcaster.stats()["spooled"] == 6
+        assert contents == ["0", "1", "2", "3", "4"]
+        assert frames[-1] == b"id: 6\ndata: [DONE]\n\n"
+
+    @pytest.mark.asyncio
+    async def test_spool_keeps_str_frames_and_segments(self, tmp_path):
+        """Test that str frames and segment ends come back from the spool
+        as they were."""
+        import asyncio
+
+        generator = StreamingGenerator()
+        broadcaster = StreamBroadcaster(generator, replay_size=1)
+        broadcaster.spool(tmp_path / "agent.sse")
+        generator.add("question")
+        generator.finish(final=False)
+        generator.add("answer")
+        generator.finish()
+        broadcaster.start()
+        await asyncio.sleep(0.01)
+
+        assert await collect_subscriber(broadcaster.subscribe(segment=0)) == [(0, "question")]
+        assert await collect_subscriber(broadcaster.subscribe(last_event_id=1)) == [(2, "answer")]
+
+    @pytest.mark.asyncio
+    async def test_spool_keeps_last_max_frames(self, tmp_path):
+        """Test that only the last max_frames evicted frames are kept, a
+        client resuming before them starts at the oldest kept one."""
+        import asyncio
+
+        generator = StreamingGenerator()
+        broadcaster = StreamBroadcaster(generator, replay_size=1)
+        broadcaster.spool(tmp_path / "agent.sse", max_frames=2)
+        for i in range(5):
+            generator.add(f"frame {i}")
+        generator.finish()
+        broadcaster.start()
+        await asyncio.sleep(0.01)
+
+        frames = await collect_subscriber(broadcaster.subscribe(segment=0))
+
+        assert broadcaster.stats()["spooled"] == 2
+        assert frames == [(3, "frame 3"), (4, "frame 4")]
+
+    @pytest.mark.asyncio
+    async def test_spool_file_deleted_after_stream_and_close(self, tmp_path):
+        """Test that close() deletes the spool file once the subscriber
+        reading the completed stream is done."""
+        generator = StreamingGenerator()
+        broadcaster = StreamBroadcaster(generator, replay_size=1)
+        broadcaster.spool(tmp_path / "agent.sse")
+        for i in range(3):
+            generator.add(f"frame {i}")
+        generator.finish()
+        subscriber = broadcaster.subscribe(segment=0)
+        assert await subscriber.__anext__() == "id: 0\nframe 0"
+
+        broadcaster.close()
+        assert (tmp_path / "agent.sse").exists()
+        assert await collect_subscriber(subscriber) == [(1, "frame 1"), (2, "frame 2")]
+
+        assert not (tmp_path / "agent.sse").exists()
+        assert broadcaster.stats()["spooled"] == 0
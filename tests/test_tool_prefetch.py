@@ -0,0 +1,192 @@
+"""Tests for early tool start from streamed tool call arguments.
+
+This module contains tests for IncrementalJSONParser, ToolPrefetcher and
+the prefetch path of WebSearchTool in agents.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from sgr_agent_core.agent_definition import AgentConfig, ExecutionConfig, SearchConfig
+from sgr_agent_core.agents import ToolCallingAgent
+from sgr_agent_core.models import AgentContext, SourceData
+from sgr_agent_core.services import IncrementalJSONParser, ToolPrefetcher
+from sgr_agent_core.tools import FinalAnswerTool, ReasoningTool, WebSearchTool
+from tests.conftest import create_test_agent
+
+
+def feed_in_chunks(parser: IncrementalJSONParser, text: str, size: int) -> list:
+    completed = []
+    for i in range(0, len(text), size):
+        completed.extend(parser.feed(text[i : i + size]))
+    return completed
+
+
+def make_sources(count: int) -> list[SourceData]:
+    return [SourceData(number=0, url=f"https://example.com/{i}") for i in range(count)]
+
+
+class TestIncrementalJSONParser:
+    """Tests for IncrementalJSONParser."""
+
+    @pytest.mark.parametrize("size", [1, 3, 1000])
+    def test_reports_completed_members_with_paths(self, size):
+        """Test that members are reported once complete, regardless of
+        chunking."""
+        document = {
+            "steps": ["a", {"x": 1}],
+            "function": {"tool_name_discriminator": "websearchtool", "query": 'say "hi", {ok}', "n": -1.5},
+            "done": True,
+        }
+        parser = IncrementalJSONParser()
+
+        completed = dict(feed_in_chunks(parser, json.dumps(document), size))
+
+        assert parser.done and not parser.failed
+        assert completed[("function", "query")] == 'say "hi", {ok}'
+        assert completed[("function", "n")] == -1.5
+        assert completed[("function",)] == document["function"]
+        assert completed[("steps",)] == document["steps"]
+        assert completed[("done",)] is True
+        assert ("steps", "x") not in completed
+
+    def test_value_is_reported_before_document_ends(self):
+        """Test that a string member is reported as soon as it is closed."""
+        parser = IncrementalJSONParser()
+
+        assert parser.feed('{"reasoning": "why", "query": "what') == [(("reasoning",), "why")]
+        assert parser.feed('"') == [(("query",), "what")]
+
+    def test_number_waits_for_terminator(self):
+        """Test that a number split between chunks is not reported early."""
+        parser = IncrementalJSONParser()
+
+        assert parser.feed('{"max_results": 1') == []
+        assert parser.feed("0}") == [(("max_results",), 10)]
+
+    def test_invalid_input_fails_silently(self):
+        """Test that non-JSON content stops parsing."""
+        parser = IncrementalJSONParser()
+
+        assert parser.feed("Plain text answer") == []
+        assert parser.failed
+
+
+class TestToolPrefetcher:
+    """Tests for ToolPrefetcher."""
+
+    @staticmethod
+    def arguments_delta(delta: str, name: str = "websearchtool", index: int = 0) -> Mock:
+        event = Mock(type="tool_calls.function.arguments.delta", index=index, arguments_delta=delta)
+        event.name = name
+        return event
+
+    @pytest.mark.asyncio
+    async def test_prefetch_starts_once_fields_are_complete(self):
+        """Test that the search starts when query is streamed and is taken
+        by the tool call."""
+        context = AgentContext()
+        config = AgentConfig(search=SearchConfig(tavily_api_key="test-key", max_results=5))
+        prefetcher = ToolPrefetcher([ReasoningTool, WebSearchTool], context, config)
+
+        with patch("sgr_agent_core.tools.web_search_tool.TavilySearchService") as mock_service:
+            mock_service.return_value.search = AsyncMock(return_value=make_sources(5))
+            prefetcher.feed(self.arguments_delta('{"reasoning": "r", "query": "sgr'))
+            assert prefetcher.started == 0
+            prefetcher.feed(self.arguments_delta('", "max_results": 2}'))
+            assert prefetcher.started == 1
+
+            result = await WebSearchTool(reasoning="r", query="sgr", max_results=2)(context, config)
+
+        mock_service.return_value.search.assert_awaited_once_with(query="sgr", max_results=5, include_raw_content=False)
+        assert len(context.sources) == 2
+        assert "[2] Untitled - https://example.com/1" in result
+
+    @pytest.mark.asyncio
+    async def test_prefetch_from_sgr_structured_output(self):
+        """Test that the function of NextStepTools content is prefetched."""
+        context = AgentContext()
+        prefetcher = ToolPrefetcher([WebSearchTool], context, AgentConfig(search=SearchConfig()))
+        content = json.dumps(
+            {"reasoning_steps": ["a"], "function": {"tool_name_discriminator": "websearchtool", "query": "q"}}
+        )
+
+        with patch.object(WebSearchTool, "prefetch", AsyncMock(return_value=[])) as prefetch:
+            prefetcher.feed(Mock(type="content.delta", delta=content))
+            await asyncio.sleep(0)
+
+        prefetch.assert_awaited_once()
+        assert prefetch.call_args.args[0] == {"query": "q"}
+
+    @pytest.mark.asyncio
+    async def test_only_first_prefetch_in_sequential_mode(self):
+        """Test that unused tool calls do not start prefetches."""
+        context = AgentContext()
+        prefetcher = ToolPrefetcher([WebSearchTool], context, AgentConfig(search=SearchConfig()), max_prefetches=1)
+
+        with patch.object(WebSearchTool, "prefetch", AsyncMock(return_value=[])):
+            prefetcher.feed(self.arguments_delta('{"query": "a"}', index=0))
+            prefetcher.feed(self.arguments_delta('{"query": "b"}', index=1))
+            context.cancel_prefetches()
+
+        assert prefetcher.started == 1
+
+    @pytest.mark.asyncio
+    async def test_unused_prefetches_are_cancelled(self):
+        """Test that prefetches not taken by a tool call are cancelled."""
+        context = AgentContext()
+        context.start_prefetch("websearchtool", {"query": "a"}, asyncio.sleep(10))
+        task = next(iter(context._prefetches.values()))
+
+        context.cancel_prefetches()
+        await asyncio.sleep(0)
+
+        assert task.cancelled()
+        assert await context.take_prefetch("websearchtool", {"query": "a"}) is None
+
+
+class TestAgentToolPrefetch:
+    """Tests for prefetching in agent LLM calls."""
+
+    @pytest.mark.asyncio
+    async def test_search_starts_before_stream_ends(self):
+        """Test that the agent starts the search while the tool call is still
+        streamed."""
+        search_started = asyncio.Event()
+        stream_finished = []
+
+        async def search(**kwargs):
+            search_started.set()
+            return make_sources(1)
+
+        async def async_iter(self):
+            yield Mock(type="chunk", chunk=Mock(choices=[Mock()]))
+            yield TestToolPrefetcher.arguments_delta('{"reasoning": "r", "query": "q"')
+            await asyncio.wait_for(search_started.wait(), 1)
+            yield TestToolPrefetcher.arguments_delta(', "max_results": 3}')
+            stream_finished.append(True)
+
+        stream = AsyncMock()
+        stream.__aiter__ = async_iter
+        stream.get_final_completion = AsyncMock(return_value=Mock(usage=None))
+        stream_context = AsyncMock()
+        stream_context.__aenter__ = AsyncMock(return_value=stream)
+        stream_context.__aexit__ = AsyncMock(return_value=None)
+
+        agent = create_test_agent(
+            ToolCallingAgent,
+            toolkit=[WebSearchTool, FinalAnswerTool],
+            agent_config=AgentConfig(search=SearchConfig(), execution=ExecutionConfig(tool_prefetch=True)),
+        )
+        agent.openai_client.chat.completions.stream = Mock(return_value=stream_context)
+        agent.streaming_generator = Mock()
+
+        with patch("sgr_agent_core.tools.web_search_tool.TavilySearchService") as mock_service:
+            mock_service.return_value.search = AsyncMock(side_effect=search)
+            await agent._stream_completion("select_action", messages=[])
+
+            assert stream_finished == [True]
+            assert await agent._context.take_prefetch("websearchtool", {"query": "q"}) == make_sources(1)
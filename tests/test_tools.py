@@ -5,8 +5,12 @@ This module contains simple tests for all tools:
 - Config reading (if needed)
 """
 
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
+import pytest
+
+from sgr_agent_core.agent_definition import AgentConfig, SearchConfig
+from sgr_agent_core.models import AgentContext, SourceData
 from sgr_agent_core.tools import (
     AdaptPlanTool,
     ClarificationTool,
@@ -14,6 +18,7 @@ from sgr_agent_core.tools import (
     ExtractPageContentTool,
     FinalAnswerTool,
     GeneratePlanTool,
+    NextStepToolsBuilder,
     ReasoningTool,
     WebSearchTool,
 )
@@ -148,3 +153,66 @@ class TestToolsConfigReading:
         )
         # Tool should be initialized without errors
         assert tool.title == "Test Report"
+
+
+class TestWebSearchToolCitations:
+    """Test citation numbering of WebSearchTool results."""
+
+    @pytest.mark.asyncio
+    async def test_known_urls_keep_citation_numbers(self):
+        """Test that repeated URLs keep their number and new ones continue the
+        sequence."""
+        context = AgentContext()
+        config = AgentConfig(search=SearchConfig(tavily_api_key="test-key"))
+        first = [SourceData(number=0, url="https://a.com"), SourceData(number=1, url="https://b.com")]
+        second = [SourceData(number=0, url="https://b.com"), SourceData(number=1, url="https://c.com")]
+
+        with patch("sgr_agent_core.tools.web_search_tool.TavilySearchService") as mock_service:
+            mock_service.return_value.search = AsyncMock(side_effect=[first, second])
+            await WebSearchTool(reasoning="Test", query="first")(context, config)
+            result = await WebSearchTool(reasoning="Test", query="second")(context, config)
+
+        assert {url: source.number for url, source in context.sources.items()} == {
+            "https://a.com": 1,
+            "https://b.com": 2,
+            "https://c.com": 3,
+        }
+        assert "[2] Untitled - https://b.com" in result
+        assert "[3] Untitled - https://c.com" in result
+
+
+class TestNextStepToolsBuilderCache:
+    """Test caching of built NextStepTools models."""
+
+    def test_same_toolset_is_built_once(self):
+        """Test that the same set of tools returns the cached model
+        regardless of order."""
+        model = NextStepToolsBuilder.build_NextStepTools([WebSearchTool, FinalAnswerTool])
+
+        assert NextStepToolsBuilder.build_NextStepTools([FinalAnswerTool, WebSearchTool]) is model
+        assert NextStepToolsBuilder.build_NextStepTools([WebSearchTool]) is not model
+
+    def test_json_schema_is_cached_and_copied(self):
+        """Test that the schema is generated once and callers get
+        independent copies."""
+        model = NextStepToolsBuilder.build_NextStepTools([WebSearchTool, GeneratePlanTool])
+
+        schema = model.model_json_schema()
+        schema["properties"].clear()
+
+        assert model.model_json_schema()["properties"]
+        assert model.model_json_schema() == model.model_json_schema()
+
+    def test_cache_evicts_least_recently_used(self, monkeypatch):
+        """Test that the cache is bounded and evicts the oldest toolset."""
+        monkeypatch.setattr(NextStepToolsBuilder, "max_cache_size", 2)
+        NextStepToolsBuilder.clear_cache()
+
+        first = NextStepToolsBuilder.build_NextStepTools([WebSearchTool])
+        NextStepToolsBuilder.build_NextStepTools([FinalAnswerTool])
+        NextStepToolsBuilder.build_NextStepTools([WebSearchTool])
+        NextStepToolsBuilder.build_NextStepTools([ClarificationTool])
+
+        assert len(NextStepToolsBuilder._cache) == 2
+        assert NextStepToolsBuilder.build_NextStepTools([WebSearchTool]) is first
+        assert frozenset([FinalAnswerTool]) not in NextStepToolsBuilder._cache